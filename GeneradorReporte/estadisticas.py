@@ -0,0 +1,136 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from neonatos.generacion import generacion
+from neonatos.models import Parto, RecienNacido
+from rendimiento.replicas import lectura_primario
+
+from .utils import robson_expresion
+
+# ===========================
+# ESTADÍSTICAS DE COHORTE
+# ===========================
+# Cada consulta extrae una vez las columnas necesarias (values_list) y las
+# pasa a arreglos NumPy; histogramas, cuantiles y tasas se calculan sobre
+# toda la cohorte sin recorrer registros. El grupo de Robson lo calcula la base
+# con utils.robson_expresion, la misma expresión del tablero de indicadores.
+# El resultado se guarda en caché por rango de fechas y generación de los datos
+# (neonatos/generacion.py), que cambia con cada alta, edición o baja. Se calcula
+# en el primario: una vez por generación, y nunca con datos atrasados de la réplica.
+
+CUANTILES = (5, 10, 25, 50, 75, 90, 95)
+CESAREAS = ("cesarea_electiva", "cesarea_urgencia")
+GRUPOS_ROBSON = range(1, 11)
+
+# Bordes de los histogramas de variables continuas
+BORDES_PESO = np.round(np.arange(0.0, 6.01, 0.25), 2)  # kg
+BORDES_TALLA = np.arange(24, 62, 2)  # cm
+
+
+def _arreglo(valores, dtype=float):
+    # None queda como NaN en arreglos de punto flotante
+    return np.array(valores, dtype=dtype) if len(valores) else np.array([], dtype=dtype)
+
+
+def _columnas(queryset, *campos):
+    filas = list(queryset.values_list(*campos))
+    return list(zip(*filas)) if filas else [() for _ in campos]
+
+
+def _resumen(valores):
+    validos = valores[~np.isnan(valores)]
+    if not validos.size:
+        return {"n": 0, "promedio": None, "cuantiles": {}}
+    return {
+        "n": int(validos.size),
+        "promedio": round(float(validos.mean()), 3),
+        "cuantiles": {f"p{q}": round(float(v), 3) for q, v in zip(CUANTILES, np.percentile(validos, CUANTILES))},
+    }
+
+
+def _histograma(valores, bordes):
+    validos = valores[~np.isnan(valores)]
+    # Los extremos se acumulan en el primer y último tramo
+    conteos, _ = np.histogram(np.clip(validos, bordes[0], bordes[-1]), bins=bordes)
+    return {"bordes": [float(b) for b in bordes], "conteos": conteos.tolist()}
+
+
+def _histograma_entero(valores, minimo, maximo):
+    validos = valores[~np.isnan(valores)].astype(int)
+    validos = validos[(validos >= minimo) & (validos <= maximo)]
+    conteos = np.bincount(validos - minimo, minlength=maximo - minimo + 1)
+    return {"valores": list(range(minimo, maximo + 1)), "conteos": conteos.tolist()}
+
+
+def _tasas(etiquetas, cesarea, categorias):
+    """n, cesáreas, tasa (%), tamaño relativo y contribución a las cesáreas por categoría."""
+    total, total_cesareas = len(etiquetas), int(cesarea.sum())
+    filas = []
+    for categoria in categorias:
+        en_categoria = etiquetas == categoria
+        n, c = int(en_categoria.sum()), int((en_categoria & cesarea).sum())
+        filas.append({
+            "categoria": categoria,
+            "n": n,
+            "cesareas": c,
+            "tasa": round(100 * c / n, 1) if n else None,
+            "tamano_relativo": round(100 * n / total, 1) if total else None,
+            "contribucion": round(100 * c / total_cesareas, 1) if total_cesareas else None,
+        })
+    return filas
+
+
+def calcular_estadisticas(inicio=None, fin=None):
+    partos = Parto.objects.all()
+    rns = RecienNacido.objects.all()
+    if inicio:
+        partos = partos.filter(fecha_parto__gte=inicio)
+        rns = rns.filter(parto__fecha_parto__gte=inicio)
+    if fin:
+        partos = partos.filter(fecha_parto__lte=fin)
+        rns = rns.filter(parto__fecha_parto__lte=fin)
+
+    tipo, atencion, semanas, robson = _columnas(
+        partos.annotate(grupo=robson_expresion()), "tipo_parto", "tipo_atencion", "edad_gestacional", "grupo",
+    )
+    tipo = _arreglo(tipo, "U20")
+    atencion = _arreglo(atencion, "U20")
+    semanas = _arreglo(semanas)
+    robson = _arreglo(robson, int)
+    cesarea = np.isin(tipo, CESAREAS)
+
+    apgar_1, apgar_5, peso, talla = (
+        _arreglo(columna) for columna in _columnas(rns, "apgar_1", "apgar_5", Cast("peso", FloatField()), "talla")
+    )
+
+    return {
+        "rango": {"inicio": inicio.isoformat() if inicio else None, "fin": fin.isoformat() if fin else None},
+        "partos": len(tipo),
+        "recien_nacidos": len(peso),
+        "cesareas": {
+            "total": int(cesarea.sum()),
+            "tasa": round(100 * float(cesarea.mean()), 1) if len(cesarea) else None,
+            "por_tipo_atencion": _tasas(atencion, cesarea, [valor for valor, _ in Parto.TIPO_ATENCION]),
+            "por_grupo_robson": _tasas(robson, cesarea, [*GRUPOS_ROBSON, 0]),
+        },
+        "edad_gestacional": {**_resumen(semanas), "histograma": _histograma_entero(semanas, 20, 45)},
+        "apgar_1": {**_resumen(apgar_1), "histograma": _histograma_entero(apgar_1, 0, 10)},
+        "apgar_5": {**_resumen(apgar_5), "histograma": _histograma_entero(apgar_5, 0, 10)},
+        "peso": {**_resumen(peso), "histograma": _histograma(peso, BORDES_PESO)},
+        "talla": {**_resumen(talla), "histograma": _histograma(talla, BORDES_TALLA)},
+    }
+
+
+def estadisticas_cohorte(inicio=None, fin=None):
+    """Estadísticas del rango (fechas de parto), desde caché si los datos no cambiaron."""
+    version = generacion()
+    clave = f"GeneradorReporte:estadisticas:{inicio}:{fin}:{version}"
+    datos = cache.get(clave)
+    if datos is None:
+        with lectura_primario():
+            datos = {**calcular_estadisticas(inicio, fin), "version": version}
+        cache.set(clave, datos, getattr(settings, "ESTADISTICAS_CACHE_TTL", 3600))
+    return datos
@@ -0,0 +1,621 @@
+from decimal import Decimal
+
+from django.db.models import Count
+from openpyxl import Workbook
+from openpyxl.styles import Font, Alignment, Border, Side
+
+from neonatos.crecimiento import PERCENTIL_GEG, PERCENTIL_PEG, resumen_clasificacion, ruta_tabla
+from neonatos.models import PercentilRN, RecienNacido
+from .utils import robson_expresion, split_rut_dv
+
+# ===========================
+# GENERACIÓN DE LIBROS EXCEL
+# ===========================
+# Este módulo importa openpyxl: no se importa directamente desde las vistas,
+# se carga al primer uso a través de GeneradorReporte.exportadores.
+
+# --- Excel generation --- #
+
+def build_rem_sheet(wb: Workbook, partidas_qs):
+    """
+    REM: contadores para las filas solicitadas.
+    partidas_qs: queryset de Parto
+    """
+    ws = wb.create_sheet("REM")
+    bold = Font(bold=True)
+    center = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    thin = Side(border_style="thin", color="000000")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    # ---------------------------
+    # ENCABEZADO (mantener la estética que pediste)
+    # ---------------------------
+    ws.merge_cells("A1:A3")
+    ws["A1"] = "CARACTERÍSTICAS DEL PARTO"
+    ws["A1"].font = bold
+    ws["A1"].alignment = center
+    ws["A1"].border = border
+
+    ws.merge_cells("B1:B3")
+    ws["B1"] = "TOTAL"
+    ws["B1"].font = bold
+    ws["B1"].alignment = center
+    ws["B1"].border = border
+
+    # Partos según edad (C-F)
+    ws.merge_cells("C1:F1")
+    ws["C1"] = "PARTOS SEGÚN EDAD DE LA MADRE"
+    ws["C1"].font = bold
+    ws["C1"].alignment = center
+    ws["C1"].border = border
+
+    edades = ["<15 AÑOS", "15 A 19 AÑOS", "20 A 34 AÑOS", "≥35 AÑOS"]
+    col = 3
+    for e in edades:
+        ws.merge_cells(start_row=2, start_column=col, end_row=3, end_column=col)
+        cell = ws.cell(row=2, column=col, value=e)
+        cell.font = bold
+        cell.alignment = center
+        cell.border = border
+        col += 1
+
+    # Partos prematuros (G-J)
+    ws.merge_cells("G1:J1")
+    ws["G1"] = "PARTOS PREMATUROS (>22 semanas)"
+    ws["G1"].font = bold
+    ws["G1"].alignment = center
+    ws["G1"].border = border
+
+    prematuros = [
+        "Menos de 24 semanas",
+        "24 a 28 semanas",
+        "29 a 32 semanas",
+        "33 a 36 semanas",
+    ]
+    for p in prematuros:
+        ws.merge_cells(start_row=2, start_column=col, end_row=3, end_column=col)
+        c = ws.cell(row=2, column=col, value=p)
+        c.font = bold
+        c.alignment = center
+        c.border = border
+        col += 1
+
+    # Oxitocina profiláctica (K)
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Uso de oxitocina profiláctica").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    col += 1
+
+    # Analgesias (L-Q) 6 columnas
+    ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col+5)
+    ws.cell(row=1, column=col, value="Anestesia y/o Analgesia").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+
+    analgesias = [
+        ("neuroaxial", "Neuroaxial"),
+        ("oxido_nitroso", "Óxido nitroso"),
+        ("endovenosa", "Endovenosa"),
+        ("general", "General"),
+        ("local", "Local"),
+        ("no_farmacologica", "No farmacológica"),
+    ]
+    analg_start_col = col
+    for key, label in analgesias:
+        ws.merge_cells(start_row=2, start_column=col, end_row=3, end_column=col)
+        c = ws.cell(row=2, column=col, value=label)
+        c.font = bold
+        c.alignment = center
+        c.border = border
+        col += 1
+
+    # Ligadura tardía del cordón (si no hay campo, lo dejamos en 0)
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Ligadura tardía del cordón (>60 seg)").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    cordon_col = col
+    col += 1
+
+    # Contacto piel a piel >30 min (Madre) — ocupará 4 columnas (S..V por ejemplo)
+    piel_start = col
+    ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col+3)
+    ws.cell(row=1, column=col, value="Contacto piel a piel >30 min (Madre)").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+
+    # Subencabezados (RN ≤ 2.499g y RN ≥ 2.500g), cada uno ocupará 2 columnas (para estética)
+    # Escribimos el texto en la esquina superior izquierda del merge.
+    ws.merge_cells(start_row=2, start_column=col, end_row=3, end_column=col+1)
+    ws.cell(row=2, column=col, value="RN peso ≤ 2.499g").font = bold
+    ws.cell(row=2, column=col).alignment = center
+    ws.cell(row=2, column=col).border = border
+
+    ws.merge_cells(start_row=2, start_column=col+2, end_row=3, end_column=col+3)
+    ws.cell(row=2, column=col+2, value="RN peso ≥ 2.500g").font = bold
+    ws.cell(row=2, column=col+2).alignment = center
+    ws.cell(row=2, column=col+2).border = border
+
+    piel_le_col = col
+    piel_ge_col = col + 2
+    col += 4
+
+    # Lactancia 60 min
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Lactancia primeros 60 min").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    lact_col = col
+    col += 1
+
+    # Alojamiento conjunto
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Alojamiento conjunto").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    alojamiento_col = col
+    col += 1
+
+    # Pertinencia cultural (campo no existe en tu modelo -> 0)
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Atención con pertinencia cultural").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    cultural_col = col
+    col += 1
+
+    # Pueblos originarios
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Pueblos originarios").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    pueblos_col = col
+    col += 1
+
+    # Migrantes
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Migrantes").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    migrantes_col = col
+    col += 1
+
+    # Discapacidad
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Discapacidad").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    disc_col = col
+    col += 1
+
+    # Privada de libertad
+    ws.merge_cells(start_row=1, start_column=col, end_row=3, end_column=col)
+    ws.cell(row=1, column=col, value="Privada de libertad").font = bold
+    ws.cell(row=1, column=col).alignment = center
+    ws.cell(row=1, column=col).border = border
+    privada_col = col
+    col += 1
+
+    # ---------------------------
+    # Ahora las filas (tu lista original)
+    # ---------------------------
+    rows = [
+        "TOTAL PARTOS",
+        "VAGINAL",
+        "INSTRUMENTAL",
+        "CESÁREA ELECTIVA",
+        "CESÁREA URGENCIA",
+        "PARTO PREHOSPITALARIO",
+        "Plan de parto",
+        "ENTREGA DE PLACENTA A SOLICITUD",
+        "EMBARAZO NO CONTROLADO",
+        "PARTO EN DOMICILIO - CON ATENCIÓN PROFESIONAL",
+        "PARTO EN DOMICILIO - SIN ATENCIÓN PROFESIONAL",
+    ]
+
+    start_row = 4
+
+    # Helper: devolver queryset de partos según fila (label)
+    def qs_por_fila(label):
+        if label == "TOTAL PARTOS":
+            return partidas_qs
+        if label == "VAGINAL":
+            return partidas_qs.filter(tipo_parto="vaginal")
+        if label == "INSTRUMENTAL":
+            return partidas_qs.filter(tipo_parto="instrumental")
+        if label == "CESÁREA ELECTIVA":
+            return partidas_qs.filter(tipo_parto="cesarea_electiva")
+        if label == "CESÁREA URGENCIA":
+            return partidas_qs.filter(tipo_parto="cesarea_urgencia")
+        if label == "PARTO PREHOSPITALARIO":
+            return partidas_qs.filter(tipo_parto="prehospitalario")
+        if label == "Plan de parto":
+            return partidas_qs.filter(plan_parto=True)
+        if label == "ENTREGA DE PLACENTA A SOLICITUD":
+            # no hay campo → devolvemos empty queryset
+            return partidas_qs.none()
+        if label == "EMBARAZO NO CONTROLADO":
+            return partidas_qs.filter(madre__controles_prenatales=False)
+        if label == "PARTO EN DOMICILIO - CON ATENCIÓN PROFESIONAL":
+            return partidas_qs.filter(tipo_parto="domicilio", registrado_por__isnull=False)
+        if label == "PARTO EN DOMICILIO - SIN ATENCIÓN PROFESIONAL":
+            return partidas_qs.filter(tipo_parto="domicilio", registrado_por__isnull=True)
+        return partidas_qs.none()
+
+    # Recorremos filas y escribimos datos por columna
+    r = start_row
+    for label in rows:
+        qs = qs_por_fila(label)
+
+        # Etiqueta
+        cell_label = ws.cell(row=r, column=1, value=label)
+        cell_label.font = bold
+        cell_label.alignment = center
+        cell_label.border = border
+
+        # TOTAL
+        total_cell = ws.cell(row=r, column=2, value=qs.count())
+        total_cell.alignment = center
+        total_cell.border = border
+
+        # EDADES C-F (columnas 3..6)
+        # <15, 15-19, 20-34, >=35
+        edades_filters = [
+            ("lt", {"madre__edad__lt": 15}),
+            ("15_19", {"madre__edad__gte": 15, "madre__edad__lte": 19}),
+            ("20_34", {"madre__edad__gte": 20, "madre__edad__lte": 34}),
+            ("ge35", {"madre__edad__gte": 35}),
+        ]
+        col_e = 3
+        for name, f in edades_filters:
+            cnt = qs.filter(**f).count()
+            c = ws.cell(row=r, column=col_e, value=cnt)
+            c.alignment = center
+            c.border = border
+            col_e += 1
+
+        # PREMATUROS G-J (col actual after ages)
+        # "Menos de 24 semanas", "24 a 28", "29 a 32", "33 a 36"
+        prem_filters = [
+            {"edad_gestacional__lt": 24},
+            {"edad_gestacional__gte": 24, "edad_gestacional__lte": 28},
+            {"edad_gestacional__gte": 29, "edad_gestacional__lte": 32},
+            {"edad_gestacional__gte": 33, "edad_gestacional__lte": 36},
+        ]
+        col_p = 7
+        for f in prem_filters:
+            cnt = qs.filter(**f).count()
+            c = ws.cell(row=r, column=col_p, value=cnt)
+            c.alignment = center
+            c.border = border
+            col_p += 1
+
+        # Oxitocina (col K = 11)
+        ox_col = 11
+        c = ws.cell(row=r, column=ox_col, value=qs.filter(oxitocina=True).count())
+        c.alignment = center
+        c.border = border
+
+        # ANALGESIAS L-Q (cols 12..17)
+        anal_col = analg_start_col
+        for key, label_txt in analgesias:
+            cnt = qs.filter(analgesia=key).count()
+            c = ws.cell(row=r, column=anal_col, value=cnt)
+            c.alignment = center
+            c.border = border
+            anal_col += 1
+
+        # Ligadura cordón (col cordon_col)
+        # Si no hay campo en el model -> dejar 0
+        try:
+            # si existiera un campo 'ligadura_tardia' en Parto:
+            cnt_cordon = qs.filter(ligadura_tardia=True).count()
+        except Exception:
+            cnt_cordon = 0
+        c = ws.cell(row=r, column=cordon_col, value=cnt_cordon)
+        c.alignment = center
+        c.border = border
+
+        # Contacto piel a piel >30 min (Madre)
+        # RN ≤ 2.499g  -> contamos partos que tengan al menos un RN con peso <= 2.499 y contacto_piel_piel True
+        cnt_piel_le = qs.filter(contacto_piel_piel=True, recien_nacidos__peso__lte=Decimal("2.499")).distinct().count()
+        c = ws.cell(row=r, column=piel_le_col, value=cnt_piel_le)
+        c.alignment = center
+        c.border = border
+
+        # Espacio extra dentro del merge (col piel_le_col+1) — ponemos la misma cifra para estética
+        c2 = ws.cell(row=r, column=piel_le_col+1, value=cnt_piel_le)
+        c2.alignment = center
+        c2.border = border
+
+        # RN ≥ 2.500g
+        cnt_piel_ge = qs.filter(contacto_piel_piel=True, recien_nacidos__peso__gte=Decimal("2.500")).distinct().count()
+        c3 = ws.cell(row=r, column=piel_ge_col, value=cnt_piel_ge)
+        c3.alignment = center
+        c3.border = border
+        c4 = ws.cell(row=r, column=piel_ge_col+1, value=cnt_piel_ge)
+        c4.alignment = center
+        c4.border = border
+
+        # Lactancia primeros 60 min -> campo no existe: 0 (si más tarde lo agregas cambia el filtro)
+        ws.cell(row=r, column=lact_col, value=0).alignment = center
+        ws.cell(row=r, column=lact_col).border = border
+
+        # Alojamiento conjunto
+        ws.cell(row=r, column=alojamiento_col, value=qs.filter(alojamiento_conjunto=True).count()).alignment = center
+        ws.cell(row=r, column=alojamiento_col).border = border
+
+        # Pertinencia cultural -> no existe -> 0
+        ws.cell(row=r, column=cultural_col, value=0).alignment = center
+        ws.cell(row=r, column=cultural_col).border = border
+
+        # Pueblos originarios -> contamos madre__pueblo_originario = True
+        ws.cell(row=r, column=pueblos_col, value=qs.filter(madre__pueblo_originario=True).distinct().count()).alignment = center
+        ws.cell(row=r, column=pueblos_col).border = border
+
+        # Migrantes -> madre__nacionalidad == "migrante"
+        ws.cell(row=r, column=migrantes_col, value=qs.filter(madre__nacionalidad__iexact="migrante").distinct().count()).alignment = center
+        ws.cell(row=r, column=migrantes_col).border = border
+
+        # Discapacidad -> madre__discapacidad == True
+        ws.cell(row=r, column=disc_col, value=qs.filter(madre__discapacidad=True).distinct().count()).alignment = center
+        ws.cell(row=r, column=disc_col).border = border
+
+        # Privada de libertad -> madre__privada_libertad == True
+        ws.cell(row=r, column=privada_col, value=qs.filter(madre__privada_libertad=True).distinct().count()).alignment = center
+        ws.cell(row=r, column=privada_col).border = border
+
+        r += 1
+
+    # ---------------------------
+    # Ajustes de ancho de columna (para que el texto no se corte)
+    # ---------------------------
+    # Establecemos anchos razonables (ajusta si quieres)
+    from openpyxl.utils import get_column_letter
+
+    for i in range(1, col):
+        letter = get_column_letter(i)
+
+        if i == 1:
+            ws.column_dimensions[letter].width = 40  # La columna A
+        else:
+            ws.column_dimensions[letter].width = 16  # Las demás
+
+
+def build_aps_sheet(wb: Workbook, start_date=None, end_date=None):
+    """
+    APS: una fila por RN (o por Parto si prefieres).
+    Campos solicitados: Fecha, Hora, Nombre, RUT, DV, Tipo de parto, Peso, Talla, Apgar1, Apgar5, APEGO (contacto piel a piel)
+    Opcional: filtrar por rango de fechas si start_date/end_date se pasan.
+    """
+    ws = wb.create_sheet("APS")
+    bold = Font(bold=True)
+    center = Alignment(horizontal="center")
+
+    headers = ["Fecha", "Hora", "Nombre madre", "RUT", "DV", "Tipo de parto", "Peso (kg)", "Talla (cm)", "Apgar 1", "Apgar 5", "Apego (piel a piel)"]
+    for c, h in enumerate(headers, start=1):
+        ws.cell(row=1, column=c, value=h).font = bold
+        ws.cell(row=1, column=c).alignment = center
+
+    # Query: todos los RN relacionados a partos en rango (si aplica)
+    rns = RecienNacido.objects.select_related("parto__madre", "parto").order_by("id")
+    if start_date:
+        rns = rns.filter(parto__fecha_parto__gte=start_date)
+    if end_date:
+        rns = rns.filter(parto__fecha_parto__lte=end_date)
+
+    row = 2
+    for rn in rns:
+        parto = rn.parto
+        madre = parto.madre
+        rut_raw = getattr(madre, "rut", "") or ""
+        rut_num, dv = split_rut_dv(rut_raw)
+        fecha = parto.fecha_parto
+        hora = getattr(parto, "hora_parto", None)
+        apego = "Sí" if parto.contacto_piel_piel else "No"
+
+        ws.cell(row=row, column=1, value=fecha.strftime("%Y-%m-%d") if fecha else "")
+        ws.cell(row=row, column=2, value=hora.strftime("%H:%M") if hora else "")
+        ws.cell(row=row, column=3, value=f"{madre.nombres} {madre.apellidos}")
+        ws.cell(row=row, column=4, value=rut_num)
+        ws.cell(row=row, column=5, value=dv)
+        ws.cell(row=row, column=6, value=parto.get_tipo_parto_display() if hasattr(parto, "get_tipo_parto_display") else parto.tipo_parto)
+        ws.cell(row=row, column=7, value=float(rn.peso) if rn.peso is not None else "")
+        ws.cell(row=row, column=8, value=float(rn.talla) if rn.talla is not None else "")
+        ws.cell(row=row, column=9, value=rn.apgar_1 if rn.apgar_1 is not None else "")
+        ws.cell(row=row, column=10, value=rn.apgar_5 if rn.apgar_5 is not None else "")
+        ws.cell(row=row, column=11, value=apego)
+        row += 1
+
+    thin = Side(border_style="thin", color="000000")
+
+    for r in range(1, row):   # desde fila 1 hasta última fila escrita
+        for c in range(1, len(headers) + 1):
+            ws.cell(row=r, column=c).border = Border(
+                left=thin, right=thin, top=thin, bottom=thin
+            )
+    
+    # Ajustes de ancho
+    for col in range(1, len(headers) + 1):
+        ws.column_dimensions[ws.cell(row=1, column=col).column_letter].width = 18
+
+def build_robson_sheet(wb: Workbook, partidas_qs):
+    """
+    ROBSON: contadores por grupo 1..10, separando Programada vs Urgencia (tipo_atencion).
+    Devuelve una tabla simple con grupos en filas y dos columnas (Programada, Urgencia).
+    """
+    ws = wb.create_sheet("ROBSON")
+    bold = Font(bold=True)
+    center = Alignment(horizontal="center")
+
+    headers = ["Grupo Robson", "Descripción (resumen)", "Programada", "Urgencia", "Total"]
+    for c, h in enumerate(headers, start=1):
+        ws.cell(row=1, column=c, value=h).font = bold
+        ws.cell(row=1, column=c).alignment = center
+
+    descriptions = {
+        1: "Nulípara, único, cefálica, >=37, espontáneo (vaginal)",
+        2: "Nulípara, único, cefálica, >=37, inducción o cesárea",
+        3: "Multípara sin cesárea previa, único, cefálica, >=37, espontáneo",
+        4: "Multípara sin cesárea previa, único, cefálica, >=37, inducción/cesárea",
+        5: "Multípara con ≥1 cesárea previa, único, cefálica, ≥37",
+        6: "Nulípara, único, podálica",
+        7: "Multípara, único, podálica",
+        8: "Embarazo múltiple",
+        9: "Presentación transversa/oblicua",
+        10: "Único, cefálica, <37 semanas",
+    }
+
+    thin = Side(border_style="thin", color="000000")
+    row = 2
+    totals = {"programada": 0, "urgencia": 0, "total": 0}
+    # Una sola consulta: la base agrupa por grupo (utils.robson_expresion) y tipo de atención
+    conteos = {
+        (fila["grupo"], fila["tipo_atencion"]): fila["n"]
+        for fila in partidas_qs.order_by().annotate(grupo=robson_expresion()).values("grupo", "tipo_atencion").annotate(n=Count("id"))
+    }
+    for group in range(1, 11):
+        prog = conteos.get((group, "programada"), 0)
+        urg = sum(n for (g, atencion), n in conteos.items() if g == group and atencion != "programada")
+
+        total_g = prog + urg
+        totals["programada"] += prog
+        totals["urgencia"] += urg
+        totals["total"] += total_g
+
+        ws.cell(row=row, column=1, value=f"Grupo {group}")
+        ws.cell(row=row, column=2, value=descriptions.get(group, ""))
+        ws.cell(row=row, column=3, value=prog)
+        ws.cell(row=row, column=4, value=urg)
+        ws.cell(row=row, column=5, value=total_g)
+        # formato
+        ws.cell(row=row, column=1).font = bold
+        for c in range(1, 6):
+            ws.cell(row=row, column=c).border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        row += 1
+
+    # Totales al final
+    ws.cell(row=row, column=2, value="Totales").font = bold
+    ws.cell(row=row, column=3, value=totals["programada"]).font = bold
+    ws.cell(row=row, column=4, value=totals["urgencia"]).font = bold
+    ws.cell(row=row, column=5, value=totals["total"]).font = bold
+
+    thin = Side(border_style="thin", color="000000")
+
+    for r in range(1, row):   # desde fila 1 hasta última fila escrita
+        for c in range(1, len(headers) + 1):
+            ws.cell(row=r, column=c).border = Border(
+                left=thin, right=thin, top=thin, bottom=thin
+            )
+
+    # ajustar ancho
+    ws.column_dimensions["A"].width = 14
+    ws.column_dimensions["B"].width = 60
+    ws.column_dimensions["C"].width = 12
+    ws.column_dimensions["D"].width = 12
+    ws.column_dimensions["E"].width = 12
+
+
+def build_crecimiento_sheet(wb: Workbook, partidas_qs):
+    """
+    CRECIMIENTO: RN pequeños, adecuados y grandes para la edad gestacional
+    (percentil de peso al nacer), por sexo y por término.
+    """
+    ws = wb.create_sheet("CRECIMIENTO")
+    bold = Font(bold=True)
+    center = Alignment(horizontal="center")
+    thin = Side(border_style="thin", color="000000")
+
+    headers = ["Clasificación", "Femenino", "Masculino", "Pretérmino (<37 sem)", "Término (≥37 sem)", "Total", "%"]
+    for c, h in enumerate(headers, start=1):
+        ws.cell(row=1, column=c, value=h).font = bold
+        ws.cell(row=1, column=c).alignment = center
+
+    resumen = resumen_clasificacion(RecienNacido.objects.filter(parto__in=partidas_qs.values("id")))
+    total_rn = sum(fila["total"] for fila in resumen.values())
+    etiquetas = {
+        PercentilRN.PEG: f"PEG (< p{PERCENTIL_PEG})",
+        PercentilRN.AEG: f"AEG (p{PERCENTIL_PEG}-p{PERCENTIL_GEG})",
+        PercentilRN.GEG: f"GEG (> p{PERCENTIL_GEG})",
+        "": "Sin clasificar (sin peso o EG fuera de tabla)",
+    }
+
+    row = 2
+    for clase, fila in resumen.items():
+        valores = [etiquetas[clase], fila["F"], fila["M"], fila["pretermino"], fila["termino"], fila["total"],
+                   round(100 * fila["total"] / total_rn, 1) if total_rn else 0]
+        for c, valor in enumerate(valores, start=1):
+            ws.cell(row=row, column=c, value=valor).border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        ws.cell(row=row, column=1).font = bold
+        row += 1
+
+    ws.cell(row=row, column=1, value="Total RN").font = bold
+    ws.cell(row=row, column=6, value=total_rn).font = bold
+    ws.cell(row=row + 2, column=1, value=f"Tabla de referencia: {ruta_tabla().name}")
+
+    ws.column_dimensions["A"].width = 44
+    for letter in "BCDEFG":
+        ws.column_dimensions[letter].width = 18
+
+
+# --- Libros completos por reporte --- #
+
+def libro_bs22(partos, start_date=None, end_date=None):
+    wb = Workbook()
+    wb.remove(wb.active)  # quitar hoja por defecto
+
+    build_rem_sheet(wb, partos)
+    build_aps_sheet(wb, start_date=start_date, end_date=end_date)
+    build_robson_sheet(wb, partos)
+    if ruta_tabla() is not None:
+        build_crecimiento_sheet(wb, partos)
+    return wb
+
+
+def libro_rem_a09(partos):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "REM A09 - Egresos"
+
+    ws.append(["Fecha", "Madre", "Tipo de parto", "Edad gestacional", "Complicaciones", "Nacidos vivos", "Registrado por"])
+
+    for parto in partos:
+        registrado_por = ""
+        if parto.registrado_por:
+            registrado_por = parto.registrado_por.nombre  # usa el campo nombre del modelo Usuario
+
+        ws.append([
+            parto.fecha_parto,
+            f"{parto.madre.nombres} {parto.madre.apellidos}",
+            parto.get_tipo_parto_display(),
+            parto.edad_gestacional or "",
+            "Sí" if parto.complicaciones else "No",
+            parto.recien_nacidos.count(),
+            registrado_por
+        ])
+    return wb
+
+
+def libro_rem_a04(rn):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "REM A04 - Defunciones"
+
+    ws.append(["Fecha parto", "Madre", "Edad madre", "Comuna", "Sexo RN", "Tipo fallecimiento", "Matrona responsable"])
+
+    for r in rn:
+        matrona = ""
+        if r.parto.registrado_por:
+            matrona = r.parto.registrado_por.nombre  # usa el campo nombre del usuario
+
+        ws.append([
+            r.parto.fecha_parto,
+            f"{r.parto.madre.nombres} {r.parto.madre.apellidos}",
+            r.parto.madre.edad,
+            r.parto.madre.comuna,
+            r.get_sexo_display(),
+            r.get_tipo_fallecimiento_display() if r.tipo_fallecimiento else "",
+            matrona
+        ])
+    return wb
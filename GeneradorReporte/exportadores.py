@@ -0,0 +1,23 @@
+from django.utils.module_loading import import_string
+
+# ===========================
+# REGISTRO DE EXPORTADORES EXCEL
+# ===========================
+# Cada reporte apunta a la función que arma su libro. El módulo se importa
+# recién en la primera exportación: los workers y comandos que nunca exportan
+# no cargan openpyxl.
+
+EXPORTADORES = {
+    "bs22": "GeneradorReporte.excel.libro_bs22",
+    "a09": "GeneradorReporte.excel.libro_rem_a09",
+    "a04": "GeneradorReporte.excel.libro_rem_a04",
+}
+
+_cargados = {}
+
+
+def obtener_exportador(reporte):
+    """Devuelve la función que genera el libro del reporte, importándola al primer uso."""
+    if reporte not in _cargados:
+        _cargados[reporte] = import_string(EXPORTADORES[reporte])
+    return _cargados[reporte]
@@ -0,0 +1,122 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+from neonatos.generacion import generacion
+from neonatos.models import Parto, RecienNacido
+from rendimiento.replicas import lectura_primario
+from .utils import robson_expresion
+
+# ===========================
+# INDICADORES MENSUALES (KPI)
+# ===========================
+# Cada serie sale de una sola consulta agrupada por TruncMonth, en vez de una
+# exportación por mes. El conjunto se guarda en caché con la generación de los
+# datos clínicos en la clave (neonatos/generacion.py): cualquier escritura lo
+# invalida y mientras tanto el tablero no consulta la base.
+
+MESES_POR_DEFECTO = 12
+CESAREAS = ("cesarea_electiva", "cesarea_urgencia")
+
+
+def _inicio_mes(fecha):
+    return fecha.replace(day=1)
+
+
+def _sumar_meses(fecha, meses):
+    total = fecha.year * 12 + fecha.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def rango_por_defecto(hoy=None):
+    """Últimos MESES_POR_DEFECTO meses, incluido el actual."""
+    fin = _inicio_mes(hoy or date.today())
+    return _sumar_meses(fin, 1 - MESES_POR_DEFECTO), fin
+
+
+def _meses(inicio, fin):
+    meses, mes = [], _inicio_mes(inicio)
+    while mes <= fin:
+        meses.append(mes)
+        mes = _sumar_meses(mes, 1)
+    return meses
+
+
+def _mes(valor):
+    # TruncMonth sobre DateField devuelve date; algunos backends entregan datetime
+    return valor.date() if hasattr(valor, "date") else valor
+
+
+def _series(filas, meses, categorias, campo):
+    """{categoria: [n por mes]} a partir de filas (mes, categoria, n)."""
+    posicion = {mes: i for i, mes in enumerate(meses)}
+    series = {categoria: [0] * len(meses) for categoria in categorias}
+    for fila in filas:
+        i = posicion.get(_mes(fila["mes"]))
+        if i is not None and fila[campo] in series:
+            series[fila[campo]][i] = fila["n"]
+    return series
+
+
+def _tasa(parte, total):
+    return [round(100 * p / t, 1) if t else None for p, t in zip(parte, total)]
+
+
+def calcular_indicadores(inicio, fin):
+    """Series mensuales entre los meses de `inicio` y `fin` (ambos incluidos)."""
+    meses = _meses(inicio, fin)
+    partos = Parto.objects.filter(fecha_parto__gte=meses[0], fecha_parto__lt=_sumar_meses(meses[-1], 1))
+    partos = partos.annotate(mes=TruncMonth("fecha_parto"))
+
+    tipos = [valor for valor, _ in Parto.TIPO_PARTO]
+    por_tipo = _series(partos.values("mes", "tipo_parto").annotate(n=Count("id")), meses, tipos, "tipo_parto")
+    total = [sum(valores) for valores in zip(*por_tipo.values())]
+    cesareas = [sum(valores) for valores in zip(*(por_tipo[tipo] for tipo in CESAREAS))]
+
+    grupos = list(range(0, 11))
+    robson = _series(
+        partos.annotate(grupo=robson_expresion()).values("mes", "grupo").annotate(n=Count("id")),
+        meses, grupos, "grupo",
+    )
+
+    posicion = {mes: i for i, mes in enumerate(meses)}
+    piel = [0] * len(meses)
+    for fila in partos.values("mes").annotate(n=Count("id", filter=Q(contacto_piel_piel=True))):
+        piel[posicion[_mes(fila["mes"])]] = fila["n"]
+
+    fallecidos = RecienNacido.objects.filter(
+        fallecido=True, parto__fecha_parto__gte=meses[0], parto__fecha_parto__lt=_sumar_meses(meses[-1], 1),
+    ).annotate(mes=TruncMonth("parto__fecha_parto"))
+    tipos_fallecimiento = [valor for valor, _ in RecienNacido.TIPO_FALLECIMIENTO_CHOICES] + [None]
+    defunciones = _series(
+        fallecidos.values("mes", "tipo_fallecimiento").annotate(n=Count("id")),
+        meses, tipos_fallecimiento, "tipo_fallecimiento",
+    )
+
+    return {
+        "meses": [mes.isoformat() for mes in meses],
+        "partos_total": total,
+        "partos_por_tipo": {dict(Parto.TIPO_PARTO)[tipo]: serie for tipo, serie in por_tipo.items()},
+        "tasa_cesarea": _tasa(cesareas, total),
+        "robson": {(f"Grupo {grupo}" if grupo else "Sin grupo"): serie for grupo, serie in robson.items()},
+        "defunciones": {
+            (dict(RecienNacido.TIPO_FALLECIMIENTO_CHOICES).get(tipo) or "Sin tipo"): serie
+            for tipo, serie in defunciones.items()
+        },
+        "tasa_piel_a_piel": _tasa(piel, total),
+    }
+
+
+def indicadores_mensuales(inicio, fin):
+    """Como calcular_indicadores, desde caché mientras no haya escrituras nuevas."""
+    clave = f"GeneradorReporte:indicadores:{inicio:%Y-%m}:{fin:%Y-%m}:{generacion()}"
+    datos = cache.get(clave)
+    if datos is None:
+        # En el primario, como estadisticas_cohorte: la réplica podría no tener aún la escritura
+        with lectura_primario():
+            datos = calcular_indicadores(inicio, fin)
+        cache.set(clave, datos, getattr(settings, "INDICADORES_CACHE_TTL", 3600))
+    return datos
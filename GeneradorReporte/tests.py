@@ -1,3 +1,238 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, override_settings
+from openpyxl import Workbook, load_workbook
+
+from GeneradorReporte.estadisticas import calcular_estadisticas, estadisticas_cohorte
+from GeneradorReporte.excel import build_robson_sheet
+from GeneradorReporte.exportadores import obtener_exportador
+from GeneradorReporte.indicadores import calcular_indicadores, indicadores_mensuales
+from GeneradorReporte.models import Bitacora
+from GeneradorReporte.utils import robson_expresion
+from gestion_roles.models import Usuario
+from neonatos.models import Madre, Parto, RecienNacido
+from rendimiento.replicas import lectura_reportes
+
+
+class LecturaAsyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.supervisor = Usuario.objects.create_user("sup@x.cl", "Supervisor", "clave", rol="Supervisor")
+        madre = Madre.objects.create(rut="11111111-1", nombres="Ana", apellidos="Soto", edad=30, nacionalidad="chilena")
+        for fecha in ("2026-09-15", "2026-10-01"):
+            parto = Parto.objects.create(madre=madre, fecha_parto=fecha, tipo_parto="vaginal", tipo_atencion="programada")
+            RecienNacido.objects.create(parto=parto, sexo="F", peso="3.1", talla=49, fallecido=fecha == "2026-10-01")
+        Bitacora.objects.bulk_create([Bitacora(usuario=cls.supervisor, accion=f"Acción {i}") for i in range(55)])
+
+    def setUp(self):
+        cache.clear()
+        self.async_client.force_login(self.supervisor)
+
+    async def test_bitacora_por_paginas(self):
+        primera = await self.async_client.get("/reporte/bitacora/pagina/")
+        self.assertEqual(len(primera.context["logs"]), 50)
+        self.assertEqual(primera["X-Pagina-Siguiente"], "2")
+        segunda = await self.async_client.get("/reporte/bitacora/pagina/", {"page": 2})
+        self.assertEqual(segunda["X-Pagina-Siguiente"], "")
+
+    async def test_estado_reporte(self):
+        response = await self.async_client.get("/reporte/estado/", {"reporte": "a04", "inicio": "2026-09-20"})
+        self.assertEqual(response.json(), {"reporte": "a04", "partos": 1, "recien_nacidos": 1, "ultima_generacion": None})
+        response = await self.async_client.get("/reporte/estado/", {"reporte": "bs22"})
+        self.assertEqual((response.json()["partos"], response.json()["recien_nacidos"]), (2, 2))
+        self.assertEqual((await self.async_client.get("/reporte/estado/", {"reporte": "x"})).status_code, 400)
+
+    async def test_solo_supervisor(self):
+        matrona = await Usuario.objects.acreate(email="mat@x.cl", nombre="Matrona", rol="Matrona")
+        await self.async_client.aforce_login(matrona)
+        self.assertEqual((await self.async_client.get("/reporte/estado/")).status_code, 403)
+
+
+class ExportacionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.supervisor = Usuario.objects.create_user("sup@x.cl", "Supervisor", "clave", rol="Supervisor")
+        madre = Madre.objects.create(rut="11111111-1", nombres="Ana", apellidos="Soto", edad=30, nacionalidad="chilena")
+        parto = Parto.objects.create(madre=madre, fecha_parto="2026-10-01", tipo_parto="vaginal", tipo_atencion="programada")
+        RecienNacido.objects.create(parto=parto, sexo="F", peso="3.1", talla=49, fallecido=True)
+
+    def setUp(self):
+        self.client.force_login(self.supervisor)
+
+    def test_exportadores_se_cargan_una_vez(self):
+        self.assertIs(obtener_exportador("a09"), obtener_exportador("a09"))
+        self.assertEqual(obtener_exportador("bs22").__module__, "GeneradorReporte.excel")
+
+    def test_libros_excel(self):
+        urls = {
+            "/reporte/exportar/reporte_bs22/": "Generación de reporte REM Bs22",
+            "/reporte/exportar/rem_a09/": "Generación de reporte REM A09",
+            "/reporte/exportar/rem_a04/": "Generación de reporte REM A04",
+        }
+        for url, accion in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, {"inicio": "2026-10-01", "fin": "2026-10-31"})
+                self.assertEqual(response.status_code, 200)
+                libro = load_workbook(io.BytesIO(response.content))
+                self.assertGreater(sum(hoja.max_row for hoja in libro.worksheets), 1)
+                self.assertTrue(Bitacora.objects.filter(accion=accion).exists())
+
+    def test_hoja_crecimiento_solo_con_tabla_configurada(self):
+        params = {"inicio": "2026-10-01", "fin": "2026-10-31"}
+        with override_settings(CRECIMIENTO_TABLA=""):
+            response = self.client.get("/reporte/exportar/reporte_bs22/", params)
+        self.assertNotIn("CRECIMIENTO", load_workbook(io.BytesIO(response.content)).sheetnames)
+
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "fenton.csv")
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                archivo.write("sexo,semanas,medida,L,M,S\nF,37,peso,1,2.9,0.12\nF,41,peso,1,3.5,0.12\n")
+            with override_settings(CRECIMIENTO_TABLA=ruta):
+                response = self.client.get("/reporte/exportar/reporte_bs22/", params)
+        hoja = load_workbook(io.BytesIO(response.content))["CRECIMIENTO"]
+        # El RN del parto no tiene edad gestacional: queda sin clasificar
+        self.assertEqual(hoja.cell(row=5, column=6).value, 1)
+        self.assertEqual(hoja.cell(row=8, column=1).value, "Tabla de referencia: fenton.csv")
+
+    def test_arranque_sin_openpyxl(self):
+        salida = io.StringIO()
+        call_command("bench_importacion", presupuesto_ms=60000, stdout=salida)
+        self.assertIn("Dentro del presupuesto.", salida.getvalue())
+        with self.assertRaisesMessage(CommandError, "'django.urls' se importa al arrancar"):
+            call_command("bench_importacion", presupuesto_ms=60000, prohibido=["django.urls"], stdout=io.StringIO())
+
+
+class EstadisticasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.supervisor = Usuario.objects.create_user("sup@x.cl", "Supervisor", "clave", rol="Supervisor")
+        madre = Madre.objects.create(rut="11111111-1", nombres="Ana", apellidos="Soto", edad=30, nacionalidad="chilena")
+        casos = [
+            ("2026-09-30", "vaginal", "programada", 39, "3.0", 8),
+            ("2026-10-01", "vaginal", "programada", 40, "3.4", 9),
+            ("2026-10-02", "cesarea_urgencia", "urgencia", 38, "3.2", None),
+            ("2026-10-03", "cesarea_electiva", "programada", None, "2.6", 7),
+        ]
+        for fecha, tipo, atencion, semanas, peso, apgar in casos:
+            parto = Parto.objects.create(madre=madre, fecha_parto=fecha, tipo_parto=tipo, tipo_atencion=atencion,
+                                         edad_gestacional=semanas)
+            RecienNacido.objects.create(parto=parto, sexo="F", peso=peso, talla=49, apgar_1=apgar)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rango_tasas_y_distribuciones(self):
+        datos = calcular_estadisticas(date(2026, 10, 1), date(2026, 10, 31))
+        self.assertEqual((datos["partos"], datos["recien_nacidos"]), (3, 3))
+        self.assertEqual((datos["cesareas"]["total"], datos["cesareas"]["tasa"]), (2, 66.7))
+        programada, urgencia = datos["cesareas"]["por_tipo_atencion"]
+        self.assertEqual((programada["n"], programada["cesareas"], programada["tasa"], programada["contribucion"]), (2, 1, 50.0, 50.0))
+        self.assertEqual((urgencia["n"], urgencia["tasa"]), (1, 100.0))
+        # Los nulos no cuentan en n, promedio ni histograma
+        self.assertEqual(datos["edad_gestacional"]["n"], 2)
+        self.assertEqual(datos["apgar_1"]["promedio"], 8.0)
+        self.assertEqual(sum(datos["apgar_1"]["histograma"]["conteos"]), 2)
+        self.assertEqual(datos["peso"]["cuantiles"]["p50"], 3.2)
+        self.assertEqual(sum(datos["peso"]["histograma"]["conteos"]), 3)
+
+    def test_cohorte_vacia(self):
+        datos = calcular_estadisticas(date(2030, 1, 1), None)
+        self.assertEqual((datos["partos"], datos["cesareas"]["tasa"]), (0, None))
+        self.assertEqual(datos["peso"], {"n": 0, "promedio": None, "cuantiles": {}, "histograma": datos["peso"]["histograma"]})
+
+    def test_endpoint_solo_supervisor(self):
+        self.client.force_login(self.supervisor)
+        response = self.client.get("/reporte/estadisticas.json", {"inicio": "2026-10-01"})
+        self.assertEqual(response.json()["partos"], 3)
+        self.assertEqual(self.client.get("/reporte/estadisticas.json", {"inicio": "no-es-fecha"}).json()["partos"], 4)
+        matrona = Usuario.objects.create_user("mat@x.cl", "Matrona", "clave", rol="Matrona")
+        self.client.force_login(matrona)
+        self.assertEqual(self.client.get("/reporte/estadisticas.json").status_code, 403)
+
+
+class EstadisticasCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.madre = Madre.objects.create(rut="11111111-1", nombres="Ana", apellidos="Soto", edad=30, nacionalidad="chilena")
+
+    def test_lectura_en_cache_no_consulta_la_base(self):
+        estadisticas_cohorte()
+        with self.assertNumQueries(0):
+            estadisticas_cohorte()
+
+    def test_escritura_invalida_la_cache(self):
+        self.assertEqual(estadisticas_cohorte()["partos"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Parto.objects.create(madre=self.madre, fecha_parto="2026-10-01", tipo_parto="vaginal", tipo_atencion="programada")
+        self.assertEqual(estadisticas_cohorte()["partos"], 1)
+
+    def test_se_calcula_en_el_primario_aunque_la_vista_lea_de_la_replica(self):
+        # Sin alias "reportes" en pruebas: una lectura enviada a la réplica fallaría
+        @lectura_reportes
+        def vista(request):
+            return estadisticas_cohorte()["partos"], indicadores_mensuales(date(2026, 10, 1), date(2026, 10, 1))
+
+        with mock.patch("rendimiento.replicas.replica_configurada", return_value=True):
+            partos, indicadores = vista(RequestFactory().get("/"))
+        self.assertEqual((partos, indicadores["partos_total"]), (0, [0]))
+
+
+class RobsonTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.matrona = Usuario.objects.create_user("mat@x.cl", "Matrona", "clave", rol="Matrona")
+        cls.nulipara = Madre.objects.create(rut="11111111-1", nombres="Ana", apellidos="Soto", edad=30, nacionalidad="chilena")
+        cls.multipara = Madre.objects.create(
+            rut="22222222-2", nombres="Eva", apellidos="Paz", edad=34, nacionalidad="chilena",
+            paridad="multipara", cesareas_previas=1,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _parto(self, madre=None, **campos):
+        datos = {"fecha_parto": "2026-10-01", "tipo_parto": "vaginal", "tipo_atencion": "programada", "edad_gestacional": 39}
+        datos.update(campos)
+        return Parto.objects.create(madre=madre or self.nulipara, registrado_por=self.matrona, **datos)
+
+    def _grupo(self, parto):
+        return Parto.objects.annotate(grupo=robson_expresion()).get(pk=parto.pk).grupo
+
+    def test_grupos(self):
+        casos = [
+            (1, {}),
+            (1, {"presentacion_fetal": ""}),
+            (1, {"presentacion_fetal": None}),
+            (2, {"tipo_parto": "cesarea_urgencia"}),
+            (5, {"madre": self.multipara}),
+            (6, {"presentacion_fetal": "pelvica"}),
+            (8, {"embarazo_multiple": True}),
+            (9, {"presentacion_fetal": "transversa"}),
+            (10, {"edad_gestacional": 34, "presentacion_fetal": ""}),
+            (10, {"edad_gestacional": None}),
+        ]
+        for grupo, campos in casos:
+            with self.subTest(campos=campos):
+                self.assertEqual(self._grupo(self._parto(**campos)), grupo)
+
+    def test_presentacion_vacia_cuenta_igual_en_todos_los_reportes(self):
+        self._parto(presentacion_fetal="")
+        self._parto(presentacion_fetal="cefalica", tipo_atencion="urgencia")
+
+        robson = estadisticas_cohorte()["cesareas"]["por_grupo_robson"]
+        self.assertEqual({fila["categoria"]: fila["n"] for fila in robson if fila["n"]}, {1: 2})
+
+        meses = calcular_indicadores(date(2026, 10, 1), date(2026, 10, 1))
+        self.assertEqual(meses["robson"]["Grupo 1"], [2])
+        self.assertEqual(meses["robson"]["Sin grupo"], [0])
+
+        libro = Workbook()
+        build_robson_sheet(libro, Parto.objects.order_by("fecha_parto"))
+        hoja = libro["ROBSON"]
+        self.assertEqual([hoja.cell(row=2, column=c).value for c in (3, 4, 5)], [1, 1, 2])
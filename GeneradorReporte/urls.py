@@ -12,5 +12,10 @@ urlpatterns = [
     path('exportar/rem_a09/', views.exportar_rem_a09, name='exportar_rem_a09'),
     path('exportar/rem_a04/', views.exportar_rem_a04, name='exportar_rem_a04'),
     path('bitacora/', views.verBitacora, name='ver_bitacora'),
+    path('bitacora/pagina/', views.bitacora_pagina, name='bitacora_pagina'),
+    path('estado/', views.estado_reporte, name='estado_reporte'),
+    path('estadisticas/', views.vistaEstadisticas, name='estadisticas'),
+    path('estadisticas.json', views.estadisticas_json, name='estadisticas_json'),
+    path('indicadores/', views.vistaIndicadores, name='indicadores'),
     
 ]
@@ -1,3 +1,5 @@
+from django.db.models import Case, IntegerField, Q, Value, When
+
 from .models import Bitacora
 
 def registrar_evento(usuario, accion, detalle=""):
@@ -8,3 +10,56 @@ def registrar_evento(usuario, accion, detalle=""):
             accion=accion,
             detalle=detalle
         )
+
+
+# ===========================
+# UTILIDADES DE REPORTES (sin dependencias pesadas)
+# ===========================
+
+def split_rut_dv(rut_normalizado: str):
+    """Espera rut sin puntos y con guion o ya normalizado '12345678-9' o '123456789'"""
+    if "-" in rut_normalizado:
+        parts = rut_normalizado.split("-")
+        return parts[0], parts[1]
+    # si no tiene guion, asumir último carácter es DV
+    if len(rut_normalizado) > 1:
+        return rut_normalizado[:-1], rut_normalizado[-1]
+    return rut_normalizado, ""
+
+
+def robson_expresion():
+    """
+    Clasificación simplificada de Robson como expresión SQL (Case/When, gana la
+    primera regla que se cumple), para agrupar partos en la base: p. ej.
+    .annotate(grupo=robson_expresion()).values("grupo"). Es la única definición
+    de las reglas: la usan la hoja ROBSON, las estadísticas y el tablero.
+    Devuelve el grupo 1..10, o 0 si el parto no clasifica.
+      - paridad y cesáreas previas: madre.paridad, madre.cesareas_previas
+      - presentacion_fetal vacía (NULL o "") cuenta como cefálica
+      - edad_gestacional vacía cuenta como pretérmino (< 37 semanas)
+      - cesárea: tipo_parto cesarea_electiva o cesarea_urgencia
+    """
+    nulipara = Q(madre__paridad="nulipara")
+    multipara = Q(madre__paridad="multipara")
+    unico = Q(embarazo_multiple=False)
+    cefalica = Q(presentacion_fetal__in=("cefalica", "")) | Q(presentacion_fetal__isnull=True)
+    termino = Q(edad_gestacional__gte=37)
+    cesarea = Q(tipo_parto__in=("cesarea_electiva", "cesarea_urgencia"))
+    base = unico & cefalica & termino
+    reglas = [
+        nulipara & base & ~cesarea,                                           # 1: nulípara, espontáneo
+        nulipara & base,                                                      # 2: nulípara, inducción o cesárea
+        multipara & Q(madre__cesareas_previas=0) & base & ~cesarea,           # 3: multípara sin cesárea previa, espontáneo
+        multipara & Q(madre__cesareas_previas=0) & base,                      # 4: ídem, inducción o cesárea
+        multipara & Q(madre__cesareas_previas__gte=1) & base,                 # 5: multípara con cesárea previa
+        nulipara & Q(presentacion_fetal="pelvica") & unico,                   # 6: nulípara, podálica
+        multipara & Q(presentacion_fetal="pelvica") & unico,                  # 7: multípara, podálica
+        Q(embarazo_multiple=True),                                            # 8: embarazo múltiple
+        Q(presentacion_fetal="transversa"),                                   # 9: transversa u oblicua
+        cefalica & (Q(edad_gestacional__lt=37) | Q(edad_gestacional__isnull=True)) & unico,  # 10: pretérmino
+    ]
+    return Case(
+        *[When(regla, then=Value(grupo)) for grupo, regla in enumerate(reglas, start=1)],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
@@ -1,3 +1,15 @@
 from django.contrib import admin
 
+from .models import TokenAPI
+
 # Register your models here.
+
+@admin.register(TokenAPI)
+class TokenAPIAdmin(admin.ModelAdmin):
+    # Los tokens se emiten con "manage.py token_api": aquí solo se consultan o revocan
+    list_display = ("nombre", "usuario", "prefijo", "creado", "ultimo_uso", "activo")
+    list_filter = ("activo",)
+    readonly_fields = ("usuario", "nombre", "clave_hash", "prefijo", "creado", "ultimo_uso")
+
+    def has_add_permission(self, request):
+        return False
@@ -6,4 +6,5 @@ class GestionRolesConfig(AppConfig):
     name = 'gestion_roles'
 
     def ready(self):
+        import gestion_roles.checks
         import gestion_roles.signals
@@ -0,0 +1,20 @@
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.checks import Tags, Warning, register
+
+# ===========================
+# CHEQUEOS DE DESPLIEGUE (manage.py check --deploy)
+# ===========================
+
+@register(Tags.security, deploy=True)
+def revisar_limitador(app_configs, **kwargs):
+    # Solo Redis hace incr atómico entre procesos y no descarta claves al llenarse
+    if isinstance(caches["default"], RedisCache):
+        return []
+    return [Warning(
+        "El límite de intentos de login y OTP no es confiable con esta caché: "
+        "incr no es atómico entre workers y los contadores se pueden descartar "
+        "al llegar a MAX_ENTRIES.",
+        hint="Definir REDIS_URL en producción.",
+        id="gestion_roles.W001",
+    )]
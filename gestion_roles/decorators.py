@@ -1,23 +1,55 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.http import HttpResponseForbidden, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from gestion_roles.tokens import autenticar_token, token_de_cabecera
+
+
+def _rol_required(rol):
+    # Funciona con vistas sync y async; en las async el usuario se obtiene con request.auser()
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                if getattr(user, 'rol', None) != rol:
+                    return HttpResponseForbidden()
+                return await view_func(request, *args, **kwargs)
+        else:
+            def wrapper(request, *args, **kwargs):
+                if getattr(request.user, 'rol', None) != rol:
+                    return HttpResponseForbidden()
+                return view_func(request, *args, **kwargs)
+        return wraps(view_func)(wrapper)
+    return decorator
+
+
+matrona_required = _rol_required('Matrona')
+
+supervisor_required = _rol_required('Supervisor')
+
+administrador_required = _rol_required('Administrador')
+
 
-def matrona_required(view_func):
-    def wrapper(request, *args, **kwargs):
-        if request.user.rol != 'Matrona':
-            return HttpResponseForbidden()
-        return view_func(request, *args, **kwargs)
-    return wrapper
-
-def supervisor_required(view_func):
-    def wrapper(request, *args, **kwargs):
-        if request.user.rol != 'Supervisor':
-            return HttpResponseForbidden()
-        return view_func(request, *args, **kwargs)
-    return wrapper
-
-def administrador_required(view_func):
-    def wrapper(request, *args, **kwargs):
-        if request.user.rol != 'Administrador':
-            return HttpResponseForbidden()
-        return view_func(request, *args, **kwargs)
-    return wrapper
+def token_api_required(*roles):
+    """
+    Autenticación de la API por token ("Authorization: Bearer <token>"), sin
+    sesión ni cookies (por eso no aplica CSRF). El usuario del token queda en
+    request.user y debe tener uno de los roles indicados.
+    """
+    def decorator(view_func):
+        def wrapper(request, *args, **kwargs):
+            user = autenticar_token(token_de_cabecera(request))
+            if user is None:
+                return JsonResponse(
+                    {"error": "Token inválido o ausente."}, status=401, headers={"WWW-Authenticate": "Bearer"}
+                )
+            if user.rol not in roles:
+                return JsonResponse({"error": "El rol del usuario no permite esta operación."}, status=403)
+            request.user = user
+            return view_func(request, *args, **kwargs)
+        return csrf_exempt(wraps(view_func)(wrapper))
+    return decorator
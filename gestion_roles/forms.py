@@ -1,6 +1,5 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
 
 Usuario = get_user_model()
 
@@ -13,17 +12,16 @@ class UsuarioForm(forms.ModelForm):
 
     class Meta:
         model = Usuario
-        fields = ['nombre', 'email', 'rol', 'password']
+        # password no es campo del modelo en el formulario: en blanco no debe pisar el hash guardado
+        fields = ['nombre', 'email', 'rol']
 
-    def clean_email(self):
-        email = self.cleaned_data.get('email')
-        # Excluir el usuario actual al editar
-        qs = Usuario.objects.filter(email=email)
-        if self.instance.pk:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            raise ValidationError("Este correo ya está en uso.")
-        return email
+    MENSAJE_EMAIL_DUPLICADO = "Este correo ya está en uso."
+
+    def validate_unique(self):
+        # El único campo UNIQUE de Usuario es el email y lo garantiza la restricción
+        # de la BD: las vistas capturan IntegrityError al guardar en vez de hacer una
+        # consulta previa de existencia. Si se agrega otro campo único, validarlo aquí.
+        pass
 
     def save(self, commit=True):
         user = super().save(commit=False)
@@ -0,0 +1,104 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# ===========================
+# LÍMITE DE INTENTOS (LOGIN / OTP)
+# ===========================
+
+def ip_cliente(request):
+    """IP del cliente. Solo confía en X-Forwarded-For si el proxy de Render está configurado."""
+    if getattr(settings, "LIMITE_CONFIAR_PROXY", False):
+        reenviada = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if reenviada:
+            return reenviada.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+class LimitadorIntentos:
+    """
+    Contador por ventana fija guardado en caché, uno por clave (IP, email, usuario).
+
+    Cada ventana dura capacidad / recarga segundos y admite `capacidad`
+    intentos: el mismo ritmo sostenido que una cubeta de fichas de esos
+    parámetros. El conteo usa cache.add + cache.incr: con Redis ambos son
+    atómicos, así que intentos simultáneos nunca leen el mismo valor y una
+    ráfaga paralela no pasa del límite. La caché de archivos no lo garantiza
+    (incr lee y vuelve a escribir, y al llegar a MAX_ENTRIES descarta claves),
+    por eso en producción el limitador requiere Redis (gestion_roles.W001);
+    LocMem solo es atómica dentro de un proceso. El intento que excede la ventana bloquea la clave
+    `bloqueo_base` segundos; cada bloqueo siguiente dobla la espera hasta
+    `bloqueo_max` (retardo progresivo). El bloqueo se verifica antes de llamar
+    a authenticate(), así un ataque no consume CPU en el hash de contraseñas.
+    """
+
+    def __init__(self, nombre, capacidad, recarga, bloqueo_base, bloqueo_max):
+        self.nombre = nombre
+        self.capacidad = capacidad
+        self.recarga = recarga
+        self.bloqueo_base = bloqueo_base
+        self.bloqueo_max = bloqueo_max
+
+    @classmethod
+    def desde_settings(cls, nombre):
+        config = settings.LIMITES_INTENTOS[nombre]
+        return cls(nombre, **config)
+
+    @property
+    def duracion_ventana(self):
+        return self.capacidad / self.recarga
+
+    def _clave(self, tipo, clave):
+        return f"gestion_roles:limite:{self.nombre}:{tipo}:{clave}"
+
+    def _clave_ventana(self, clave, ahora):
+        return self._clave(f"ventana:{int(ahora // self.duracion_ventana)}", clave)
+
+    @staticmethod
+    def _contar(clave, vida):
+        """Incrementa y devuelve el contador de `clave`, creándolo si no existe."""
+        cache.add(clave, 0, vida)
+        try:
+            return cache.incr(clave)
+        except ValueError:
+            # Venció entre add e incr: este intento abre un contador nuevo
+            cache.add(clave, 1, vida)
+            return 1
+
+    def consumir(self, *claves):
+        """Registra un intento por clave. Devuelve los segundos de espera (0 = permitido)."""
+        return max((self._consumir(clave) for clave in claves if clave), default=0)
+
+    def _consumir(self, clave):
+        ahora = time.time()
+        bloqueado_hasta = cache.get(self._clave("bloqueo", clave))
+        if bloqueado_hasta and bloqueado_hasta > ahora:
+            return math.ceil(bloqueado_hasta - ahora)
+
+        intentos = self._contar(self._clave_ventana(clave, ahora), math.ceil(self.duracion_ventana))
+        if intentos <= self.capacidad:
+            return 0
+
+        if intentos == self.capacidad + 1:
+            # Solo el primer intento excedido escala el bloqueo, aunque lleguen varios a la vez
+            faltas = self._contar(self._clave("faltas", clave), self.bloqueo_max * 4) - 1
+            espera = min(self.bloqueo_base * 2 ** faltas, self.bloqueo_max)
+            cache.set(self._clave("bloqueo", clave), ahora + espera, espera)
+            return math.ceil(espera)
+
+        # Intentos posteriores de la misma ventana: esperan el bloqueo o el fin de la ventana
+        fin = cache.get(self._clave("bloqueo", clave)) or (ahora // self.duracion_ventana + 1) * self.duracion_ventana
+        return max(1, math.ceil(fin - ahora))
+
+    def reiniciar(self, *claves):
+        """Limpia la ventana actual, bloqueos y faltas (después de un ingreso correcto)."""
+        ahora = time.time()
+        cache.delete_many([
+            clave_cache
+            for clave in claves if clave
+            for clave_cache in (
+                self._clave_ventana(clave, ahora), self._clave("bloqueo", clave), self._clave("faltas", clave),
+            )
+        ])
@@ -0,0 +1,58 @@
+import time
+
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    get_hashers,
+)
+from django.core.management.base import BaseCommand
+
+
+def _pbkdf2_con(iteraciones):
+    return type(f"PBKDF2x{iteraciones}", (PBKDF2PasswordHasher,), {"iterations": iteraciones})()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide en este equipo el costo de verificar una contraseña con el hasher configurado "
+        "y con alternativas, para dimensionar LIMITES_INTENTOS y PASSWORD_HASHERS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rondas", type=int, default=5, help="Verificaciones por hasher.")
+
+    def handle(self, *args, **options):
+        rondas = options["rondas"]
+        configurado = get_hashers()[0]
+
+        candidatos = [
+            ("configurado: " + configurado.algorithm, configurado),
+            ("pbkdf2_sha256 (1.000.000 it.)", _pbkdf2_con(1_000_000)),
+            ("pbkdf2_sha256 (600.000 it.)", _pbkdf2_con(600_000)),
+            ("pbkdf2_sha256 (260.000 it.)", _pbkdf2_con(260_000)),
+            ("scrypt", ScryptPasswordHasher()),
+            ("bcrypt_sha256", BCryptSHA256PasswordHasher()),
+            ("argon2", Argon2PasswordHasher()),
+        ]
+
+        self.stdout.write(f"{'Hasher':<36}{'ms/verificación':>18}{'verif./s por núcleo':>22}")
+        for nombre, hasher in candidatos:
+            try:
+                codificado = hasher.encode("Contraseña-de-prueba-123", hasher.salt())
+            except (ValueError, ImportError):
+                # bcrypt y argon2 son opcionales (requieren su paquete instalado)
+                self.stdout.write(f"{nombre:<36}{'no disponible':>18}")
+                continue
+
+            inicio = time.perf_counter()
+            for _ in range(rondas):
+                hasher.verify("clave-incorrecta", codificado)
+            ms = (time.perf_counter() - inicio) * 1000 / rondas
+            self.stdout.write(f"{nombre:<36}{ms:>18.1f}{1000 / ms:>22.1f}")
+
+        self.stdout.write(
+            "Cada intento fallido de login cuesta una verificación; con LIMITES_INTENTOS['login'] "
+            "el peor caso por IP queda acotado a capacidad + recarga * segundos."
+        )
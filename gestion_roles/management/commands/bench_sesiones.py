@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.utils.module_loading import import_string
+
+from gestion_roles import sesiones
+from gestion_roles.sesiones import SesionBajaEscrituraMiddleware
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara cuántas veces se persiste la sesión con SESSION_SAVE_EVERY_REQUEST "
+        "frente a SesionBajaEscrituraMiddleware, simulando una jornada de navegación."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Cantidad de requests simulados.")
+        parser.add_argument("--cada", type=float, default=5.0, help="Segundos simulados entre requests.")
+        parser.add_argument("--engine", default=settings.SESSION_ENGINE, help="SESSION_ENGINE a medir.")
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        cada = options["cada"]
+        engine = options["engine"]
+
+        with override_settings(SESSION_ENGINE=engine, SESSION_SAVE_EVERY_REQUEST=True):
+            antes = self._simular(SessionMiddleware, total, cada)
+        with override_settings(SESSION_ENGINE=engine, SESSION_SAVE_EVERY_REQUEST=False):
+            despues = self._simular(SesionBajaEscrituraMiddleware, total, cada)
+
+        self.stdout.write(f"Engine: {engine}")
+        self.stdout.write(f"Requests simulados: {total} (uno cada {cada:g} s)")
+        self.stdout.write(f"Escrituras con SESSION_SAVE_EVERY_REQUEST: {antes} ({antes / total:.2f} por request)")
+        self.stdout.write(
+            f"Escrituras con SesionBajaEscrituraMiddleware "
+            f"(SESSION_REFRESH_INTERVAL={settings.SESSION_REFRESH_INTERVAL}): {despues} ({despues / total:.2f} por request)"
+        )
+        if antes:
+            self.stdout.write(self.style.SUCCESS(f"Reducción: {100 * (1 - despues / antes):.1f}%"))
+
+    def _simular(self, middleware_class, total, cada):
+        store_class = import_string(settings.SESSION_ENGINE + ".SessionStore")
+        guardar_original = store_class.save
+        escrituras = 0
+
+        def guardar_contando(store, *args, **kwargs):
+            nonlocal escrituras
+            escrituras += 1
+            return guardar_original(store, *args, **kwargs)
+
+        factory = RequestFactory()
+        reloj = mock.Mock()
+        middleware = middleware_class(lambda request: HttpResponse("ok"))
+        cookie = None
+
+        with mock.patch.object(store_class, "save", guardar_contando), mock.patch.object(sesiones, "time", reloj):
+            for i in range(total):
+                reloj.time.return_value = 1_000_000 + i * cada
+                request = factory.get("/home/")
+                if cookie:
+                    request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+                middleware.process_request(request)
+                if i == 0:
+                    # Primer request: equivale al login, que siempre escribe la sesión
+                    request.session[SESSION_KEY] = "1"
+                else:
+                    # Lo que hace el middleware de autenticación en cada página
+                    request.session.get(SESSION_KEY)
+                response = middleware.process_response(request, middleware.get_response(request))
+                if settings.SESSION_COOKIE_NAME in response.cookies:
+                    cookie = response.cookies[settings.SESSION_COOKIE_NAME].value
+
+            # No dejar sesiones de prueba en el almacenamiento
+            if cookie:
+                store_class(cookie).delete()
+
+        return escrituras
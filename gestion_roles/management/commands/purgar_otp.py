@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gestion_roles.models import CodigoOTP
+
+
+class Command(BaseCommand):
+    help = "Elimina los códigos OTP vencidos o usados. Pensado para ejecutarse periódicamente (cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horas", type=int, default=24,
+            help="Conservar los códigos cuyo vencimiento sea más reciente que estas horas.",
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(hours=options["horas"])
+        # Los códigos usados también tienen valido_hasta: basta el índice sobre esa columna
+        borrados, _ = CodigoOTP.objects.filter(valido_hasta__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"Códigos OTP eliminados: {borrados}"))
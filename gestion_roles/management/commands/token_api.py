@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion_roles.models import TokenAPI
+from gestion_roles.tokens import emitir_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Emite, lista o revoca tokens de la API JSON (/api/v1/). El token hereda el rol del "
+        "usuario: Matrona puede leer y cargar datos, Supervisor solo leer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", help="Usuario dueño del token (para emitir o listar).")
+        parser.add_argument("--nombre", default="HIS", help="Sistema que usará el token.")
+        parser.add_argument("--listar", action="store_true", help="Lista los tokens (del usuario, si se indica).")
+        parser.add_argument("--revocar", metavar="PREFIJO", help="Revoca los tokens con ese prefijo.")
+
+    def handle(self, *args, **options):
+        if options["revocar"]:
+            revocados = TokenAPI.objects.filter(prefijo=options["revocar"], activo=True).update(activo=False)
+            self.stdout.write(self.style.SUCCESS(f"Tokens revocados: {revocados}"))
+            return
+
+        if options["listar"]:
+            tokens = TokenAPI.objects.select_related("usuario").order_by("-creado")
+            if options["email"]:
+                tokens = tokens.filter(usuario__email=options["email"])
+            for token in tokens:
+                estado = "activo" if token.activo else "revocado"
+                uso = token.ultimo_uso.strftime("%Y-%m-%d %H:%M") if token.ultimo_uso else "nunca"
+                self.stdout.write(
+                    f"{token.prefijo}  {token.nombre:<20} {token.usuario.email:<30} {estado:<9} último uso: {uso}"
+                )
+            return
+
+        if not options["email"]:
+            raise CommandError("Indique --email para emitir un token.")
+        try:
+            usuario = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['email']}")
+
+        token, clave = emitir_token(usuario, options["nombre"])
+        self.stdout.write(f"Token para {usuario.email} ({usuario.rol}), guárdelo ahora: no se volverá a mostrar.")
+        self.stdout.write(clave)
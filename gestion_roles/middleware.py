@@ -0,0 +1,89 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, aget_user, get_user
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+# ===========================
+# CACHÉ DEL USUARIO AUTENTICADO
+# ===========================
+
+def _clave_usuario(user_id):
+    return f"gestion_roles:usuario:{user_id}"
+
+
+def invalidar_usuario_cache(*user_ids):
+    """Elimina de la caché los usuarios indicados (al guardar, eliminar o actualizar en lote)."""
+    cache.delete_many([_clave_usuario(pk) for pk in user_ids])
+
+
+def get_cached_user(request):
+    """
+    Igual que django.contrib.auth.get_user, pero guarda el usuario en caché
+    durante USUARIO_CACHE_TTL segundos. La entrada se indexa por id y guarda
+    el hash de autenticación de la sesión: si no coincide con el de la sesión
+    actual (cambio de contraseña) se ignora y se consulta la base de datos.
+    """
+    if not hasattr(request, "_cached_user"):
+        session = request.session
+        user_id = session.get(SESSION_KEY)
+        session_hash = session.get(HASH_SESSION_KEY)
+        user = None
+
+        if user_id is not None and session_hash and BACKEND_SESSION_KEY in session:
+            entrada = cache.get(_clave_usuario(user_id))
+            if entrada is not None and entrada[0] == session_hash:
+                user = entrada[1]
+
+        if user is None:
+            user = get_user(request)
+            if user.is_authenticated and session.get(HASH_SESSION_KEY):
+                cache.set(
+                    _clave_usuario(user.pk),
+                    (session[HASH_SESSION_KEY], user),
+                    getattr(settings, "USUARIO_CACHE_TTL", 60),
+                )
+
+        request._cached_user = user
+    return request._cached_user
+
+
+async def aget_cached_user(request):
+    """Versión async de get_cached_user para vistas async (request.auser())."""
+    if not hasattr(request, "_acached_user"):
+        session = request.session
+        user_id = await session.aget(SESSION_KEY)
+        session_hash = await session.aget(HASH_SESSION_KEY)
+        user = None
+
+        if user_id is not None and session_hash and await session.aget(BACKEND_SESSION_KEY):
+            entrada = await cache.aget(_clave_usuario(user_id))
+            if entrada is not None and entrada[0] == session_hash:
+                user = entrada[1]
+
+        if user is None:
+            user = await aget_user(request)
+            session_hash = await session.aget(HASH_SESSION_KEY)
+            if user.is_authenticated and session_hash:
+                await cache.aset(
+                    _clave_usuario(user.pk),
+                    (session_hash, user),
+                    getattr(settings, "USUARIO_CACHE_TTL", 60),
+                )
+
+        request._acached_user = user
+    return request._acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Reemplaza a AuthenticationMiddleware para no releer gestion_roles.Usuario
+    en cada request (roles de los decoradores y cabecera de base.html).
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+        request.auser = partial(aget_cached_user, request)
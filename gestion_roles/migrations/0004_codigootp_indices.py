@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_roles', '0003_codigootp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='codigootp',
+            index=models.Index(fields=['user', 'codigo', 'usado'], name='otp_user_codigo_usado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codigootp',
+            index=models.Index(fields=['valido_hasta'], name='otp_valido_hasta_idx'),
+        ),
+    ]
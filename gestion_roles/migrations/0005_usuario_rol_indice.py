@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_roles', '0004_codigootp_indices'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usuario',
+            name='rol',
+            field=models.CharField(choices=[('Administrador', 'Administrador'), ('Supervisor', 'Supervisor'), ('Matrona', 'Matrona')], db_index=True, default='Matrona', max_length=50),
+        ),
+    ]
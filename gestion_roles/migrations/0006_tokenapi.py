@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_roles', '0005_usuario_rol_indice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenAPI',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(help_text='Sistema que usa el token (ej: HIS Hospital)', max_length=100)),
+                ('clave_hash', models.CharField(max_length=64, unique=True)),
+                ('prefijo', models.CharField(help_text='Primeros caracteres, para identificarlo', max_length=8)),
+                ('creado', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_uso', models.DateTimeField(blank=True, null=True)),
+                ('activo', models.BooleanField(default=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens_api', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Token de API',
+                'verbose_name_plural': 'Tokens de API',
+            },
+        ),
+    ]
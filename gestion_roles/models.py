@@ -14,6 +14,14 @@ class CodigoOTP(models.Model):
     valido_hasta = models.DateTimeField()
     usado = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Verificación: una sola sentencia filtrando por (user, codigo, usado)
+            models.Index(fields=["user", "codigo", "usado"], name="otp_user_codigo_usado_idx"),
+            # Purga periódica de códigos vencidos
+            models.Index(fields=["valido_hasta"], name="otp_valido_hasta_idx"),
+        ]
+
     def __str__(self):
         return f"OTP {self.codigo} para {self.user.email}"
 
@@ -48,7 +56,7 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
     ROLES = (('Administrador', 'Administrador'), ('Supervisor', 'Supervisor'), ('Matrona', 'Matrona'))
     email = models.EmailField(unique=True)
     nombre = models.CharField(max_length=100)
-    rol = models.CharField(max_length=50, choices=ROLES, default='Matrona')
+    rol = models.CharField(max_length=50, choices=ROLES, default='Matrona', db_index=True)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
 
@@ -85,4 +93,25 @@ class Parto(models.Model):
 
     def __str__(self):
         return f"Parto de {self.madre.nombre_completo} el {self.fecha_parto}"
-    
\ No newline at end of file
+    
+
+# ===========================
+# TABLA: TOKEN API (integración HIS)
+# ===========================
+
+class TokenAPI(models.Model):
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tokens_api")
+    nombre = models.CharField(max_length=100, help_text="Sistema que usa el token (ej: HIS Hospital)")
+    # Solo se guarda el SHA-256: el token en claro se muestra una única vez al emitirlo
+    clave_hash = models.CharField(max_length=64, unique=True)
+    prefijo = models.CharField(max_length=8, help_text="Primeros caracteres, para identificarlo")
+    creado = models.DateTimeField(default=timezone.now)
+    ultimo_uso = models.DateTimeField(null=True, blank=True)
+    activo = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Token de API"
+        verbose_name_plural = "Tokens de API"
+
+    def __str__(self):
+        return f"{self.nombre} ({self.prefijo}…) de {self.usuario.email}"
@@ -0,0 +1,38 @@
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from gestion_roles.models import CodigoOTP
+
+# ===========================
+# CÓDIGOS OTP (tabla CodigoOTP)
+# ===========================
+
+def emitir_codigo(user):
+    """Anula los códigos pendientes del usuario y crea uno nuevo con vencimiento."""
+    ahora = timezone.now()
+    CodigoOTP.objects.filter(user=user, usado=False).update(usado=True)
+    return CodigoOTP.objects.create(
+        user=user,
+        codigo=f"{secrets.randbelow(900000) + 100000}",
+        creado=ahora,
+        valido_hasta=ahora + timedelta(seconds=settings.OTP_VALIDEZ),
+    )
+
+
+def consumir_codigo(user_id, codigo):
+    """
+    Marca el código como usado si es válido. Es un único UPDATE condicional
+    sobre el índice (user, codigo, usado): si dos requests llegan a la vez
+    solo uno obtiene la fila, por lo que el código no se puede reutilizar.
+    """
+    if not user_id or not codigo:
+        return False
+    return CodigoOTP.objects.filter(
+        user_id=user_id,
+        codigo=codigo.strip(),
+        usado=False,
+        valido_hasta__gt=timezone.now(),
+    ).update(usado=True) == 1
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+
+# ===========================
+# SESIONES CON POCAS ESCRITURAS
+# ===========================
+
+# Marca (epoch en segundos) de la última vez que la sesión se guardó por renovación
+CLAVE_RENOVACION = "_renovada"
+
+
+class SesionBajaEscrituraMiddleware(SessionMiddleware):
+    """
+    Reemplaza a SESSION_SAVE_EVERY_REQUEST.
+
+    La sesión solo se persiste cuando cambió durante el request o cuando pasaron
+    SESSION_REFRESH_INTERVAL segundos desde la última renovación. Así se conserva
+    la expiración deslizante de SESSION_COOKIE_AGE (el corte real queda entre
+    SESSION_COOKIE_AGE - SESSION_REFRESH_INTERVAL y SESSION_COOKIE_AGE de
+    inactividad) sin un UPDATE de django_session en cada página.
+    """
+
+    def process_response(self, request, response):
+        session = getattr(request, "session", None)
+        if session is not None and session.accessed and not session.is_empty():
+            ahora = int(time.time())
+            intervalo = getattr(settings, "SESSION_REFRESH_INTERVAL", 60)
+            # Si la sesión ya se va a guardar, aprovechar la escritura para reiniciar el intervalo
+            if session.modified or ahora - session.get(CLAVE_RENOVACION, 0) >= intervalo:
+                session[CLAVE_RENOVACION] = ahora
+        return super().process_response(request, response)
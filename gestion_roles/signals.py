@@ -1,6 +1,9 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from GeneradorReporte.models import Bitacora
+from gestion_roles.middleware import invalidar_usuario_cache
 
 @receiver(user_logged_in)
 def registrar_login(sender, request, user, **kwargs):
@@ -18,3 +21,8 @@ def registrar_logout(sender, request, user, **kwargs):
             accion="Cierre de sesión",
             detalle=f"El usuario {user.nombre} ({user.email}) cerró sesión."
         )
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidar_cache_usuario(sender, instance, **kwargs):
+    # Cualquier cambio en el usuario (rol, nombre, activo, contraseña) debe verse en el siguiente request
+    invalidar_usuario_cache(instance.pk)
@@ -1,3 +1,284 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from gestion_roles.checks import revisar_limitador
+from gestion_roles.forms import UsuarioForm
+from gestion_roles.limitador import LimitadorIntentos
+from gestion_roles.middleware import _clave_usuario
+from gestion_roles.models import CodigoOTP, Usuario
+from gestion_roles.otp import consumir_codigo, emitir_codigo
+from gestion_roles.sesiones import SesionBajaEscrituraMiddleware
+
+
+# ===========================
+# CACHÉ DEL USUARIO AUTENTICADO
+# ===========================
+
+class CacheUsuarioTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = Usuario.objects.create_user("admin@x.cl", "Admin", "clave", rol="Administrador")
+        self.client.force_login(self.admin)
+        # Primer request: deja al usuario en caché
+        self.assertEqual(self.client.get("/usuarios/").status_code, 200)
+        self.assertIsNotNone(cache.get(_clave_usuario(self.admin.pk)))
+
+    def test_request_con_cache_no_lee_el_usuario(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get("/usuarios/").status_code, 200)
+        self.assertFalse([q for q in consultas.captured_queries if '"gestion_roles_usuario"."id" =' in q["sql"]])
+
+    def test_cambio_de_rol(self):
+        self.admin.rol = "Matrona"
+        self.admin.save()
+        self.assertEqual(self.client.get("/usuarios/").status_code, 403)
+
+    def test_usuario_desactivado(self):
+        self.admin.is_active = False
+        self.admin.save()
+        self.assertRedirects(self.client.get("/usuarios/"), "/login/?next=/usuarios/", fetch_redirect_response=False)
+
+    def test_cambio_de_contrasena_cierra_la_sesion(self):
+        self.admin.set_password("otra")
+        self.admin.save()
+        self.assertRedirects(self.client.get("/usuarios/"), "/login/?next=/usuarios/", fetch_redirect_response=False)
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_sesion_vieja_no_usa_la_cache_de_la_nueva(self):
+        # Tras el cambio de contraseña otra sesión deja en caché al usuario con el hash nuevo
+        self.admin.set_password("otra")
+        self.admin.save()
+        nueva = self.client_class()
+        nueva.force_login(self.admin)
+        self.assertEqual(nueva.get("/usuarios/").status_code, 200)
+        self.assertRedirects(self.client.get("/usuarios/"), "/login/?next=/usuarios/", fetch_redirect_response=False)
+        self.assertEqual(nueva.get("/usuarios/").status_code, 200)
+
+    def test_usuario_eliminado(self):
+        self.admin.delete()
+        self.assertRedirects(self.client.get("/usuarios/"), "/login/?next=/usuarios/", fetch_redirect_response=False)
+
+
+# ===========================
+# SESIONES CON POCAS ESCRITURAS
+# ===========================
+
+class SesionBajaEscrituraTests(TestCase):
+    def setUp(self):
+        self.escribe = False
+
+        def vista(request):
+            request.session.get(SESSION_KEY)
+            if self.escribe:
+                request.session["filtro"] = "x"
+            return HttpResponse()
+
+        self.middleware = SesionBajaEscrituraMiddleware(vista)
+        sesion = self.middleware.SessionStore()
+        sesion[SESSION_KEY] = "1"
+        sesion.save()
+        self.clave = sesion.session_key
+        reloj = mock.patch("gestion_roles.sesiones.time")
+        self.reloj = reloj.start()
+        self.reloj.time.return_value = 1_000_000.0
+        self.addCleanup(reloj.stop)
+
+    def _request(self):
+        request = RequestFactory().get("/")
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = self.clave
+        guardar = self.middleware.SessionStore.save
+        with mock.patch.object(self.middleware.SessionStore, "save", autospec=True, side_effect=guardar) as save:
+            self.middleware(request)
+        return save.call_count
+
+    def test_solo_renueva_una_vez_por_intervalo(self):
+        self.assertEqual(self._request(), 1)  # sin marca de renovación
+        self.reloj.time.return_value += 30
+        self.assertEqual(self._request(), 0)
+        self.reloj.time.return_value += 30
+        self.assertEqual(self._request(), 1)
+        self.assertEqual(self._request(), 0)
+
+    def test_sesion_modificada_se_guarda_y_reinicia_el_intervalo(self):
+        self._request()
+        self.reloj.time.return_value += 30
+        self.escribe = True
+        self.assertEqual(self._request(), 1)
+        self.escribe = False
+        self.reloj.time.return_value += 59
+        self.assertEqual(self._request(), 0)
+
+    def test_sesion_anonima_vacia_no_se_crea(self):
+        request = RequestFactory().get("/")
+        response = self.middleware(request)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+
+# ===========================
+# LÍMITE DE INTENTOS
+# ===========================
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class LimitadorIntentosTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.limitador = LimitadorIntentos("prueba", capacidad=5, recarga=5 / 60, bloqueo_base=30, bloqueo_max=900)
+        # Reloj fijo: la prueba no depende de cruzar el borde de una ventana
+        reloj = mock.patch("gestion_roles.limitador.time")
+        self.reloj = reloj.start()
+        self.reloj.time.return_value = 1_000_000.0
+        self.addCleanup(reloj.stop)
+
+    def test_bloquea_al_exceder_la_capacidad(self):
+        esperas = [self.limitador.consumir("1.2.3.4") for _ in range(6)]
+        self.assertEqual(esperas[:5], [0] * 5)
+        self.assertEqual(esperas[5], 30)
+        self.assertGreater(self.limitador.consumir("1.2.3.4"), 0)
+
+    def test_rafaga_paralela_no_supera_el_limite(self):
+        with ThreadPoolExecutor(max_workers=20) as hilos:
+            esperas = list(hilos.map(lambda _: self.limitador.consumir("1.2.3.4"), range(60)))
+        self.assertEqual(esperas.count(0), 5)
+
+    def test_bloqueos_sucesivos_doblan_la_espera(self):
+        for _ in range(6):
+            self.limitador.consumir("a@x.cl")
+        # Pasado el bloqueo, en la ventana siguiente
+        self.reloj.time.return_value += 60
+        esperas = [self.limitador.consumir("a@x.cl") for _ in range(6)]
+        self.assertEqual(esperas[5], 60)
+
+    def test_reiniciar_limpia_la_clave(self):
+        for _ in range(6):
+            self.limitador.consumir("a@x.cl")
+        self.limitador.reiniciar("a@x.cl")
+        self.assertEqual(self.limitador.consumir("a@x.cl"), 0)
+
+
+class ChequeoLimitadorTests(SimpleTestCase):
+    def _avisos(self):
+        return [aviso.id for aviso in revisar_limitador(None)]
+
+    def test_cache_de_archivos_o_local_avisa(self):
+        for backend in ("django.core.cache.backends.filebased.FileBasedCache", "django.core.cache.backends.locmem.LocMemCache"):
+            with self.subTest(backend=backend), override_settings(CACHES={"default": {"BACKEND": backend, "LOCATION": "/tmp/x"}}):
+                self.assertEqual(self._avisos(), ["gestion_roles.W001"])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://r"}})
+    def test_redis_no_avisa(self):
+        self.assertEqual(self._avisos(), [])
+
+
+# ===========================
+# CÓDIGOS OTP
+# ===========================
+
+class CodigoOTPTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user("mat@x.cl", "Matrona", "clave", rol="Matrona")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_codigo_de_un_solo_uso(self):
+        otp = emitir_codigo(self.usuario)
+        self.assertTrue(consumir_codigo(self.usuario.pk, otp.codigo))
+        self.assertFalse(consumir_codigo(self.usuario.pk, otp.codigo))
+
+    def test_codigo_vencido(self):
+        otp = emitir_codigo(self.usuario)
+        CodigoOTP.objects.filter(pk=otp.pk).update(valido_hasta=timezone.now() - timedelta(seconds=1))
+        self.assertFalse(consumir_codigo(self.usuario.pk, otp.codigo))
+
+    def test_codigo_incorrecto_o_de_otro_usuario(self):
+        otp = emitir_codigo(self.usuario)
+        otro = Usuario.objects.create_user("otra@x.cl", "Otra", "clave", rol="Matrona")
+        incorrecto = "123456" if otp.codigo != "123456" else "654321"
+        self.assertFalse(consumir_codigo(self.usuario.pk, incorrecto))
+        self.assertFalse(consumir_codigo(otro.pk, otp.codigo))
+        self.assertFalse(consumir_codigo(None, otp.codigo))
+        self.assertFalse(consumir_codigo(self.usuario.pk, ""))
+        # Los intentos fallidos no gastan el código
+        self.assertTrue(consumir_codigo(self.usuario.pk, f" {otp.codigo} "))
+
+    @mock.patch("gestion_roles.otp.secrets.randbelow", side_effect=[1, 2])
+    def test_codigo_nuevo_anula_el_anterior(self, _):
+        anterior = emitir_codigo(self.usuario)
+        nuevo = emitir_codigo(self.usuario)
+        self.assertEqual((anterior.codigo, nuevo.codigo), ("100001", "100002"))
+        self.assertFalse(consumir_codigo(self.usuario.pk, anterior.codigo))
+        self.assertTrue(consumir_codigo(self.usuario.pk, nuevo.codigo))
+
+
+# ===========================
+# ADMINISTRACIÓN DE USUARIOS
+# ===========================
+
+class GestionUsuariosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.create_user("admin@x.cl", "Admin", "clave", rol="Administrador")
+        Usuario.objects.bulk_create([
+            Usuario(email=f"mat{i:02}@x.cl", nombre=f"Matrona {i:02}", rol="Matrona") for i in range(30)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_listado_paginado_y_filtrado(self):
+        response = self.client.get("/usuarios/")
+        self.assertEqual(len(response.context["usuarios"]), 25)
+        self.assertEqual(response.context["pagina"].paginator.count, 31)
+        response = self.client.get("/usuarios/", {"q": "matrona 1", "page": 1})
+        self.assertEqual([u.nombre for u in response.context["usuarios"]], [f"Matrona {i}" for i in range(10, 20)])
+        response = self.client.get("/usuarios/", {"rol": "Administrador"})
+        self.assertEqual(list(response.context["usuarios"]), [self.admin])
+
+    def test_email_duplicado_lo_detecta_la_restriccion_de_la_bd(self):
+        datos = {"nombre": "Otra", "email": "mat01@x.cl", "rol": "Matrona", "password": "clave"}
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post("/usuarios/crear/", datos)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["form"].errors["email"], [UsuarioForm.MENSAJE_EMAIL_DUPLICADO])
+        # Sin consulta previa de existencia: solo el INSERT rechazado
+        self.assertFalse([q for q in consultas.captured_queries if "mat01@x.cl" in q["sql"] and q["sql"].startswith("SELECT")])
+        self.assertEqual(Usuario.objects.filter(email="mat01@x.cl").count(), 1)
+
+    def test_editar_conservando_el_email(self):
+        usuario = Usuario.objects.get(email="mat01@x.cl")
+        usuario.set_password("clave")
+        usuario.save()
+        datos = {"nombre": "Matrona Uno", "email": "mat01@x.cl", "rol": "Supervisor", "password": ""}
+        self.assertRedirects(self.client.post(f"/usuarios/editar/{usuario.pk}/", datos), "/usuarios/", fetch_redirect_response=False)
+        usuario.refresh_from_db()
+        self.assertEqual((usuario.nombre, usuario.rol), ("Matrona Uno", "Supervisor"))
+        # Contraseña en blanco: se conserva la anterior
+        self.assertTrue(usuario.check_password("clave"))
+
+    def test_acciones_masivas_no_afectan_al_propio_administrador(self):
+        ids = list(Usuario.objects.values_list("id", flat=True))
+        self.client.post("/usuarios/acciones/", {"ids": ids, "accion": "desactivar"})
+        self.assertEqual(Usuario.objects.filter(is_active=True).get(), self.admin)
+        self.client.post("/usuarios/acciones/", {"ids": ids, "accion": "cambiar_rol", "nuevo_rol": "Supervisor"})
+        self.assertEqual(Usuario.objects.filter(rol="Supervisor").count(), 30)
+        self.assertEqual(Usuario.objects.get(pk=self.admin.pk).rol, "Administrador")
+
+    def test_cambio_de_rol_en_lote_invalida_la_cache_del_usuario(self):
+        otro = Usuario.objects.create_user("otro@x.cl", "Otro", "clave", rol="Administrador")
+        otro_cliente = self.client_class()
+        otro_cliente.force_login(otro)
+        self.assertEqual(otro_cliente.get("/usuarios/").status_code, 200)
+        self.client.post("/usuarios/acciones/", {"ids": [otro.pk], "accion": "cambiar_rol", "nuevo_rol": "Matrona"})
+        self.assertEqual(otro_cliente.get("/usuarios/").status_code, 403)
@@ -0,0 +1,58 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from gestion_roles.models import TokenAPI
+
+# ===========================
+# TOKENS DE LA API (tabla TokenAPI)
+# ===========================
+
+def _hash(clave):
+    return hashlib.sha256(clave.encode()).hexdigest()
+
+
+def emitir_token(usuario, nombre):
+    """Crea un token para el usuario. Devuelve (TokenAPI, clave en claro): la clave no se vuelve a mostrar."""
+    clave = secrets.token_urlsafe(32)
+    token = TokenAPI.objects.create(
+        usuario=usuario,
+        nombre=nombre,
+        clave_hash=_hash(clave),
+        prefijo=clave[:8],
+    )
+    return token, clave
+
+
+def token_de_cabecera(request):
+    """Lee "Authorization: Bearer <token>" (también acepta el esquema "Token")."""
+    esquema, _, clave = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if esquema.lower() in ("bearer", "token"):
+        return clave.strip()
+    return ""
+
+
+def autenticar_token(clave):
+    """
+    Usuario dueño del token, o None si no existe, está revocado o el usuario
+    está inactivo. Es una sola consulta por el índice único de clave_hash;
+    ultimo_uso se actualiza como mucho una vez por TOKEN_API_USO_INTERVALO.
+    """
+    if not clave:
+        return None
+    token = (
+        TokenAPI.objects.select_related("usuario")
+        .filter(clave_hash=_hash(clave), activo=True, usuario__is_active=True)
+        .first()
+    )
+    if token is None:
+        return None
+
+    ahora = timezone.now()
+    intervalo = timedelta(seconds=getattr(settings, "TOKEN_API_USO_INTERVALO", 300))
+    if token.ultimo_uso is None or ahora - token.ultimo_uso > intervalo:
+        TokenAPI.objects.filter(pk=token.pk).update(ultimo_uso=ahora)
+    return token.usuario
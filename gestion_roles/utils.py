@@ -11,3 +11,16 @@ def registrar_accion(request, accion, detalle=""):
             accion=accion,
             detalle=detalle
         )
+
+
+async def aregistrar_accion(request, accion, detalle=""):
+    """
+    Versión async de registrar_accion para las vistas async.
+    """
+    user = await request.auser()
+    if user.is_authenticated:
+        await Bitacora.objects.acreate(
+            usuario=user,
+            accion=accion,
+            detalle=detalle
+        )
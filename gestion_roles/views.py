@@ -2,10 +2,19 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, get_user_model, logout
 from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import QueryDict
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 from gestion_roles.decorators import matrona_required, supervisor_required, administrador_required
 from gestion_roles.forms import UsuarioForm  # formulario para Usuario
+from gestion_roles.limitador import LimitadorIntentos, ip_cliente
+from gestion_roles.otp import emitir_codigo, consumir_codigo
+from gestion_roles.middleware import invalidar_usuario_cache
+from gestion_roles.utils import registrar_accion
 from GeneradorReporte.models import Bitacora
-import random
 from django.core.mail import send_mail
 from django.conf import settings
 
@@ -30,17 +39,26 @@ def login_view(request):
     if request.method == 'POST':
         email = request.POST.get('email')
         password = request.POST.get('password')
+
+        # Rechazar antes de calcular el hash si la IP o el email agotaron sus intentos
+        limitador = LimitadorIntentos.desde_settings('login')
+        clave_email = (email or '').strip().lower()
+        espera = limitador.consumir(ip_cliente(request), clave_email)
+        if espera:
+            messages.error(request, f"Demasiados intentos. Intente nuevamente en {espera} segundos.")
+            return render(request, 'gestion_roles/login.html', status=429)
+
         user = authenticate(request, email=email, password=password)
 
         if user is not None:
-            otp = random.randint(100000, 999999)
+            limitador.reiniciar(clave_email)
+            otp = emitir_codigo(user)
 
-            #Guardar datos temporales
+            # En la sesión solo queda el usuario pendiente; el código vive en CodigoOTP
             request.session['pending_user_id'] = user.id
-            request.session['otp_code'] = otp
 
             # Mostrar OTP directamente en la pantalla (para Render)
-            messages.success(request, f"Tu código OTP es: {otp}")
+            messages.success(request, f"Tu código OTP es: {otp.codigo}")
 
             return redirect('gestion_roles:verificar_otp') 
         else:
@@ -52,15 +70,21 @@ def login_view(request):
 def verificar_otp(request):
     if request.method == 'POST':
         codigo_ingresado = request.POST.get('otp')
-        codigo_real = str(request.session.get('otp_code'))
         user_id = request.session.get('pending_user_id')
 
-        if codigo_ingresado == codigo_real:
+        limitador = LimitadorIntentos.desde_settings('otp')
+        clave_usuario = str(user_id) if user_id else None
+        espera = limitador.consumir(ip_cliente(request), clave_usuario)
+        if espera:
+            messages.error(request, f"Demasiados intentos. Intente nuevamente en {espera} segundos.")
+            return render(request, 'gestion_roles/verificar_otp.html', status=429)
+
+        if consumir_codigo(user_id, codigo_ingresado):
+            limitador.reiniciar(clave_usuario)
             User = get_user_model()
             user = User.objects.get(id=user_id)
 
             #Limpiar variables temporales
-            del request.session['otp_code']
             del request.session['pending_user_id']
 
             login(request, user)
@@ -121,12 +145,47 @@ def ver_bitacora(request):
     return render(request, 'GeneradorReporte/bitacora.html', {'logs': logs})
 
 
+USUARIOS_POR_PAGINA = 25
+
+
 @login_required
 @administrador_required
 def gestion_usuarios(request):
-    # Vista principal de gestión de usuarios.
-    usuarios = Usuario.objects.all()
-    return render(request, 'gestion_roles/gestion_usuarios.html', {'usuarios': usuarios})
+    # Vista principal de gestión de usuarios: paginada y con búsqueda por nombre/email/rol.
+    q = request.GET.get('q', '').strip()
+    rol = request.GET.get('rol', '')
+
+    usuarios = Usuario.objects.only('id', 'nombre', 'email', 'rol', 'is_active').order_by('nombre', 'id')
+    if q:
+        usuarios = usuarios.filter(Q(nombre__icontains=q) | Q(email__icontains=q) | Q(rol__iexact=q))
+    if rol in dict(Usuario.ROLES):
+        usuarios = usuarios.filter(rol=rol)
+
+    pagina = Paginator(usuarios, USUARIOS_POR_PAGINA).get_page(request.GET.get('page'))
+
+    # Filtros actuales sin la página, para los enlaces de paginación y las acciones masivas
+    filtros = request.GET.copy()
+    filtros.pop('page', None)
+
+    return render(request, 'gestion_roles/gestion_usuarios.html', {
+        'usuarios': pagina.object_list,
+        'pagina': pagina,
+        'q': q,
+        'rol': rol,
+        'roles': Usuario.ROLES,
+        'filtros': filtros.urlencode(),
+    })
+
+
+def _guardar_usuario(form):
+    # Guarda el formulario; un email repetido lo detecta la restricción UNIQUE de la BD.
+    try:
+        with transaction.atomic():
+            form.save()
+    except IntegrityError:
+        form.add_error('email', UsuarioForm.MENSAJE_EMAIL_DUPLICADO)
+        return False
+    return True
 
 
 @login_required
@@ -135,8 +194,7 @@ def crear_usuario(request):
     # Crear un nuevo usuario.
     if request.method == 'POST':
         form = UsuarioForm(request.POST)
-        if form.is_valid():
-            form.save()
+        if form.is_valid() and _guardar_usuario(form):
             messages.success(request, "Usuario creado correctamente.")
             return redirect('gestion_roles:gestion_usuarios')
     else:
@@ -151,8 +209,7 @@ def editar_usuario(request, id):
     usuario = get_object_or_404(Usuario, id=id)
     if request.method == 'POST':
         form = UsuarioForm(request.POST, instance=usuario)
-        if form.is_valid():
-            form.save()
+        if form.is_valid() and _guardar_usuario(form):
             messages.success(request, "Usuario actualizado correctamente.")
             return redirect('gestion_roles:gestion_usuarios')
     else:
@@ -160,6 +217,40 @@ def editar_usuario(request, id):
     return render(request, 'gestion_roles/usuario_form.html', {'form': form})
 
 
+@login_required
+@administrador_required
+@require_POST
+def acciones_usuarios(request):
+    # Activar, desactivar o cambiar el rol de varios usuarios con un solo UPDATE.
+    ids = [int(i) for i in request.POST.getlist('ids') if i.isdigit()]
+    accion = request.POST.get('accion')
+    nuevo_rol = request.POST.get('nuevo_rol')
+    volver = f"{reverse('gestion_roles:gestion_usuarios')}?{QueryDict(request.POST.get('filtros', '')).urlencode()}"
+
+    if not ids:
+        messages.error(request, "Seleccione al menos un usuario.")
+        return redirect(volver)
+
+    # El administrador no puede desactivarse ni quitarse el rol a sí mismo
+    usuarios = Usuario.objects.filter(pk__in=ids).exclude(pk=request.user.pk)
+    if accion == 'activar':
+        actualizados = usuarios.update(is_active=True)
+    elif accion == 'desactivar':
+        actualizados = usuarios.update(is_active=False)
+    elif accion == 'cambiar_rol' and nuevo_rol in dict(Usuario.ROLES):
+        actualizados = usuarios.update(rol=nuevo_rol)
+    else:
+        messages.error(request, "Acción no válida.")
+        return redirect(volver)
+
+    # update() no dispara post_save: invalidar a mano la caché de usuarios autenticados
+    invalidar_usuario_cache(*ids)
+    detalle = f"Acción '{accion}'{f' ({nuevo_rol})' if accion == 'cambiar_rol' else ''} aplicada a {actualizados} usuario(s)"
+    registrar_accion(request, "Acción masiva de usuarios", detalle)
+    messages.success(request, f"{detalle}.")
+    return redirect(volver)
+
+
 @login_required
 @administrador_required
 def eliminar_usuario(request, id):
@@ -12,11 +12,20 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from decouple import config
 import dj_database_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# ================================
+# 🏭 ENTORNO
+# ================================
+# ENV=production activa el perfil de producción: DEBUG apagado, plantillas
+# cacheadas, caché compartida entre procesos y estáticos con hash
+ENV = config("ENV", default="development")
+PRODUCCION = ENV == "production"
+
 # ================================
 # 🔐 SECURITY - SECRET KEY
 # ================================
@@ -25,7 +34,8 @@ SECRET_KEY = config("SECRET_KEY", default="insecure-key-dev")
 # ================================
 # 🐞 DEBUG
 # ================================
-DEBUG = config("DEBUG", default=True, cast=bool)
+# Con DEBUG Django guarda en memoria cada consulta SQL ejecutada
+DEBUG = config("DEBUG", default=not PRODUCCION, cast=bool)
 
 # ================================
 # 🌍 ALLOWED HOSTS
@@ -37,6 +47,9 @@ if RENDER_EXTERNAL_HOSTNAME:
 else:
     ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
 
+# Commit desplegado (Render lo define); forma parte de los ETag de neonatos/condicional.py
+VERSION_DESPLIEGUE = config("RENDER_GIT_COMMIT", default="")
+
 
 # ================================
 # 🔧 APPS
@@ -51,6 +64,7 @@ INSTALLED_APPS = [
     'GeneradorReporte',
     'gestion_roles',
     'neonatos',
+    'rendimiento',
 ]
 
 AUTH_USER_MODEL = 'gestion_roles.Usuario'
@@ -59,17 +73,28 @@ AUTH_USER_MODEL = 'gestion_roles.Usuario'
 # 🔧 MIDDLEWARE
 # ================================
 MIDDLEWARE = [
+    # Tiempo total, SQL y plantillas por request (cabecera Server-Timing y SolicitudLenta)
+    'rendimiento.middleware.InstrumentacionMiddleware',
     'django.middleware.security.SecurityMiddleware',
 
-    # Requerido por Render para servir estáticos comprimidos
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Requerido por Render para servir estáticos comprimidos (whitenoise con camino async)
+    'rendimiento.middleware.EstaticosMiddleware',
+
+    # Brotli/gzip de HTML y JSON (los estáticos ya vienen precomprimidos por whitenoise)
+    'rendimiento.compresion.CompresionMiddleware',
 
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Guarda la sesión solo si cambió o venció SESSION_REFRESH_INTERVAL
+    'gestion_roles.sesiones.SesionBajaEscrituraMiddleware',
+    # Tras una escritura, los reportes de la sesión leen del primario (ver REPORTES_VENTANA_ESCRITURA)
+    'rendimiento.replicas.VentanaEscrituraMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Carga el usuario autenticado desde caché (ver USUARIO_CACHE_TTL)
+    'gestion_roles.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Debe ir bajo CompresionMiddleware: minifica antes de comprimir
+    'rendimiento.compresion.MinificarHTMLMiddleware',
 ]
 
 ROOT_URLCONF = 'huellas.urls'
@@ -79,9 +104,11 @@ ROOT_URLCONF = 'huellas.urls'
 # ================================
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que además mide el tiempo de render (rendimiento.middleware)
+        'BACKEND': 'rendimiento.plantillas.DjangoTemplatesMedidas',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
+        # En producción los loaders se declaran explícitamente (ver abajo)
+        'APP_DIRS': not PRODUCCION,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -94,6 +121,15 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCCION:
+    # Plantillas compiladas una sola vez por proceso
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'huellas.wsgi.application'
 
 # ================================
@@ -102,18 +138,32 @@ WSGI_APPLICATION = 'huellas.wsgi.application'
 # LOCAL → MySQL
 # PRODUCCIÓN → PostgreSQL automática con Render
 
-if config("ENV", default="development") == "production":
+# Procesos y hilos de gunicorn: el pool de cada proceso se dimensiona con los hilos,
+# así el total de conexiones es WEB_CONCURRENCY * DB_POOL_MAX (gunicorn lee WEB_CONCURRENCY)
+WEB_CONCURRENCY = config("WEB_CONCURRENCY", default=2, cast=int)
+GUNICORN_THREADS = config("GUNICORN_THREADS", default=4, cast=int)
+
+if PRODUCCION:
+    DB_POOL = config("DB_POOL", default=True, cast=bool)
     DATABASES = {
         "default": dj_database_url.config(
             default=config("DATABASE_URL"),
-            conn_max_age=600,
-            conn_health_checks=True,
+            # El pool de psycopg no admite conexiones persistentes de Django
+            conn_max_age=0 if DB_POOL else 600,
+            conn_health_checks=not DB_POOL,
         )
     }
+    if DB_POOL and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": config("DB_POOL_MIN", default=1, cast=int),
+            "max_size": config("DB_POOL_MAX", default=GUNICORN_THREADS, cast=int),
+            # Segundos máximos esperando una conexión libre antes de fallar
+            "timeout": config("DB_POOL_TIMEOUT", default=10, cast=int),
+            # Cerrar conexiones ociosas sobre min_size y renovarlas cada hora
+            "max_idle": 300,
+            "max_lifetime": 3600,
+        }
 else:
-    import pymysql
-    pymysql.install_as_MySQLdb()
-
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.mysql',
@@ -122,6 +172,9 @@ else:
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': 'localhost',
             'PORT': '3306',
+            # MySQL/SQLite no tienen pool en Django: se reutiliza la conexión del hilo
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
                 'charset': 'utf8mb4',
                 'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
@@ -130,6 +183,31 @@ else:
     }
 
 
+if DATABASES["default"]["ENGINE"] == "django.db.backends.mysql":
+    # El driver solo se carga si la base es MySQL; se prefiere mysqlclient si está instalado
+    try:
+        import MySQLdb  # noqa: F401
+    except ImportError:
+        import pymysql
+        pymysql.install_as_MySQLdb()
+
+# Réplica de lectura para reportes y bitácora (ver rendimiento.replicas).
+# Sin REPORTES_DATABASE_URL todo se lee y escribe en "default". Para probar en
+# local basta con una copia de la base: REPORTES_DATABASE_URL=sqlite:////ruta/copia.sqlite3
+REPORTES_DATABASE_URL = config("REPORTES_DATABASE_URL", default="")
+if REPORTES_DATABASE_URL:
+    DATABASES["reportes"] = dj_database_url.parse(
+        REPORTES_DATABASE_URL,
+        conn_max_age=DATABASES["default"].get("CONN_MAX_AGE", 0),
+        conn_health_checks=True,
+    )
+    # En los tests la réplica apunta a la base de prueba de "default"
+    DATABASES["reportes"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["rendimiento.replicas.ReportesRouter"]
+# Segundos que una sesión sigue leyendo de "default" después de escribir
+REPORTES_VENTANA_ESCRITURA = config("REPORTES_VENTANA_ESCRITURA", default=10, cast=int)
+
 # ================================
 # 🔐 PASSWORD VALIDATION
 # ================================
@@ -155,8 +233,24 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Render requiere que whitenoise gestione los archivos
-STATICFILES_STORAGE = "whitenoise.storage.CompressedStaticFilesStorage"
+# Render requiere que whitenoise gestione los archivos. En producción los
+# nombres llevan hash del contenido (requiere collectstatic) y se pueden cachear
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "whitenoise.storage.CompressedManifestStaticFilesStorage"
+            if PRODUCCION
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+# Los archivos con hash en el nombre se sirven con Cache-Control immutable por un
+# año; el resto (sin hash) se cachea WHITENOISE_MAX_AGE segundos. Con Brotli
+# instalado collectstatic deja además versiones .br y .gz precomprimidas.
+WHITENOISE_MAX_AGE = 0 if DEBUG else 3600
+# Las URLs siempre pasan por {% static %}: no hace falta publicar las copias sin hash
+WHITENOISE_KEEP_ONLY_HASHED_FILES = PRODUCCION
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -167,6 +261,117 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# Segundos que el usuario autenticado permanece en caché entre requests
+USUARIO_CACHE_TTL = config("USUARIO_CACHE_TTL", default=60, cast=int)
+
+# Segundos de validez de un código OTP (ver gestion_roles/otp.py y purgar_otp)
+OTP_VALIDEZ = config("OTP_VALIDEZ", default=300, cast=int)
+
+# ================================
+# 🚦 LÍMITE DE INTENTOS (login y OTP)
+# ================================
+# capacidad: intentos seguidos permitidos; recarga: intentos recuperados por segundo;
+# bloqueo_base/bloqueo_max: espera inicial y máxima (se dobla en cada bloqueo)
+LIMITES_INTENTOS = {
+    # Cada límite se aplica por IP y por email (o por usuario pendiente en el OTP)
+    'login': {'capacidad': 10, 'recarga': 10 / 60, 'bloqueo_base': 30, 'bloqueo_max': 900},
+    'otp': {'capacidad': 5, 'recarga': 1 / 60, 'bloqueo_base': 60, 'bloqueo_max': 900},
+}
+# Detrás del proxy de Render la IP real viene en X-Forwarded-For
+LIMITE_CONFIAR_PROXY = config("LIMITE_CONFIAR_PROXY", default=bool(RENDER_EXTERNAL_HOSTNAME), cast=bool)
+
+# ================================
+# 🔌 API JSON (integración HIS, ver neonatos/api.py)
+# ================================
+# Máximo de elementos por carga masiva (/api/v1/<recurso>/lote/)
+API_LOTE_MAXIMO = config("API_LOTE_MAXIMO", default=1000, cast=int)
+# Cada cuántos segundos se registra el último uso de un token (evita un UPDATE por request)
+TOKEN_API_USO_INTERVALO = config("TOKEN_API_USO_INTERVALO", default=300, cast=int)
+# Antigüedad mínima (s) de un cambio para entregarlo en el feed: margen para transacciones
+# que se confirman fuera de orden (ver neonatos/cambios.py). Mayor que innodb_lock_wait_timeout
+# de MySQL (50 s): una escritura que espera un bloqueo puede confirmarse hasta entonces
+CAMBIOS_RETRASO = config("CAMBIOS_RETRASO", default=60, cast=int)
+
+# ================================
+# 🗑️ PAPELERA (madres y partos eliminados, ver neonatos/eliminacion.py)
+# ================================
+# Días que se conservan los elementos antes de que purgar_papelera los borre
+PAPELERA_RETENCION_DIAS = config("PAPELERA_RETENCION_DIAS", default=90, cast=int)
+
+# ================================
+# 👥 MADRES DUPLICADAS (ver neonatos/duplicados.py)
+# ================================
+# Puntaje mínimo (0-1) para proponer un par a revisión
+DUPLICADOS_UMBRAL = config("DUPLICADOS_UMBRAL", default=0.8, cast=float)
+# Bloques con más madres que esto (apellidos muy comunes) no se comparan
+DUPLICADOS_BLOQUE_MAXIMO = config("DUPLICADOS_BLOQUE_MAXIMO", default=200, cast=int)
+
+# ================================
+# 👶 PERCENTILES DE CRECIMIENTO AL NACER (ver neonatos/crecimiento.py)
+# ================================
+# CSV de referencia LMS oficial (sexo, semanas, medida, L, M, S). Vacío: sin percentiles
+# ni hoja CRECIMIENTO (no se incluye ninguna tabla; ver rendimiento.W008)
+CRECIMIENTO_TABLA = config("CRECIMIENTO_TABLA", default="")
+# Las estadísticas de cohorte se invalidan solas al cambiar los datos; el TTL solo libera memoria
+ESTADISTICAS_CACHE_TTL = config("ESTADISTICAS_CACHE_TTL", default=3600, cast=int)
+# Tablero de indicadores mensuales: se invalida con cada escritura (neonatos/generacion.py)
+INDICADORES_CACHE_TTL = config("INDICADORES_CACHE_TTL", default=3600, cast=int)
+
+# ================================
+# 📈 INSTRUMENTACIÓN
+# ================================
+# Requests sobre este umbral se guardan en rendimiento.SolicitudLenta,
+# que conserva solo las últimas RENDIMIENTO_MAX_LENTAS filas
+RENDIMIENTO_UMBRAL_MS = config("RENDIMIENTO_UMBRAL_MS", default=500, cast=int)
+RENDIMIENTO_MAX_LENTAS = config("RENDIMIENTO_MAX_LENTAS", default=1000, cast=int)
+
+# Compresión de respuestas: tamaño mínimo y calidad brotli (0-11; 5 es buen
+# equilibrio para contenido dinámico). Páginas con token CSRF: "gzip" con
+# bytes aleatorios (mitigación BREACH) o "ninguna"
+COMPRESION_MIN_BYTES = config("COMPRESION_MIN_BYTES", default=1024, cast=int)
+COMPRESION_BROTLI_CALIDAD = config("COMPRESION_BROTLI_CALIDAD", default=5, cast=int)
+COMPRESION_CSRF = config("COMPRESION_CSRF", default="gzip")
+# Quita la sangría de las plantillas del HTML enviado
+MINIFICAR_HTML = config("MINIFICAR_HTML", default=True, cast=bool)
+
+# /metrics: cada proceso vuelca sus métricas a METRICAS_DIR cada METRICAS_INTERVALO
+# segundos (debe ser un directorio compartido por todos los workers de gunicorn)
+METRICAS_DIR = config("METRICAS_DIR", default=os.path.join(tempfile.gettempdir(), "huellas_metricas"))
+METRICAS_INTERVALO = config("METRICAS_INTERVALO", default=5, cast=int)
+# Si se define, /metrics exige la cabecera "Authorization: Bearer <token>". En producción
+# es obligatorio: sin él /metrics responde 404 (chequeo rendimiento.W007)
+METRICAS_TOKEN = config("METRICAS_TOKEN", default="")
+
+# ================================
+# 🗃️ CACHÉ
+# ================================
+# Usuario autenticado, límites de intentos y sesiones cached_db viven aquí: en
+# producción la caché debe ser compartida por todos los workers. Los backends
+# de rendimiento.cache son los de Django contando aciertos para /metrics.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    # Requiere el paquete redis
+    CACHES = {
+        "default": {
+            "BACKEND": "rendimiento.cache.RedisCacheMedida",
+            "LOCATION": REDIS_URL,
+        }
+    }
+elif PRODUCCION:
+    CACHES = {
+        "default": {
+            "BACKEND": "rendimiento.cache.FileBasedCacheMedida",
+            "LOCATION": config("CACHE_DIR", default=os.path.join(tempfile.gettempdir(), "huellas_cache")),
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "rendimiento.cache.LocMemCacheMedida",
+        }
+    }
+
 # ================================
 # 📧 EMAIL (Render necesita SMTP real, local sirve consola)
 # ================================
@@ -175,6 +380,12 @@ EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.conso
 # ================================
 # ⏱️ SESSIONES
 # ================================
+# cached_db lee desde caché y escribe en BD; también sirve
+# "django.contrib.sessions.backends.signed_cookies" (sin escrituras en BD)
+SESSION_ENGINE = config("SESSION_ENGINE", default="django.contrib.sessions.backends.cached_db")
 SESSION_COOKIE_AGE = 600
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
-SESSION_SAVE_EVERY_REQUEST = True
+# La expiración deslizante la mantiene SesionBajaEscrituraMiddleware:
+# solo renueva la sesión cada SESSION_REFRESH_INTERVAL segundos
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = config("SESSION_REFRESH_INTERVAL", default=60, cast=int)
@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.shortcuts import redirect
+from rendimiento.views import metricas
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -28,4 +29,10 @@ urlpatterns = [
     path('reporte/', include('GeneradorReporte.urls')),
     # App de neonatos
     path('', include('neonatos.urls', namespace='neonatos')),
+    # API JSON para integración con el HIS (token, ver "manage.py token_api")
+    path('api/v1/', include('neonatos.api_urls')),
+    # Telemetría interna
+    path('rendimiento/', include('rendimiento.urls')),
+    # Métricas para Prometheus
+    path('metrics', metricas, name='metricas'),
 ]
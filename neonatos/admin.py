@@ -1,9 +1,10 @@
 from django.contrib import admin
-from .models import Madre, Parto, RecienNacido
+from .models import ElementoPapelera, Madre, Parto, PosibleDuplicado, RecienNacido
 
 @admin.register(Madre)
 class MadreAdmin(admin.ModelAdmin):
     list_display = ("id","rut","nombres","apellidos","edad","nacionalidad","controles_prenatales")
+    list_filter = ("controles_prenatales","pueblo_originario","discapacidad","privada_libertad")
 
 @admin.register(Parto)
 class PartoAdmin(admin.ModelAdmin):
@@ -11,4 +12,16 @@ class PartoAdmin(admin.ModelAdmin):
 
 @admin.register(RecienNacido)
 class RNAdmin(admin.ModelAdmin):
-    list_display = ("parto","sexo","peso","talla")
\ No newline at end of file
+    list_display = ("parto","sexo","peso","talla")
+
+@admin.register(ElementoPapelera)
+class ElementoPapeleraAdmin(admin.ModelAdmin):
+    list_display = ("modelo","descripcion","total_partos","total_recien_nacidos","eliminado_por","eliminado_en","restaurado_en")
+    list_filter = ("modelo",)
+    readonly_fields = ("datos",)
+
+@admin.register(PosibleDuplicado)
+class PosibleDuplicadoAdmin(admin.ModelAdmin):
+    list_display = ("__str__","puntaje","estado","detectado_en","resuelto_por","resuelto_en")
+    list_filter = ("estado",)
+    readonly_fields = ("detalle",)
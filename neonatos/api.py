@@ -0,0 +1,557 @@
+import base64
+import binascii
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import require_GET, require_POST
+
+from gestion_roles.decorators import token_api_required
+from gestion_roles.utils import registrar_accion
+
+from .condicional import get_condicional
+from .cambios import cambios_desde
+from .models import Cambio, Madre, Parto, RecienNacido
+from .signals import propagar_actualizacion
+from .validators import _normalize_rut_basic
+
+# ===========================
+# API JSON v1 (integración con el HIS)
+# ===========================
+# Autenticación por token (gestion_roles.TokenAPI): lectura para Matrona y
+# Supervisor, carga de datos solo para Matrona, igual que en las vistas HTML.
+#
+# - Listados con paginación por cursor (?cursor=...&limit=...) ordenados por id.
+# - ?fields=id,rut,... limita las columnas consultadas (sparse fieldsets).
+# - ETag / If-None-Match en listados y detalle (ver condicional.py).
+# - Cargas masivas en una sola transacción: si un elemento es inválido no se
+#   guarda nada y se responde 400 con los errores por índice.
+# Se serializa desde .values(): no se construyen instancias de los modelos.
+
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 1000
+LOTE_MAXIMO = getattr(settings, "API_LOTE_MAXIMO", 1000)
+
+CAMPOS_ESCRITURA_MADRE = (
+    "rut", "nombres", "apellidos", "telefono", "direccion", "comuna", "edad",
+    "nacionalidad", "pueblo_originario", "discapacidad", "privada_libertad",
+    "controles_prenatales", "paridad", "cesareas_previas",
+)
+CAMPOS_MADRE = ("id", *CAMPOS_ESCRITURA_MADRE, "actualizado_en")
+
+CAMPOS_ESCRITURA_PARTO = (
+    "fecha_parto", "hora_parto", "tipo_parto", "tipo_atencion", "inicio_parto",
+    "analgesia", "acompanamiento", "episiotomia", "oxitocina", "plan_parto",
+    "contacto_piel_piel", "alojamiento_conjunto", "cesarea_programada",
+    "edad_gestacional", "complicaciones", "observaciones", "presentacion_fetal",
+    "embarazo_multiple",
+)
+CAMPOS_PARTO = ("id", "madre", *CAMPOS_ESCRITURA_PARTO, "actualizado_en")
+
+CAMPOS_ESCRITURA_RN = (
+    "sexo", "peso", "talla", "apgar_1", "apgar_5", "anomalias_congenitas",
+    "profilaxis_hepatitisb", "profilaxis_ocular", "reanimacion", "asfixia_neonatal",
+    "tamizaje_metabolico", "tamizaje_auditivo", "tamizaje_cardiaco", "fallecido",
+    "tipo_fallecimiento", "metodo_alimentacion",
+)
+CAMPOS_RN = ("id", "parto", *CAMPOS_ESCRITURA_RN, "actualizado_en")
+
+ROLES_LECTURA = ("Matrona", "Supervisor")
+ROLES_ESCRITURA = ("Matrona",)
+
+
+class ErrorAPI(Exception):
+    def __init__(self, mensaje, status=400, errores=None):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.status = status
+        self.errores = errores
+
+
+def _json(datos, status=200):
+    return JsonResponse(datos, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+
+def _errores_api(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except ErrorAPI as error:
+            cuerpo = {"error": error.mensaje}
+            if error.errores:
+                cuerpo["errores"] = error.errores
+            return _json(cuerpo, status=error.status)
+    return wrapper
+
+
+# ---------------------------
+# Parámetros de consulta
+# ---------------------------
+
+def _campos(request, permitidos):
+    """Columnas pedidas en ?fields= (siempre incluye id, que usa el cursor)."""
+    valor = request.GET.get("fields", "").strip()
+    if not valor:
+        return list(permitidos)
+    pedidos = [campo.strip() for campo in valor.split(",") if campo.strip()]
+    desconocidos = [campo for campo in pedidos if campo not in permitidos]
+    if desconocidos:
+        raise ErrorAPI(f"Campos desconocidos: {', '.join(desconocidos)}")
+    return ["id"] + [campo for campo in pedidos if campo != "id"]
+
+
+def _entero(request, nombre, defecto=None, maximo=None):
+    valor = request.GET.get(nombre)
+    if valor in (None, ""):
+        return defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ErrorAPI(f"'{nombre}' debe ser un número entero.")
+    if numero < 1:
+        raise ErrorAPI(f"'{nombre}' debe ser mayor que cero.")
+    return min(numero, maximo) if maximo else numero
+
+
+def _fecha_hora(request, nombre):
+    valor = request.GET.get(nombre)
+    if not valor:
+        return None
+    try:
+        fecha = parse_datetime(valor)
+    except ValueError:  # bien formada pero inexistente (30 de febrero, hora 25)
+        fecha = None
+    if fecha is None:
+        raise ErrorAPI(f"'{nombre}' debe ser una fecha y hora ISO 8601.")
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+def _fecha(request, nombre):
+    valor = request.GET.get(nombre)
+    if not valor:
+        return None
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise ErrorAPI(f"'{nombre}' debe ser una fecha AAAA-MM-DD.")
+    return fecha
+
+
+def _rut(valor):
+    return str(valor).strip().upper().replace(".", "")
+
+
+def _id(valor):
+    """El valor si es un id entero; None para cualquier otro JSON (texto, lista, objeto, booleano)."""
+    return valor if type(valor) is int else None
+
+
+def _rut_normalizado(valor):
+    try:
+        return _normalize_rut_basic(_rut(valor))
+    except IndexError:
+        raise ErrorAPI(f"RUT inválido: '{valor}'.")
+
+
+def _codificar_cursor(ultimo_id):
+    return base64.urlsafe_b64encode(str(ultimo_id).encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(cursor + relleno).decode())
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ErrorAPI("Cursor inválido.")
+
+
+# ---------------------------
+# Filtros de cada recurso
+# ---------------------------
+
+def _filtrar_madres(request):
+    queryset = Madre.objects.all()
+    if request.GET.get("rut"):
+        queryset = queryset.filter(rut=_rut_normalizado(request.GET["rut"]))
+    desde = _fecha_hora(request, "actualizado_desde")
+    if desde:
+        queryset = queryset.filter(actualizado_en__gte=desde)
+    return queryset
+
+
+def _filtrar_partos(request):
+    queryset = Parto.objects.all()
+    madre = _entero(request, "madre")
+    if madre:
+        queryset = queryset.filter(madre_id=madre)
+    if request.GET.get("madre_rut"):
+        queryset = queryset.filter(madre__rut=_rut_normalizado(request.GET["madre_rut"]))
+    fecha_desde = _fecha(request, "fecha_desde")
+    if fecha_desde:
+        queryset = queryset.filter(fecha_parto__gte=fecha_desde)
+    fecha_hasta = _fecha(request, "fecha_hasta")
+    if fecha_hasta:
+        queryset = queryset.filter(fecha_parto__lte=fecha_hasta)
+    desde = _fecha_hora(request, "actualizado_desde")
+    if desde:
+        queryset = queryset.filter(actualizado_en__gte=desde)
+    return queryset
+
+
+def _filtrar_recien_nacidos(request):
+    queryset = RecienNacido.objects.all()
+    parto = _entero(request, "parto")
+    if parto:
+        queryset = queryset.filter(parto_id=parto)
+    madre = _entero(request, "madre")
+    if madre:
+        queryset = queryset.filter(parto__madre_id=madre)
+    desde = _fecha_hora(request, "actualizado_desde")
+    if desde:
+        queryset = queryset.filter(actualizado_en__gte=desde)
+    return queryset
+
+
+# ---------------------------
+# Versión para If-None-Match
+# ---------------------------
+
+def _marca_listado(filtrar):
+    # Versión de la página pedida, no de todo el conjunto filtrado: ids y
+    # actualizado_en de las mismas filas que lee _listar (más la fila extra que
+    # decide si hay página siguiente). Cuesta lo mismo que la página.
+    def marca(request, *args, **kwargs):
+        try:
+            queryset, limite = _pagina(request, filtrar(request))
+        except ErrorAPI:
+            return None  # la vista responde el 400
+        filas = list(queryset.values_list("id", "actualizado_en")[:limite + 1])
+        if not filas:
+            return None
+        version = ",".join(f"{pk}@{actualizado.isoformat()}" for pk, actualizado in filas)
+        return f"{version}:{request.GET.urlencode()}", max(actualizado for _, actualizado in filas)
+    return marca
+
+
+def _marca_detalle(modelo):
+    def marca(request, pk):
+        actualizado = modelo.objects.filter(pk=pk).values_list("actualizado_en", flat=True).first()
+        if actualizado is None:
+            return None
+        return f"{actualizado.isoformat()}:{request.GET.urlencode()}", actualizado
+    return marca
+
+
+# ---------------------------
+# Lectura
+# ---------------------------
+
+def _pagina(request, queryset):
+    """(queryset ordenado desde el cursor, límite) de la página pedida."""
+    limite = _entero(request, "limit", LIMITE_POR_DEFECTO, LIMITE_MAXIMO)
+    queryset = queryset.order_by("id")
+    cursor = request.GET.get("cursor")
+    if cursor:
+        queryset = queryset.filter(id__gt=_decodificar_cursor(cursor))
+    return queryset, limite
+
+
+def _listar(request, queryset, permitidos):
+    campos = _campos(request, permitidos)
+    queryset, limite = _pagina(request, queryset)
+
+    # Se pide una fila extra para saber si hay página siguiente
+    filas = list(queryset.values(*campos)[:limite + 1])
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        params = request.GET.copy()
+        params["cursor"] = _codificar_cursor(filas[-1]["id"])
+        siguiente = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    return _json({"resultados": filas, "siguiente": siguiente})
+
+
+def _detalle(request, modelo, permitidos, pk):
+    fila = modelo.objects.filter(pk=pk).values(*_campos(request, permitidos)).first()
+    if fila is None:
+        raise ErrorAPI("No encontrado.", status=404)
+    return _json(fila)
+
+
+@token_api_required(*ROLES_LECTURA)
+@require_GET
+@get_condicional(_marca_listado(_filtrar_madres))
+@_errores_api
+def madres(request):
+    return _listar(request, _filtrar_madres(request), CAMPOS_MADRE)
+
+
+@token_api_required(*ROLES_LECTURA)
+@require_GET
+@get_condicional(_marca_detalle(Madre))
+@_errores_api
+def madre_detalle(request, pk):
+    return _detalle(request, Madre, CAMPOS_MADRE, pk)
+
+
+@token_api_required(*ROLES_LECTURA)
+@require_GET
+@get_condicional(_marca_listado(_filtrar_partos))
+@_errores_api
+def partos(request):
+    return _listar(request, _filtrar_partos(request), CAMPOS_PARTO)
+
+
+@token_api_required(*ROLES_LECTURA)
+@require_GET
+@get_condicional(_marca_detalle(Parto))
+@_errores_api
+def parto_detalle(request, pk):
+    return _detalle(request, Parto, CAMPOS_PARTO, pk)
+
+
+@token_api_required(*ROLES_LECTURA)
+@require_GET
+@get_condicional(_marca_listado(_filtrar_recien_nacidos))
+@_errores_api
+def recien_nacidos(request):
+    return _listar(request, _filtrar_recien_nacidos(request), CAMPOS_RN)
+
+
+@token_api_required(*ROLES_LECTURA)
+@require_GET
+@get_condicional(_marca_detalle(RecienNacido))
+@_errores_api
+def recien_nacido_detalle(request, pk):
+    return _detalle(request, RecienNacido, CAMPOS_RN, pk)
+
+
+# ---------------------------
+# Carga masiva
+# ---------------------------
+
+def _leer_lote(request):
+    try:
+        datos = json.loads(request.body)
+    except ValueError:
+        raise ErrorAPI("El cuerpo debe ser JSON válido.")
+    if not isinstance(datos, list) or not all(isinstance(item, dict) for item in datos):
+        raise ErrorAPI("Se espera una lista de objetos JSON.")
+    if not datos:
+        raise ErrorAPI("El lote está vacío.")
+    if len(datos) > LOTE_MAXIMO:
+        raise ErrorAPI(f"El lote supera el máximo de {LOTE_MAXIMO} elementos.", status=413)
+    return datos
+
+
+def _construir(modelo, item, escribibles, excluir=(), **relaciones):
+    """
+    Instancia sin guardar y validada con full_clean (sin consultas: la unicidad y
+    las relaciones se validan para todo el lote a la vez). Devuelve (objeto, errores).
+    """
+    desconocidos = sorted(set(item) - set(escribibles))
+    if desconocidos:
+        return None, {campo: ["Campo desconocido."] for campo in desconocidos}
+    objeto = modelo(**{campo: item[campo] for campo in escribibles if campo in item}, **relaciones)
+    try:
+        objeto.full_clean(exclude=list(excluir), validate_unique=False)
+    except ValidationError as error:
+        return None, error.message_dict
+    return objeto, None
+
+
+def _crear_en_lote(modelo, objetos):
+    """
+    bulk_create más sus entradas en el feed de cambios. Sin RETURNING (MySQL)
+    bulk_create no entrega los ids: se guarda uno a uno y el save() registra el cambio.
+    """
+    alias = router.db_for_write(modelo)
+    if not connections[alias].features.can_return_rows_from_bulk_insert:
+        for objeto in objetos:
+            objeto.save(using=alias)
+        return objetos
+    creados = modelo.objects.using(alias).bulk_create(objetos, batch_size=500)
+    Cambio.registrar_lote(modelo, [(objeto.pk, Cambio.CREADO) for objeto in creados], using=alias)
+    return creados
+
+
+@token_api_required(*ROLES_ESCRITURA)
+@require_POST
+@_errores_api
+def madres_lote(request):
+    """
+    Crea o actualiza madres por RUT. Cada elemento es la ficha completa: los
+    campos opcionales omitidos quedan con su valor por defecto.
+    """
+    items = _leer_lote(request)
+    objetos, errores, ruts = [], [], set()
+    for indice, item in enumerate(items):
+        if "rut" in item:
+            item = {**item, "rut": _rut(item["rut"])}
+        objeto, error = _construir(Madre, item, CAMPOS_ESCRITURA_MADRE)
+        try:
+            rut = _normalize_rut_basic(item.get("rut"))
+        except IndexError:
+            rut = None
+        if rut and rut in ruts:
+            error = {**(error or {}), "rut": ["RUT repetido en el lote."]}
+        ruts.add(rut)
+        if objeto is not None:
+            objeto.rut = rut
+        if error:
+            errores.append({"indice": indice, "errores": error})
+        else:
+            objetos.append(objeto)
+    if errores:
+        raise ErrorAPI("Hay elementos inválidos; no se guardó ninguno.", errores=errores)
+
+    alias = router.db_for_write(Madre)
+    # MySQL no admite indicar la columna del conflicto: usa cualquier índice único (rut)
+    unique_fields = ["rut"] if connections[alias].features.supports_update_conflicts_with_target else None
+    with transaction.atomic(using=alias):
+        existentes = set(Madre.objects.filter(rut__in=ruts).values_list("rut", flat=True))
+        Madre.objects.bulk_create(
+            objetos,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=[campo for campo in CAMPOS_ESCRITURA_MADRE if campo != "rut"] + ["actualizado_en"],
+        )
+        # Las madres reescritas cambian de versión: un formulario abierto sobre ellas debe detectar el conflicto
+        Madre.objects.filter(rut__in=existentes).update(version=F("version") + 1)
+        ids = dict(Madre.objects.filter(rut__in=ruts).values_list("rut", "id"))
+        Cambio.registrar_lote(
+            Madre,
+            [(pk, Cambio.ACTUALIZADO if rut in existentes else Cambio.CREADO) for rut, pk in ids.items()],
+            using=alias,
+        )
+
+    creados = len(objetos) - len(existentes)
+    registrar_accion(
+        request, "API: carga de madres",
+        f"Usuario {request.user.nombre} cargó {len(objetos)} madres por API ({creados} nuevas, "
+        f"{len(existentes)} actualizadas)",
+    )
+    return _json({"creados": creados, "actualizados": len(existentes), "ids": ids})
+
+
+@token_api_required(*ROLES_ESCRITURA)
+@require_POST
+@_errores_api
+def partos_lote(request):
+    """Crea partos. La madre se indica con "madre" (id) o "madre_rut"."""
+    items = _leer_lote(request)
+
+    # Madres referenciadas: dos consultas para todo el lote
+    ruts = {_rut_normalizado(item["madre_rut"]) for item in items if item.get("madre_rut")}
+    por_rut = dict(Madre.objects.filter(rut__in=ruts).values_list("rut", "id"))
+    ids_pedidos = {_id(item.get("madre")) for item in items} - {None}
+    ids_existentes = set(Madre.objects.filter(id__in=ids_pedidos).values_list("id", flat=True))
+
+    objetos, errores = [], []
+    for indice, item in enumerate(items):
+        item = dict(item)
+        madre_rut = item.pop("madre_rut", None)
+        madre_id = _id(item.pop("madre", None))
+        if madre_rut:
+            madre_id = por_rut.get(_rut_normalizado(madre_rut))
+        elif madre_id not in ids_existentes:
+            madre_id = None
+        if madre_id is None:
+            errores.append({"indice": indice, "errores": {"madre": ["Madre inexistente o no indicada."]}})
+            continue
+        objeto, error = _construir(
+            Parto, item, CAMPOS_ESCRITURA_PARTO, excluir=("madre", "registrado_por"),
+            madre_id=madre_id, registrado_por=request.user,
+        )
+        if error:
+            errores.append({"indice": indice, "errores": error})
+        else:
+            objetos.append(objeto)
+    if errores:
+        raise ErrorAPI("Hay elementos inválidos; no se guardó ninguno.", errores=errores)
+
+    with transaction.atomic(using=router.db_for_write(Parto)):
+        creados = _crear_en_lote(Parto, objetos)
+        # bulk_create no emite post_save: se propaga a mano (ver signals.py)
+        propagar_actualizacion(madre_ids={objeto.madre_id for objeto in objetos})
+
+    registrar_accion(request, "API: carga de partos",
+                     f"Usuario {request.user.nombre} cargó {len(creados)} partos por API")
+    return _json({"creados": len(creados), "ids": [objeto.pk for objeto in creados]}, status=201)
+
+
+@token_api_required(*ROLES_ESCRITURA)
+@require_POST
+@_errores_api
+def recien_nacidos_lote(request):
+    """Crea recién nacidos del parto indicado en "parto" (id)."""
+    items = _leer_lote(request)
+    ids_pedidos = {_id(item.get("parto")) for item in items} - {None}
+    ids_existentes = set(Parto.objects.filter(id__in=ids_pedidos).values_list("id", flat=True))
+
+    objetos, errores = [], []
+    for indice, item in enumerate(items):
+        item = dict(item)
+        parto_id = _id(item.pop("parto", None))
+        if parto_id not in ids_existentes:
+            errores.append({"indice": indice, "errores": {"parto": ["Parto inexistente o no indicado."]}})
+            continue
+        objeto, error = _construir(RecienNacido, item, CAMPOS_ESCRITURA_RN, excluir=("parto",), parto_id=parto_id)
+        # Misma regla que RecienNacidoForm.clean
+        if objeto is not None:
+            if objeto.fallecido and not objeto.tipo_fallecimiento:
+                error = {"tipo_fallecimiento": ["Obligatorio si el recién nacido está marcado como fallecido."]}
+            elif not objeto.fallecido:
+                objeto.tipo_fallecimiento = None
+        if error:
+            errores.append({"indice": indice, "errores": error})
+        else:
+            objetos.append(objeto)
+    if errores:
+        raise ErrorAPI("Hay elementos inválidos; no se guardó ninguno.", errores=errores)
+
+    with transaction.atomic(using=router.db_for_write(RecienNacido)):
+        creados = _crear_en_lote(RecienNacido, objetos)
+        propagar_actualizacion(parto_ids={objeto.parto_id for objeto in objetos})
+
+    registrar_accion(request, "API: carga de recién nacidos",
+                     f"Usuario {request.user.nombre} cargó {len(creados)} recién nacidos por API")
+    return _json({"creados": len(creados), "ids": [objeto.pk for objeto in creados]}, status=201)
+
+
+# ---------------------------
+# Feed de cambios
+# ---------------------------
+
+CAMPOS_FEED = {"madre": CAMPOS_MADRE, "parto": CAMPOS_PARTO, "reciennacido": CAMPOS_RN}
+
+
+@token_api_required(*ROLES_LECTURA)
+@require_GET
+@_errores_api
+def cambios(request):
+    """
+    Cambios posteriores a ?desde=<cursor> (0 la primera vez), en orden. El
+    consumidor guarda "cursor" y repite mientras "hay_mas" sea verdadero.
+    Con ?datos=1 cada cambio incluye el registro actual ("datos": null si se eliminó).
+    """
+    desde = request.GET.get("desde", "0")
+    if not desde.isdigit():
+        raise ErrorAPI("'desde' debe ser el cursor numérico devuelto por la consulta anterior.")
+    limite = _entero(request, "limit", LIMITE_POR_DEFECTO, LIMITE_MAXIMO)
+    filas, cursor, hay_mas = cambios_desde(
+        int(desde), limite, incluir_datos=request.GET.get("datos") == "1", campos=CAMPOS_FEED
+    )
+    return _json({"cambios": filas, "cursor": cursor, "hay_mas": hay_mas})
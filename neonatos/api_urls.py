@@ -0,0 +1,22 @@
+from django.urls import path
+
+from . import api
+
+app_name = "api_v1"
+
+urlpatterns = [
+    path("madres/", api.madres, name="madres"),
+    path("madres/lote/", api.madres_lote, name="madres_lote"),
+    path("madres/<int:pk>/", api.madre_detalle, name="madre_detalle"),
+
+    path("partos/", api.partos, name="partos"),
+    path("partos/lote/", api.partos_lote, name="partos_lote"),
+    path("partos/<int:pk>/", api.parto_detalle, name="parto_detalle"),
+
+    path("recien-nacidos/", api.recien_nacidos, name="recien_nacidos"),
+    path("recien-nacidos/lote/", api.recien_nacidos_lote, name="recien_nacidos_lote"),
+    path("recien-nacidos/<int:pk>/", api.recien_nacido_detalle, name="recien_nacido_detalle"),
+
+    # Feed de cambios para sincronización incremental
+    path("cambios/", api.cambios, name="cambios"),
+]
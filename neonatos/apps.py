@@ -5,4 +5,5 @@ class NeonatosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'neonatos'
 
-
+    def ready(self):
+        import neonatos.signals
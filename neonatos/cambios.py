@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Cambio, Madre, Parto, RecienNacido
+
+# ===========================
+# LECTURA DEL FEED DE CAMBIOS
+# ===========================
+# Un consumidor guarda el último id recibido y pide los cambios posteriores:
+# sincroniza en O(cambios) en lugar de reexportar toda la base.
+#
+# Los ids se asignan al insertar, pero las transacciones pueden confirmarse en
+# otro orden: el #11 puede ser visible antes que el #10. Para no saltarse el #10
+# solo se entregan cambios con más de CAMBIOS_RETRASO segundos de antigüedad.
+# Transacciones más largas que ese margen podrían perderse, así que debe ser
+# mayor que la duración máxima de una escritura, incluida la espera por
+# bloqueos (innodb_lock_wait_timeout, 50 s por defecto en MySQL).
+#
+# Solo se registran cambios de los datos de cada fila: la propagación de
+# actualizado_en hacia la madre (signals.py) no genera entradas.
+
+MODELOS = {modelo._meta.model_name: modelo for modelo in (Madre, Parto, RecienNacido)}
+
+
+def cambios_desde(cursor, limite, incluir_datos=False, campos=None):
+    """
+    Hasta `limite` cambios con id > cursor. Devuelve (cambios, nuevo_cursor, hay_mas).
+    Con incluir_datos cada cambio trae el registro actual (una consulta .values()
+    por modelo); es None si el registro ya no existe. `campos` indica las columnas
+    por modelo ({"madre": [...], ...}); por defecto todas.
+    """
+    corte = timezone.now() - timedelta(seconds=getattr(settings, "CAMBIOS_RETRASO", 60))
+    filas = list(
+        Cambio.objects.filter(id__gt=cursor, fecha__lte=corte)
+        .order_by("id")
+        .values("id", "modelo", "objeto_id", "operacion", "fecha")[:limite + 1]
+    )
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    if incluir_datos:
+        registros = {}
+        for nombre, modelo in MODELOS.items():
+            ids = {fila["objeto_id"] for fila in filas if fila["modelo"] == nombre}
+            if ids:
+                columnas = list((campos or {}).get(nombre) or [])
+                if columnas and "id" not in columnas:
+                    columnas.insert(0, "id")
+                registros[nombre] = {
+                    registro["id"]: registro
+                    for registro in modelo.objects.filter(id__in=ids).values(*columnas)
+                }
+        for fila in filas:
+            fila["datos"] = registros.get(fila["modelo"], {}).get(fila["objeto_id"])
+
+    nuevo_cursor = filas[-1]["id"] if filas else cursor
+    return filas, nuevo_cursor, hay_mas
@@ -0,0 +1,100 @@
+from django.http import HttpResponseRedirect
+
+from .models import ConflictoVersion
+
+# ===========================
+# EDICIÓN CON CONCURRENCIA OPTIMISTA
+# ===========================
+# El formulario lleva oculta la versión del registro al abrirse. Al guardar,
+# RegistraCambiosMixin hace el UPDATE solo si la versión sigue siendo esa
+# (compare-and-swap); si otra matrona guardó antes, se vuelve a mostrar el
+# formulario con sus datos y una tabla campo a campo contra lo guardado.
+# Solo se escriben las columnas que cambiaron (update_fields).
+
+
+def _mostrar(instancia, campo):
+    valor = getattr(instancia, campo.attname)
+    if valor is None or valor == "":
+        return "—"
+    if campo.is_relation:
+        return str(getattr(instancia, campo.name))
+    if campo.choices:
+        return getattr(instancia, f"get_{campo.name}_display")()
+    if isinstance(valor, bool):
+        return "Sí" if valor else "No"
+    return str(valor)
+
+
+class EdicionConcurrenteMixin:
+    """
+    Para UpdateView de modelos con RegistraCambiosMixin. La plantilla debe
+    incluir <input type="hidden" name="version" value="{{ version_formulario }}">
+    y mostrar `conflicto` (lista de etiqueta, valor guardado, valor propio).
+    Las subclases registran la acción en registrar_edicion() en vez de form_valid().
+    """
+
+    conflicto = None
+    version_formulario = None
+
+    def _campos_editables(self, form):
+        return [
+            campo for campo in self.model._meta.concrete_fields
+            if not campo.primary_key and campo.name in form.fields
+        ]
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # Foto del registro antes de que el formulario lo modifique (construct_instance)
+        self._originales = {
+            campo.attname: getattr(self.object, campo.attname)
+            for campo in self.model._meta.concrete_fields
+        }
+        return kwargs
+
+    def _version_leida(self):
+        try:
+            return int(self.request.POST["version"])
+        except (KeyError, ValueError):
+            # Formulario sin versión (página abierta antes de este cambio): se compara con la actual
+            return self.object.version
+
+    def form_valid(self, form):
+        self.object = form.save(commit=False)
+        cambiados = [
+            campo.name for campo in self._campos_editables(form)
+            if getattr(self.object, campo.attname) != self._originales[campo.attname]
+        ]
+        if cambiados:
+            self.object.version = self._version_leida()
+            try:
+                self.object.save(update_fields=cambiados)
+            except ConflictoVersion:
+                return self.form_conflicto(form)
+            form.save_m2m()
+        self.registrar_edicion()
+        return HttpResponseRedirect(self.get_success_url())
+
+    def registrar_edicion(self):
+        pass
+
+    def form_conflicto(self, form):
+        actual = self.model._base_manager.get(pk=self.object.pk)
+        self.conflicto = [
+            (campo.verbose_name, _mostrar(actual, campo), _mostrar(self.object, campo))
+            for campo in self._campos_editables(form)
+            if getattr(actual, campo.attname) != getattr(self.object, campo.attname)
+        ]
+        # Guardar de nuevo desde esta pantalla sobrescribe conscientemente la versión vigente
+        self.version_formulario = actual.version
+        form.add_error(
+            None,
+            "Otro usuario modificó este registro mientras usted lo editaba. Revise las "
+            "diferencias y vuelva a guardar para conservar sus datos.",
+        )
+        return self.render_to_response(self.get_context_data(form=form))
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["version_formulario"] = self.version_formulario or self.object.version
+        ctx["conflicto"] = self.conflicto
+        return ctx
@@ -0,0 +1,97 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+# ===========================
+# GET CONDICIONAL (ETag / Last-Modified)
+# ===========================
+# La vista recibe una función que entrega la versión del recurso con una sola
+# consulta liviana (marca de tiempo). Si el navegador ya tiene esa versión se
+# responde 304 sin consultar ni renderizar nada más.
+#
+# El ETag incluye al usuario y la cookie CSRF: la página lleva el formulario de
+# cierre de sesión con token, y no debe reutilizarse tras un nuevo login.
+# Con Cache-Control "private, no-cache" el navegador siempre revalida.
+
+# Cambia en cada despliegue de Render: plantillas nuevas invalidan los ETag
+VERSION_DESPLIEGUE = getattr(settings, "VERSION_DESPLIEGUE", "")
+
+
+def _etag(request, version):
+    base = ":".join([
+        request.path,
+        version,
+        str(getattr(request.user, "pk", "")),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+        VERSION_DESPLIEGUE,
+    ])
+    return '"%s"' % hashlib.md5(base.encode(), usedforsecurity=False).hexdigest()
+
+
+def _preparar(request, marca):
+    """(etag, timestamp, respuesta 304 o None) para la marca (version, datetime)."""
+    version, actualizado = marca
+    etag = _etag(request, version)
+    ultima = int(actualizado.timestamp()) if actualizado else None
+    return etag, ultima, get_conditional_response(request, etag=etag, last_modified=ultima)
+
+
+def _completar(response, etag, ultima):
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+        if ultima:
+            response.headers.setdefault("Last-Modified", http_date(ultima))
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def get_condicional(marca_func):
+    """
+    Decorador para vistas de solo lectura (sync o async). marca_func recibe los
+    mismos argumentos que la vista y devuelve (version, datetime), o None si el
+    registro no existe (la vista responde el 404). En vistas async marca_func
+    también debe ser async.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+                marca = await marca_func(request, *args, **kwargs)
+                if marca is None:
+                    return await view_func(request, *args, **kwargs)
+                etag, ultima, no_modificado = _preparar(request, marca)
+                if no_modificado is not None:
+                    return no_modificado
+                return _completar(await view_func(request, *args, **kwargs), etag, ultima)
+        else:
+            def wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return view_func(request, *args, **kwargs)
+                marca = marca_func(request, *args, **kwargs)
+                if marca is None:
+                    return view_func(request, *args, **kwargs)
+                etag, ultima, no_modificado = _preparar(request, marca)
+                if no_modificado is not None:
+                    return no_modificado
+                return _completar(view_func(request, *args, **kwargs), etag, ultima)
+        return wraps(view_func)(wrapper)
+    return decorator
+
+
+def marca_registro(modelo, *campos):
+    """
+    marca_func para vistas de detalle (kwarg pk): la versión es la fecha de
+    modificación más reciente entre los campos dados, en una sola consulta.
+    """
+    def marca(request, *args, pk=None, **kwargs):
+        fila = modelo.objects.filter(pk=pk).values_list(*campos).first()
+        if fila is None:
+            return None
+        actualizado = max(valor for valor in fila if valor is not None)
+        return actualizado.isoformat(), actualizado
+    return marca
@@ -0,0 +1,208 @@
+import csv
+import math
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router, transaction
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import PercentilRN, RecienNacido
+
+# ===========================
+# PERCENTILES DE CRECIMIENTO AL NACER
+# ===========================
+# La cohorte se lee como columnas (values_list) y se pasa a arreglos NumPy:
+# z-score LMS, percentil y clasificación PEG/AEG/GEG se calculan para todos
+# los RN a la vez, sin bucles por registro. La tabla de referencia es un CSV
+# (sexo, semanas, medida, L, M, S) con los valores oficiales (Fenton 2013 o
+# INTERGROWTH-21st) que indica CRECIMIENTO_TABLA. No se incluye ninguna: sin
+# ella no se calculan percentiles ni se genera la hoja CRECIMIENTO.
+
+PERCENTIL_PEG = 10
+PERCENTIL_GEG = 90
+
+_tablas = {}
+
+
+def ruta_tabla():
+    """Ruta de CRECIMIENTO_TABLA, o None si no está configurada (percentiles desactivados)."""
+    ruta = getattr(settings, "CRECIMIENTO_TABLA", "")
+    return Path(ruta) if ruta else None
+
+
+def cargar_tabla(ruta=None):
+    """{(sexo, medida): arreglo 4xN de semanas, L, M, S}. Se lee una vez por proceso."""
+    ruta = ruta or ruta_tabla()
+    if ruta is None:
+        raise ImproperlyConfigured("CRECIMIENTO_TABLA no está configurada: no hay tabla de referencia.")
+    ruta = Path(ruta)
+    if ruta not in _tablas:
+        filas = {}
+        with open(ruta, newline="", encoding="utf-8") as archivo:
+            for fila in csv.DictReader(linea for linea in archivo if not linea.startswith("#")):
+                filas.setdefault((fila["sexo"], fila["medida"]), []).append(
+                    [float(fila[campo]) for campo in ("semanas", "L", "M", "S")]
+                )
+        _tablas[ruta] = {clave: np.array(sorted(valores)).T for clave, valores in filas.items()}
+    return _tablas[ruta]
+
+
+def _normal_acumulada(z):
+    # Φ(z) = (1 + erf(z/√2)) / 2, con erf de Abramowitz-Stegun 7.1.26 (error < 1.5e-7):
+    # math.erf no opera sobre arreglos. NaN se propaga.
+    x = np.abs(z) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    polinomio = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - polinomio * np.exp(-x * x)
+    return 0.5 * (1.0 + np.sign(z) * erf)
+
+
+def puntajes_z(tabla, medida, sexo, semanas, valores):
+    """
+    z LMS de `valores` para cada RN. Entre semanas se interpola L, M y S.
+    NaN si falta el dato o la edad gestacional está fuera de la tabla.
+    """
+    z = np.full(len(valores), np.nan)
+    for codigo in ("F", "M"):
+        if (codigo, medida) not in tabla:
+            continue
+        ref_semanas, ref_l, ref_m, ref_s = tabla[(codigo, medida)]
+        mascara = (
+            (sexo == codigo) & (semanas >= ref_semanas[0]) & (semanas <= ref_semanas[-1])
+            & (valores > 0)  # NaN da False
+        )
+        x, g = valores[mascara], semanas[mascara]
+        l = np.interp(g, ref_semanas, ref_l)
+        m = np.interp(g, ref_semanas, ref_m)
+        s = np.interp(g, ref_semanas, ref_s)
+        l_segura = np.where(l == 0, 1.0, l)
+        z[mascara] = np.where(l == 0, np.log(x / m) / s, (np.power(x / m, l_segura) - 1.0) / (l_segura * s))
+    return z
+
+
+def columnas(queryset):
+    """(ids, sexo, peso kg, talla cm, semanas) como arreglos; None en la base queda como NaN."""
+    filas = list(queryset.values_list(
+        "id", "sexo", Cast("peso", FloatField()), "talla", "parto__edad_gestacional",
+    ))
+    if not filas:
+        vacio = np.array([], dtype=float)
+        return np.array([], dtype=np.int64), np.array([], dtype="U1"), vacio, vacio, vacio
+    ids, sexo, peso, talla, semanas = zip(*filas)
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(sexo, dtype="U1"),
+        np.array(peso, dtype=float),
+        np.array(talla, dtype=float),
+        np.array(semanas, dtype=float),
+    )
+
+
+def clasificar(percentil_peso):
+    """PEG bajo p10, GEG sobre p90, AEG entre ambos (inclusive); vacío si el percentil es NaN."""
+    clasificacion = np.full(len(percentil_peso), "", dtype="U3")
+    clasificacion[percentil_peso < PERCENTIL_PEG] = PercentilRN.PEG
+    clasificacion[(percentil_peso >= PERCENTIL_PEG) & (percentil_peso <= PERCENTIL_GEG)] = PercentilRN.AEG
+    clasificacion[percentil_peso > PERCENTIL_GEG] = PercentilRN.GEG
+    return clasificacion
+
+
+def calcular(queryset, tabla=None):
+    """Percentiles de los RN del queryset, como diccionario de arreglos alineados por id."""
+    tabla = tabla or cargar_tabla()
+    ids, sexo, peso, talla, semanas = columnas(queryset)
+    z_peso = puntajes_z(tabla, "peso", sexo, semanas, peso)
+    z_talla = puntajes_z(tabla, "talla", sexo, semanas, talla)
+    percentil_peso = _normal_acumulada(z_peso) * 100
+    percentil_talla = _normal_acumulada(z_talla) * 100
+    return {
+        "ids": ids,
+        "sexo": sexo,
+        "semanas": semanas,
+        "z_peso": z_peso,
+        "percentil_peso": percentil_peso,
+        "z_talla": z_talla,
+        "percentil_talla": percentil_talla,
+        "clasificacion": clasificar(percentil_peso),
+    }
+
+
+def pendientes():
+    """RN sin percentil o modificados (ellos o su parto) después del último cálculo."""
+    return RecienNacido.objects.filter(
+        Q(percentil__isnull=True)
+        | Q(actualizado_en__gt=F("percentil__calculado_en"))
+        | Q(parto__actualizado_en__gt=F("percentil__calculado_en"))
+    )
+
+
+def _opcional(valor):
+    return None if math.isnan(valor) else round(float(valor), 4)
+
+
+def guardar_percentiles(queryset=None, lote=20000):
+    """
+    Calcula y guarda (upsert) los percentiles de los RN del queryset, por
+    defecto los pendientes, en tramos de `lote` ids. Devuelve cuántos guardó.
+    """
+    queryset = (pendientes() if queryset is None else queryset).order_by("id")
+    tabla = cargar_tabla()
+    nombre_tabla = ruta_tabla().name
+    alias = router.db_for_write(PercentilRN)
+    # MySQL no admite indicar la columna del conflicto: usa la clave primaria (rn)
+    unique_fields = ["rn"] if connections[alias].features.supports_update_conflicts_with_target else None
+
+    total, ultimo = 0, 0
+    while True:
+        # La marca se toma antes de leer: una edición concurrente vuelve a quedar pendiente
+        calculado_en = timezone.now()
+        datos = calcular(queryset.filter(id__gt=ultimo)[:lote], tabla)
+        if not len(datos["ids"]):
+            return total
+        objetos = [
+            PercentilRN(
+                rn_id=int(rn_id),
+                z_peso=_opcional(zp), percentil_peso=_opcional(pp),
+                z_talla=_opcional(zt), percentil_talla=_opcional(pt),
+                clasificacion=str(clase), tabla=nombre_tabla, calculado_en=calculado_en,
+            )
+            for rn_id, zp, pp, zt, pt, clase in zip(
+                datos["ids"], datos["z_peso"], datos["percentil_peso"],
+                datos["z_talla"], datos["percentil_talla"], datos["clasificacion"],
+            )
+        ]
+        with transaction.atomic(using=alias):
+            PercentilRN.objects.using(alias).bulk_create(
+                objetos,
+                batch_size=2000,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=["z_peso", "percentil_peso", "z_talla", "percentil_talla",
+                               "clasificacion", "tabla", "calculado_en"],
+            )
+        total += len(objetos)
+        ultimo = int(datos["ids"][-1])
+
+
+def resumen_clasificacion(queryset):
+    """
+    Conteos PEG/AEG/GEG/sin clasificar por sexo y por término (>= 37 semanas)
+    de los RN del queryset, calculados en memoria sobre la cohorte.
+    """
+    datos = calcular(queryset)
+    clasificacion, sexo, semanas = datos["clasificacion"], datos["sexo"], datos["semanas"]
+    resumen = {}
+    for clase in (PercentilRN.PEG, PercentilRN.AEG, PercentilRN.GEG, ""):
+        de_clase = clasificacion == clase
+        resumen[clase] = {
+            "F": int(np.count_nonzero(de_clase & (sexo == "F"))),
+            "M": int(np.count_nonzero(de_clase & (sexo == "M"))),
+            "pretermino": int(np.count_nonzero(de_clase & (semanas < 37))),
+            "termino": int(np.count_nonzero(de_clase & (semanas >= 37))),
+            "total": int(np.count_nonzero(de_clase)),
+        }
+    return resumen
@@ -0,0 +1,269 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .eliminacion import eliminar_madre
+from .models import Cambio, Madre, Parto, PosibleDuplicado
+from .signals import propagar_actualizacion
+
+# ===========================
+# DETECCIÓN DE MADRES DUPLICADAS
+# ===========================
+# Comparar todos los pares es O(n²). Cada madre recibe unas pocas claves de
+# bloqueo (apellido y nombre fonéticos, ambos apellidos, RUT con un dígito
+# enmascarado, edad + comuna + apellido) y solo se comparan las madres que
+# comparten alguna. Las claves se procesan de a un tipo por vez para no tener
+# todos los bloques en memoria. Bloques más grandes que DUPLICADOS_BLOQUE_MAXIMO
+# (apellidos muy comunes sin otro dato en común) se omiten.
+
+PARTICULAS = {"de", "del", "la", "las", "los", "y", "da", "van", "von"}
+
+_FONETICA = [
+    (re.compile(r"ch"), "x"),
+    (re.compile(r"ll"), "y"),
+    (re.compile(r"qu"), "k"),
+    (re.compile(r"gu(?=[ei])"), "g"),
+    (re.compile(r"c(?=[ei])"), "s"),
+    (re.compile(r"g(?=[ei])"), "j"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"[vw]"), "b"),
+    (re.compile(r"h"), ""),
+    (re.compile(r"y(?![aeiou])"), "i"),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+
+
+class ErrorFusion(Exception):
+    """El par no se puede fusionar (ya resuelto o una de las madres no existe)."""
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes ni signos; ñ -> n."""
+    texto = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z ]", " ", texto.lower())
+
+
+def tokens(texto):
+    return [t for t in normalizar(texto).split() if t not in PARTICULAS]
+
+
+def fonetica(palabra):
+    """Clave fonética simple para el español (b/v, s/z/c, ll/y, h muda, letras dobles)."""
+    for patron, reemplazo in _FONETICA:
+        palabra = patron.sub(reemplazo, palabra)
+    return palabra
+
+
+def _cuerpo_rut(rut):
+    return re.sub(r"[^0-9]", "", (rut or "").split("-")[0])
+
+
+def distancia(a, b):
+    """Distancia de edición con transposiciones de vecinos (dígitos intercambiados al digitar)."""
+    previa2, previa = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            costo = a[i - 1] != b[j - 1]
+            actual[j] = min(previa[j] + 1, actual[j - 1] + 1, previa[j - 1] + costo)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                actual[j] = min(actual[j], previa2[j - 2] + 1)
+        previa2, previa = previa, actual
+    return previa[len(b)]
+
+
+class _Ficha:
+    __slots__ = ("id", "rut", "cuerpo", "nombre", "nombres", "apellidos", "edad", "comuna", "telefono")
+
+    def __init__(self, id, rut, nombres, apellidos, edad, comuna, telefono):
+        self.id = id
+        self.rut = rut
+        self.cuerpo = _cuerpo_rut(rut)
+        self.nombres = tokens(nombres)
+        self.apellidos = tokens(apellidos)
+        # Tokens ordenados: "Pérez Soto Ana" y "Ana Soto Pérez" comparan igual
+        self.nombre = " ".join(sorted(self.nombres + self.apellidos))
+        self.edad = edad
+        self.comuna = normalizar(comuna).strip()
+        self.telefono = re.sub(r"\D", "", telefono or "")[-8:]
+
+
+def _claves_nombre(ficha):
+    if ficha.apellidos and ficha.nombres:
+        yield f"{fonetica(ficha.apellidos[0])}|{fonetica(ficha.nombres[0])}"
+
+
+def _claves_apellidos(ficha):
+    if len(ficha.apellidos) >= 2:
+        yield "|".join(fonetica(a) for a in ficha.apellidos[:2])
+
+
+def _claves_rut(ficha):
+    # Un dígito mal digitado deja igual al RUT con esa posición enmascarada
+    for i in range(len(ficha.cuerpo)):
+        yield f"{i}|{ficha.cuerpo[:i]}*{ficha.cuerpo[i + 1:]}"
+
+
+def _claves_edad_comuna(ficha):
+    if ficha.comuna and ficha.apellidos:
+        yield f"{ficha.edad}|{ficha.comuna}|{fonetica(ficha.apellidos[0])}"
+
+
+BLOQUEOS = (_claves_nombre, _claves_apellidos, _claves_rut, _claves_edad_comuna)
+
+
+def puntaje(a, b, umbral=0.0):
+    """
+    Similitud 0-1 de dos fichas y los motivos que más aportan, o None si no
+    puede alcanzar `umbral`. La comparación de nombres (SequenceMatcher) es lo
+    caro: se omite cuando ni con nombres idénticos se llegaría al umbral.
+    """
+    dist_rut = distancia(a.cuerpo, b.cuerpo)
+    rut = {0: 1.0, 1: 0.8, 2: 0.5}.get(dist_rut, 0.0)
+    edad = 1.0 if a.edad == b.edad else 0.5 if abs(a.edad - b.edad) <= 1 else 0.0
+    contacto = 1.0 if (a.comuna and a.comuna == b.comuna) or (a.telefono and a.telefono == b.telefono) else 0.0
+    resto = 0.25 * rut + 0.1 * edad + 0.1 * contacto
+
+    comparador = SequenceMatcher(None, a.nombre, b.nombre)
+    if resto + 0.55 * comparador.real_quick_ratio() < umbral or resto + 0.55 * comparador.quick_ratio() < umbral:
+        return None
+    nombre = comparador.ratio()
+    total = resto + 0.55 * nombre
+    if total < umbral:
+        return None
+
+    motivos = [f"nombre {nombre:.0%}"]
+    if rut:
+        motivos.append("mismo RUT sin DV" if dist_rut == 0 else f"RUT a {dist_rut} dígito(s)")
+    if edad == 1.0:
+        motivos.append("misma edad")
+    if contacto:
+        motivos.append("misma comuna o teléfono")
+    return total, motivos
+
+
+def pares_candidatos(fichas, bloque_maximo):
+    """Pares (i, j) de índices de `fichas` que comparten alguna clave de bloqueo."""
+    pares = set()
+    for claves_de in BLOQUEOS:
+        bloques = {}
+        for indice, ficha in enumerate(fichas):
+            for clave in claves_de(ficha):
+                bloques.setdefault(clave, []).append(indice)
+        for miembros in bloques.values():
+            if 1 < len(miembros) <= bloque_maximo:
+                pares.update(combinations(miembros, 2))
+    return pares
+
+
+def detectar_duplicados(umbral=None, bloque_maximo=None):
+    """
+    Busca pares de madres con puntaje >= umbral y guarda los nuevos como
+    PosibleDuplicado pendientes (los ya revisados no se vuelven a proponer).
+    Devuelve (madres, pares comparados, pares nuevos).
+    """
+    umbral = umbral if umbral is not None else getattr(settings, "DUPLICADOS_UMBRAL", 0.8)
+    bloque_maximo = bloque_maximo or getattr(settings, "DUPLICADOS_BLOQUE_MAXIMO", 200)
+
+    fichas = [
+        _Ficha(*fila)
+        for fila in Madre.objects.order_by("id")
+        .values_list("id", "rut", "nombres", "apellidos", "edad", "comuna", "telefono")
+        .iterator(chunk_size=5000)
+    ]
+    candidatos = pares_candidatos(fichas, bloque_maximo)
+
+    existentes = set(PosibleDuplicado.objects.values_list("madre_a_id", "madre_b_id"))
+    nuevos = []
+    for i, j in candidatos:
+        a, b = fichas[i], fichas[j]  # fichas en orden de id: a.id < b.id
+        if (a.id, b.id) in existentes:
+            continue
+        resultado = puntaje(a, b, umbral)
+        if resultado is not None:
+            total, motivos = resultado
+            nuevos.append(PosibleDuplicado(
+                madre_a_id=a.id, madre_b_id=b.id, puntaje=round(total, 4),
+                detalle={
+                    "a": {"rut": a.rut, "nombre": " ".join(a.nombres + a.apellidos)},
+                    "b": {"rut": b.rut, "nombre": " ".join(b.nombres + b.apellidos)},
+                    "motivos": motivos,
+                },
+            ))
+    PosibleDuplicado.objects.bulk_create(nuevos, batch_size=1000, ignore_conflicts=True)
+    return len(fichas), len(candidatos), len(nuevos)
+
+
+def _bloquear_pendiente(par, using):
+    """Relee el par con bloqueo de fila; solo un POST puede resolverlo."""
+    bloqueado = PosibleDuplicado.objects.using(using).select_for_update().filter(pk=par.pk).first()
+    if bloqueado is None or bloqueado.estado != PosibleDuplicado.PENDIENTE:
+        raise ErrorFusion("Este par ya fue revisado.")
+    return bloqueado
+
+
+def descartar(par, usuario=None):
+    using = router.db_for_write(PosibleDuplicado)
+    with transaction.atomic(using=using):
+        par = _bloquear_pendiente(par, using)
+        par.estado = PosibleDuplicado.DESCARTADO
+        par.resuelto_por = usuario
+        par.resuelto_en = timezone.now()
+        par.save(using=using, update_fields=["estado", "resuelto_por", "resuelto_en"])
+
+
+def fusionar(par, conservar_id, usuario=None):
+    """
+    Traspasa los partos de la otra madre a `conservar_id` y elimina la ficha
+    sobrante (queda en la papelera), todo en una transacción. Devuelve el
+    número de partos traspasados.
+    """
+    using = router.db_for_write(Madre)
+    with transaction.atomic(using=using):
+        par = _bloquear_pendiente(par, using)
+        ids = {par.madre_a_id, par.madre_b_id}
+        if conservar_id not in ids or None in ids:
+            raise ErrorFusion("La madre a conservar no pertenece al par.")
+        sobrante_id = (ids - {conservar_id}).pop()
+
+        madres = {m.pk: m for m in Madre.objects.using(using).select_for_update().filter(pk__in=ids)}
+        if len(madres) < 2:
+            raise ErrorFusion("Una de las madres ya no existe.")
+
+        parto_ids = list(Parto.objects.using(using).filter(madre_id=sobrante_id).values_list("id", flat=True))
+        # Sube la versión: un formulario abierto sobre estos partos detecta el cambio de madre
+        Parto.objects.using(using).filter(pk__in=parto_ids).update(
+            madre_id=conservar_id, version=F("version") + 1, actualizado_en=timezone.now(),
+        )
+        Cambio.registrar_lote(Parto, [(pk, Cambio.ACTUALIZADO) for pk in parto_ids], using=using)
+        propagar_actualizacion(madre_ids=[conservar_id])
+
+        par.estado = PosibleDuplicado.FUSIONADO
+        par.resuelto_por = usuario
+        par.resuelto_en = timezone.now()
+        par.detalle = {**par.detalle, "conservada": conservar_id, "partos_traspasados": len(parto_ids)}
+        par.save(using=using, update_fields=["estado", "resuelto_por", "resuelto_en", "detalle"])
+
+        eliminar_madre(madres[sobrante_id], usuario)
+    return len(parto_ids)
+
+
+def pares_pendientes():
+    return PosibleDuplicado.objects.filter(
+        estado=PosibleDuplicado.PENDIENTE, madre_a__isnull=False, madre_b__isnull=False,
+    ).select_related("madre_a", "madre_b")
+
+
+def partos_por_madre(pares):
+    ids = {par.madre_a_id for par in pares} | {par.madre_b_id for par in pares}
+    conteo = {}
+    for madre_id in Parto.objects.filter(madre_id__in=ids).values_list("madre_id", flat=True):
+        conteo[madre_id] = conteo.get(madre_id, 0) + 1
+    return conteo
@@ -0,0 +1,143 @@
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .models import Cambio, ElementoPapelera, Madre, Parto, PercentilRN, PosibleDuplicado, RecienNacido
+from .signals import propagar_actualizacion
+
+# ===========================
+# ELIMINACIÓN EN CASCADA Y PAPELERA
+# ===========================
+# Django borra con el Collector: carga en memoria cada Parto y RecienNacido
+# relacionado y emite sus señales uno por uno. Aquí la cascada se hace con un
+# DELETE por tabla dentro de una transacción: primero se cuentan y copian las
+# filas (values(), una consulta por tabla) a la Papelera, que sirve de
+# auditoría y permite restaurarlas con sus mismos ids. Como no hay señales, el
+# feed de cambios y las marcas de actualización se escriben aquí en lote.
+
+
+class ErrorRestauracion(Exception):
+    """El contenido de la papelera no se puede reinsertar (ya restaurado o en conflicto)."""
+
+
+def _borrar(queryset, using):
+    # QuerySet._raw_delete: DELETE ... WHERE directo, sin Collector ni señales
+    return queryset._raw_delete(using)
+
+
+def _eliminar(modelo, objeto_id, descripcion, filas_madre, partos, usuario, using):
+    filas_partos = list(partos.values())
+    parto_ids = [fila["id"] for fila in filas_partos]
+    rns = RecienNacido.objects.using(using).filter(parto_id__in=parto_ids)
+    filas_rn = list(rns.values())
+
+    elemento = ElementoPapelera.objects.using(using).create(
+        modelo=modelo,
+        objeto_id=objeto_id,
+        descripcion=descripcion,
+        total_partos=len(filas_partos),
+        total_recien_nacidos=len(filas_rn),
+        datos={"madre": filas_madre, "partos": filas_partos, "recien_nacidos": filas_rn},
+        eliminado_por=usuario,
+    )
+
+    # Los percentiles son derivados: no van a la papelera y se recalculan al restaurar
+    _borrar(PercentilRN.objects.using(using).filter(rn_id__in=[fila["id"] for fila in filas_rn]), using)
+    _borrar(rns, using)
+    _borrar(partos, using)
+    if filas_madre is not None:
+        # Los pares pendientes con esta madre ya no tienen sentido; los resueltos quedan como historial
+        pares = PosibleDuplicado.objects.using(using)
+        _borrar(pares.filter(Q(madre_a_id=objeto_id) | Q(madre_b_id=objeto_id), estado=PosibleDuplicado.PENDIENTE), using)
+        pares.filter(madre_a_id=objeto_id).update(madre_a=None)
+        pares.filter(madre_b_id=objeto_id).update(madre_b=None)
+        _borrar(Madre.objects.using(using).filter(pk=objeto_id), using)
+
+    for clase, filas in ((RecienNacido, filas_rn), (Parto, filas_partos), (Madre, [filas_madre] if filas_madre else [])):
+        Cambio.registrar_lote(clase, [(fila["id"], Cambio.ELIMINADO) for fila in filas], using=using)
+    return elemento
+
+
+def eliminar_madre(madre, usuario=None):
+    """Elimina la madre con sus partos y recién nacidos y deja todo en la papelera."""
+    using = router.db_for_write(Madre)
+    with transaction.atomic(using=using):
+        # Bloquea la madre: un parto nuevo no puede colarse entre la copia y el DELETE
+        fila = Madre.objects.using(using).select_for_update().filter(pk=madre.pk).values().first()
+        if fila is None:
+            raise Madre.DoesNotExist(f"La madre {madre.pk} ya no existe.")
+        return _eliminar(
+            ElementoPapelera.MADRE, madre.pk, f"{madre.nombres} {madre.apellidos} ({madre.rut})", fila,
+            Parto.objects.using(using).filter(madre_id=madre.pk), usuario, using,
+        )
+
+
+def eliminar_parto(parto, usuario=None):
+    """Elimina el parto con sus recién nacidos y deja todo en la papelera."""
+    using = router.db_for_write(Parto)
+    with transaction.atomic(using=using):
+        # Bloquea el parto: un recién nacido nuevo no puede colarse entre la copia y el DELETE
+        if not Parto.objects.using(using).select_for_update().filter(pk=parto.pk).exists():
+            raise Parto.DoesNotExist(f"El parto {parto.pk} ya no existe.")
+        elemento = _eliminar(
+            ElementoPapelera.PARTO, parto.pk, f"Parto ID {parto.pk} del {parto.fecha_parto:%d-%m-%Y}", None,
+            Parto.objects.using(using).filter(pk=parto.pk), usuario, using,
+        )
+        propagar_actualizacion(madre_ids=[parto.madre_id])
+    return elemento
+
+
+def _objetos(modelo, filas):
+    # El JSON guarda fechas y decimales como texto: to_python los devuelve a su tipo.
+    # Columnas que ya no existen se ignoran; las nuevas toman su valor por defecto.
+    campos = {campo.attname: campo for campo in modelo._meta.concrete_fields}
+    return [
+        modelo(**{nombre: campos[nombre].to_python(valor) for nombre, valor in fila.items() if nombre in campos})
+        for fila in filas
+    ]
+
+
+def restaurar(elemento, usuario=None):
+    """
+    Reinserta las filas de la papelera con sus ids originales. Devuelve el id
+    de la madre afectada. Lanza ErrorRestauracion si no es posible.
+    """
+    using = router.db_for_write(Madre)
+    with transaction.atomic(using=using):
+        # Releído con bloqueo: dos restauraciones simultáneas no pueden reinsertar lo mismo
+        elemento = ElementoPapelera.objects.using(using).select_for_update().get(pk=elemento.pk)
+        if elemento.restaurado_en is not None:
+            raise ErrorRestauracion("Este elemento ya fue restaurado.")
+
+        datos = elemento.datos
+        madres = _objetos(Madre, [datos["madre"]] if datos["madre"] else [])
+        partos = _objetos(Parto, datos["partos"])
+        rns = _objetos(RecienNacido, datos["recien_nacidos"])
+        madre_id = madres[0].pk if madres else partos[0].madre_id
+
+        if madres and Madre.objects.using(using).filter(rut=madres[0].rut).exists():
+            raise ErrorRestauracion(f"Ya existe otra madre registrada con el RUT {madres[0].rut}.")
+        if not madres and not Madre.objects.using(using).filter(pk=madre_id).exists():
+            raise ErrorRestauracion("La madre de este parto fue eliminada: restaure primero a la madre.")
+
+        # La matrona que registró el parto puede haber sido dada de baja
+        usuarios = set(get_user_model().objects.filter(pk__in={p.registrado_por_id for p in partos})
+                       .values_list("pk", flat=True))
+        for parto in partos:
+            if parto.registrado_por_id not in usuarios:
+                parto.registrado_por_id = None
+
+        try:
+            with transaction.atomic(using=using):
+                for clase, objetos in ((Madre, madres), (Parto, partos), (RecienNacido, rns)):
+                    clase.objects.using(using).bulk_create(objetos, batch_size=500)
+                    Cambio.registrar_lote(clase, [(obj.pk, Cambio.CREADO) for obj in objetos], using=using)
+        except IntegrityError as exc:
+            raise ErrorRestauracion(f"No se pudo restaurar: {exc}") from exc
+
+        propagar_actualizacion(madre_ids=[madre_id])
+        elemento.restaurado_por = usuario
+        elemento.restaurado_en = timezone.now()
+        elemento.save(using=using, update_fields=["restaurado_por", "restaurado_en"])
+    return madre_id
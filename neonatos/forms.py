@@ -1,3 +1,5 @@
+import copy
+
 from django import forms
 
 from django.contrib.auth import get_user_model
@@ -20,48 +22,115 @@ PESO_REGEX = re.compile(r'^[0-9](\.[0-9]{1,3})?$')
 
 User = get_user_model()
 
-class BaseBootstrapForm(forms.ModelForm):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        for name, field in self.fields.items():
+# Opciones Sí/No de los selects booleanos (el navegador envía "True"/"False")
+SI_NO_CHOICES = [("", "Seleccione una opción..."), (True, "Sí"), (False, "No")]
+
+
+def campo_si_no(label, error_messages=None, **kwargs):
+    """Select Sí/No obligatorio que entrega un booleano en cleaned_data."""
+    return forms.TypedChoiceField(
+        label=label,
+        choices=SI_NO_CHOICES,
+        coerce=lambda x: x in [True, "True", "true"],
+        required=True,
+        widget=forms.Select(attrs={"class": "form-select"}),
+        error_messages={
+            "required": f"Debe seleccionar una opción válida para {label}.",
+            **(error_messages or {}),
+        },
+        **kwargs,
+    )
+
+
+# ===========================
+# CONFIGURACIÓN DE WIDGETS POR CLASE
+# ===========================
+# Django copia base_fields en cada instancia del formulario. La configuración
+# de clases CSS, placeholders y tooltips se aplica una sola vez sobre
+# base_fields al definir la clase, y cada request solo paga esa copia.
+
+class ConfiguracionFormMetaclass(forms.models.ModelFormMetaclass):
+    def __new__(mcs, name, bases, attrs):
+        new_class = super().__new__(mcs, name, bases, attrs)
+        # Los campos declarados se comparten con las clases base: se copian antes de modificarlos
+        new_class.base_fields = copy.deepcopy(new_class.base_fields)
+        new_class.configurar_campos(new_class.base_fields)
+        return new_class
+
+
+class BaseBootstrapForm(forms.ModelForm, metaclass=ConfiguracionFormMetaclass):
+    # Configuración declarativa de cada formulario (ver configurar_campos)
+    CAMPOS_OCULTOS = ()
+    CAMPOS_SI_NO = ()
+    PLACEHOLDERS = {}
+    TOOLTIPS = {}
+
+    @classmethod
+    def configurar_campos(cls, fields):
+        """Se ejecuta una vez por clase sobre base_fields. Las subclases la extienden."""
+        # Booleanos del modelo como select Sí/No obligatorio (salvo que ya se declaren con campo_si_no).
+        # Formulario nuevo: preselecciona el valor por defecto del modelo
+        # (al editar, el valor de la instancia viene en self.initial y tiene prioridad)
+        for campo in cls.CAMPOS_SI_NO:
+            if campo not in fields:
+                continue
+            if not isinstance(fields[campo], forms.TypedChoiceField):
+                fields[campo] = campo_si_no(fields[campo].label)
+            default = cls._meta.model._meta.get_field(campo).get_default()
+            if isinstance(default, bool):
+                fields[campo].initial = str(default)
+
+        for name, field in fields.items():
             css = field.widget.attrs.get("class", "")
             field.widget.attrs["class"] = (css + " form-control").strip()
             if not field.widget.attrs.get("placeholder"):
                 field.widget.attrs["placeholder"] = field.help_text or field.label
             field.widget.attrs["title"] = field.help_text or field.label
 
+        for campo in cls.CAMPOS_OCULTOS:
+            if campo in fields:
+                fields[campo].widget = forms.HiddenInput()
+
+        for campo, texto in cls.TOOLTIPS.items():
+            if campo in fields:
+                fields[campo].help_text = texto
+                fields[campo].widget.attrs["title"] = texto
+
+        for campo, texto in cls.PLACEHOLDERS.items():
+            if campo in fields:
+                fields[campo].widget.attrs.update({"placeholder": texto})
+
 
 class MadreForm(BaseBootstrapForm):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    # Ejemplos (placeholders) para cada campo del formulario
+    PLACEHOLDERS = {
+        "nombres": "Ej: María José",
+        "apellidos": "Ej: González Soto",
+        "telefono": "Ej: 12345678",  # <-- Ya no mostramos +569 aquí
+        "domicilio": "Ej: Calle Los Álamos 123",
+        "comuna": "Ej: Chillán",
+        "edad": "Ej: 32",
+        "nacionalidad": "Ej: Chilena",
+        "direccion": "Ej: Pasaje Los Robles 45, Chillán",
+    }
 
+    @classmethod
+    def configurar_campos(cls, fields):
+        super().configurar_campos(fields)
         # Hacer todos los campos obligatorios y quitar textos de ayuda
-        for field_name, field in self.fields.items():
+        for field in fields.values():
             field.required = True
             field.help_text = None
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
         # --- Ajuste: mostrar solo los 8 dígitos al editar ---
         telefono_guardado = self.initial.get("telefono") or getattr(self.instance, "telefono", "")
         if telefono_guardado and telefono_guardado.startswith("+569"):
             # Mostrar solo los 8 dígitos después del prefijo +569
             self.initial["telefono"] = telefono_guardado.replace("+569", "")
 
-        # Asignar ejemplos (placeholders) para cada campo del formulario
-        placeholders = {
-            "nombres": "Ej: María José",
-            "apellidos": "Ej: González Soto",
-            "telefono": "Ej: 12345678",  # <-- Ya no mostramos +569 aquí
-            "domicilio": "Ej: Calle Los Álamos 123",
-            "comuna": "Ej: Chillán",
-            "edad": "Ej: 32",
-            "nacionalidad": "Ej: Chilena",
-            "direccion": "Ej: Pasaje Los Robles 45, Chillán",
-        }
-
-        for field_name, text in placeholders.items():
-            if field_name in self.fields:
-                self.fields[field_name].widget.attrs.update({"placeholder": text})
-
     
     rut = forms.CharField(
         label="RUT",
@@ -127,88 +196,24 @@ class MadreForm(BaseBootstrapForm):
         error_messages={"required": "Debe seleccionar una nacionalidad válida"},
     )
     
-    PUEBLO_ORIGINARIO_CHOICES = [
-        ("", "Seleccione una opción..."),
-        ("si", "Sí"),
-        ("no", "No"),
-    ]
-    pueblo_originario = forms.ChoiceField(
-        label="Pertenece a pueblo originario",
-        choices=PUEBLO_ORIGINARIO_CHOICES,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
+    # Los indicadores Sí/No se guardan como booleanos en Madre
+    pueblo_originario = campo_si_no(
+        "Pertenece a pueblo originario",
         error_messages={"required": "Debe seleccionar si pertenece o no a un pueblo originario"},
     )
-    
-    DISCAPACIDAD_CHOICES = [
-    ("", "Seleccione una opción..."),
-    ("Si", "Sí"),
-    ("No", "No"),
-    ]
-
-    discapacidad = forms.ChoiceField(
-        label="Discapacidad con credencial SENADIS",
-        choices=DISCAPACIDAD_CHOICES,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
+    discapacidad = campo_si_no(
+        "Discapacidad con credencial SENADIS",
         error_messages={"required": "Debe seleccionar si posee o no credencial de discapacidad SENADIS"},
     )
-    
-    PRIVADA_LIBERTAD_CHOICES = [
-    ("", "Seleccione una opción..."),
-    ("Si", "Sí"),
-    ("No", "No"),
-    ]
-
-    privada_libertad = forms.ChoiceField(
-        label="Privada de libertad",
-        choices=PRIVADA_LIBERTAD_CHOICES,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
+    privada_libertad = campo_si_no(
+        "Privada de libertad",
         error_messages={"required": "Debe seleccionar si la madre se encuentra o no privada de libertad"},
     )
-
-    CONTROLES_PRENATALES_CHOICES = [
-    ("", "Seleccione una opción..."),
-    ("Si", "Sí"),
-    ("No", "No"),
-    ]
-
-    controles_prenatales = forms.ChoiceField(
-        label="Controles prenatales realizados",
-        choices=CONTROLES_PRENATALES_CHOICES,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
+    controles_prenatales = campo_si_no(
+        "Controles prenatales realizados",
         error_messages={"required": "Debe seleccionar si la madre realizó o no controles prenatales"},
     )
 
-    def clean_controles_prenatales(self):
-        controles = self.cleaned_data.get("controles_prenatales", "").strip()
-        if not controles:
-            raise forms.ValidationError("Debe seleccionar una opción válida.")
-        return controles
-
-
-
-    def clean_privada_libertad(self):
-        privada_libertad = self.cleaned_data.get("privada_libertad", "").strip()
-        if not privada_libertad:
-            raise forms.ValidationError("Debe seleccionar una opción válida.")
-        return privada_libertad
-
-
-    def clean_discapacidad(self):
-        discapacidad = self.cleaned_data.get("discapacidad", "").strip()
-        if not discapacidad:
-            raise forms.ValidationError("Debe seleccionar una opción válida.")
-        return discapacidad
-
-    def clean_pueblo_originario(self):
-        valor = self.cleaned_data.get("pueblo_originario", "").strip()
-        if not valor:
-            raise forms.ValidationError("Debe seleccionar si pertenece o no a un pueblo originario.")
-        return valor
-
     def clean_telefono(self):
         telefono = self.cleaned_data.get("telefono", "").strip()
         if not telefono.isdigit() or len(telefono) != 8:
@@ -274,39 +279,57 @@ class MadreForm(BaseBootstrapForm):
             "discapacidad", "privada_libertad","controles_prenatales",
             "paridad", "cesareas_previas",
         ]
-        widgets = {
-            "pueblo_originario": forms.Select(choices=[(True, "Sí"), (False, "No")]),
-            "discapacidad": forms.Select(choices=[(True, "Sí"), (False, "No")]),
-            "privada_libertad": forms.Select(choices=[(True, "Sí"), (False, "No")]),
-            "controles_prenatales": forms.Select(choices=[(True, "Sí"), (False, "No")]),
-        }
 
 
 class PartoForm(BaseBootstrapForm):
-    def __init__(self, *args, **kwargs):
-        # Recibir request desde la vista
-        self.request = kwargs.pop("request", None)
-        super().__init__(*args, **kwargs)
-        
-        # 🔹 Ocultar el campo madre
-        if "madre" in self.fields:
-            self.fields["madre"].widget = forms.HiddenInput()
-            
+    # 🔹 Madre y matrona responsable (registrado_por) van ocultos
+    CAMPOS_OCULTOS = ("madre", "registrado_por")
+    CAMPOS_SI_NO = (
+        "episiotomia", "oxitocina", "plan_parto", "contacto_piel_piel",
+        "alojamiento_conjunto", "cesarea_programada", "complicaciones",
+    )
+
+    TOOLTIPS = {
+        "fecha_parto": "Fecha registrada en ficha clínica en la que ocurrió el evento del nacimiento.",
+        "hora_parto": "Hora exacta del nacimiento según documentación clínica o reloj institucional.",
+        "tipo_parto": "Clasificación obstétrica del parto según vía: vaginal eutócico, instrumental o cesárea (electiva o de urgencia).",
+        "tipo_atencion": "Tipo de atención según categorización clínica: procedimiento programado o resolución por urgencia obstétrica.",
+        "inicio_parto": "Mecanismo de inicio del trabajo de parto: espontáneo o inducido mediante intervención médica.",
+        "analgesia": "Método analgésico administrado durante el trabajo de parto: neuroaxial, endovenosa, óxido nitroso, general u otras técnicas.",
+        "acompanamiento": "Presencia de acompañante significativo durante fases del trabajo de parto o expulsivo.",
+        "presentacion_fetal": "Posición del polo fetal respecto al canal del parto: cefálica, pélvica/podálica o transversa.",
+        "embarazo_multiple": "Indica si el nacimiento corresponde a una gestación múltiple.",
+        "edad_gestacional": "Edad gestacional en semanas completas calculada al momento del parto, según ecografía válida o FUR confiable.",
+        "episiotomia": "Registro del procedimiento de episiotomía durante el expulsivo.",
+        "oxitocina": "Indica administración de oxitocina profiláctica en manejo activo del alumbramiento.",
+        "plan_parto": "Confirma existencia de un plan de parto informado y registrado.",
+        "contacto_piel_piel": "Registro del contacto piel a piel inmediato entre madre y RN como parte del apego precoz.",
+        "alojamiento_conjunto": "Indica si se aplicó alojamiento conjunto madre–hijo posterior al nacimiento.",
+        "cesarea_programada": "Señala si la cesárea fue planificada previamente.",
+        "complicaciones": "Registro de complicaciones obstétricas maternas o fetales ocurridas durante el parto.",
+        "observaciones": "Notas clínicas relevantes no cubiertas en otros campos.",
+    }
+
+    @classmethod
+    def configurar_campos(cls, fields):
+        super().configurar_campos(fields)
+
         # 🔹 Formato de fecha
-        if "fecha_parto" in self.fields:
-            self.fields["fecha_parto"].input_formats = ["%Y-%m-%d"]
-            
+        if "fecha_parto" in fields:
+            fields["fecha_parto"].input_formats = ["%Y-%m-%d"]
+
         # 🔹 Edad gestacional obligatoria
-        if "edad_gestacional" in self.fields:
-            self.fields["edad_gestacional"].required = True
-            self.fields["edad_gestacional"].error_messages = {
+        if "edad_gestacional" in fields:
+            fields["edad_gestacional"].required = True
+            fields["edad_gestacional"].error_messages = {
                 "required": "Debe ingresar la edad gestacional del parto."
             }
 
-        # 🔹 Matrona responsable (registrado_por) — oculto
-        if "registrado_por" in self.fields:
-            self.fields["registrado_por"].widget = forms.HiddenInput()
-        
+    def __init__(self, *args, **kwargs):
+        # Recibir request desde la vista
+        self.request = kwargs.pop("request", None)
+        super().__init__(*args, **kwargs)
+
         # Guardar nombre visible para mostrar en template
         self.matrona_nombre = None
         if self.request and self.request.user.is_authenticated:
@@ -320,44 +343,6 @@ class PartoForm(BaseBootstrapForm):
                 # Si por alguna razón no hay nombre, usa el correo
                 self.matrona_nombre = getattr(user, "email", "Usuario desconocido")
 
-
-        # ====================================================
-        #   TOOLTIPS AUTOMÁTICOS (AL FINAL DEL __init__)
-        # ====================================================
-        tooltips = {
-            "fecha_parto": "Fecha registrada en ficha clínica en la que ocurrió el evento del nacimiento.",
-            "hora_parto": "Hora exacta del nacimiento según documentación clínica o reloj institucional.",
-            "tipo_parto": "Clasificación obstétrica del parto según vía: vaginal eutócico, instrumental o cesárea (electiva o de urgencia).",
-            "tipo_atencion": "Tipo de atención según categorización clínica: procedimiento programado o resolución por urgencia obstétrica.",
-            "inicio_parto": "Mecanismo de inicio del trabajo de parto: espontáneo o inducido mediante intervención médica.",
-            "analgesia": "Método analgésico administrado durante el trabajo de parto: neuroaxial, endovenosa, óxido nitroso, general u otras técnicas.",
-            "acompanamiento": "Presencia de acompañante significativo durante fases del trabajo de parto o expulsivo.",
-            "presentacion_fetal": "Posición del polo fetal respecto al canal del parto: cefálica, pélvica/podálica o transversa.",
-            "embarazo_multiple": "Indica si el nacimiento corresponde a una gestación múltiple.",
-            "edad_gestacional": "Edad gestacional en semanas completas calculada al momento del parto, según ecografía válida o FUR confiable.",
-            "episiotomia": "Registro del procedimiento de episiotomía durante el expulsivo.",
-            "oxitocina": "Indica administración de oxitocina profiláctica en manejo activo del alumbramiento.",
-            "plan_parto": "Confirma existencia de un plan de parto informado y registrado.",
-            "contacto_piel_piel": "Registro del contacto piel a piel inmediato entre madre y RN como parte del apego precoz.",
-            "alojamiento_conjunto": "Indica si se aplicó alojamiento conjunto madre–hijo posterior al nacimiento.",
-            "cesarea_programada": "Señala si la cesárea fue planificada previamente.",
-            "complicaciones": "Registro de complicaciones obstétricas maternas o fetales ocurridas durante el parto.",
-            "observaciones": "Notas clínicas relevantes no cubiertas en otros campos.",
-        }
-
-
-        for campo, texto in tooltips.items():
-            if campo in self.fields:
-                self.fields[campo].help_text = texto
-                self.fields[campo].widget.attrs["title"] = texto
-        
-        
-    OPCIONES_SI_NO = [
-    ("", "Seleccione una opción..."),
-    ("Si", "Sí"),
-    ("No", "No"),
-    ]
-
     TIPO_PARTO_CHOICES = [
         ("", "Seleccione una opción..."),
         ("vaginal", "Vaginal"),
@@ -433,7 +418,8 @@ class PartoForm(BaseBootstrapForm):
         label="Tipo de atención",
         choices=[("", "Seleccione..."), ("programada", "Programada"), ("urgencia", "Urgencia")],
         required=True,
-        widget=forms.Select(attrs={"class": "form-select"})
+        widget=forms.Select(attrs={"class": "form-select"}),
+        error_messages={"required": "Debe seleccionar si fue programada o de urgencia."},
     )
 
     presentacion_fetal = forms.ChoiceField(
@@ -445,15 +431,12 @@ class PartoForm(BaseBootstrapForm):
             ("transversa", "Transversa"),
         ],
         required=True,
-        widget=forms.Select(attrs={"class": "form-select"})
+        widget=forms.Select(attrs={"class": "form-select"}),
+        error_messages={"required": "Debe seleccionar la presentación fetal."},
     )
 
-    embarazo_multiple = forms.ChoiceField(
-        label="Embarazo múltiple",
-        choices=[("", "Seleccione..."), (True, "Sí"), (False, "No")],
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"})
-    )
+    # Sin preselección: define el grupo Robson y debe elegirse siempre
+    embarazo_multiple = campo_si_no("Embarazo múltiple")
 
 
 
@@ -475,35 +458,6 @@ class PartoForm(BaseBootstrapForm):
             "style": "resize: none;",
         }),
 
-        "episiotomia": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "oxitocina": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "plan_parto": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "contacto_piel_piel": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "alojamiento_conjunto": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "cesarea_programada": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "complicaciones": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-
         "fecha_parto": forms.DateInput(
             format="%Y-%m-%d",
             attrs={"type": "date", "class": "form-control"},
@@ -517,173 +471,49 @@ class PartoForm(BaseBootstrapForm):
         }),
     }
 
-        
-    def clean_tipo_parto(self):
-        valor = self.cleaned_data.get("tipo_parto", "")
-        if not valor:
-            raise forms.ValidationError("Debe seleccionar el tipo de parto.")
-        return valor
-
-    def clean_inicio_parto(self):
-        valor = self.cleaned_data.get("inicio_parto", "")
-        if not valor:
-            raise forms.ValidationError("Debe seleccionar cómo se inició el parto.")
-        return valor
-
-    def clean_analgesia(self):
-        valor = self.cleaned_data.get("analgesia", "")
-        if not valor:
-            raise forms.ValidationError("Debe seleccionar el tipo de analgesia utilizada.")
-        return valor
-
-    def clean_acompanamiento(self):
-        valor = self.cleaned_data.get("acompanamiento", "")
-        if not valor:
-            raise forms.ValidationError("Debe indicar si hubo acompañamiento durante el parto.")
-        return valor
-        
-    def clean_episiotomia(self):
-        valor = self.cleaned_data.get("episiotomia")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida para Episiotomía.")
-
-    def clean_oxitocina(self):
-        valor = self.cleaned_data.get("oxitocina")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida para Oxitocina profiláctica.")
-
-    def clean_plan_parto(self):
-        valor = self.cleaned_data.get("plan_parto")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida para Plan de parto registrado.")
-
-    def clean_contacto_piel_piel(self):
-        valor = self.cleaned_data.get("contacto_piel_piel")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida para Contacto piel con piel.")
-
-    def clean_alojamiento_conjunto(self):
-        valor = self.cleaned_data.get("alojamiento_conjunto")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida para Alojamiento conjunto.")
-
-    def clean_cesarea_programada(self):
-        valor = self.cleaned_data.get("cesarea_programada")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida para Cesárea programada.")
-
-    def clean_complicaciones(self):
-        valor = self.cleaned_data.get("complicaciones")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida para Complicaciones.")
-    
-    def clean_tipo_atencion(self):
-        valor = self.cleaned_data.get("tipo_atencion")
-        if not valor:
-            raise forms.ValidationError("Debe seleccionar si fue programada o de urgencia.")
-        return valor
-
-    def clean_presentacion_fetal(self):
-        valor = self.cleaned_data.get("presentacion_fetal")
-        if not valor:
-            raise forms.ValidationError("Debe seleccionar la presentación fetal.")
-        return valor
-
-    def clean_embarazo_multiple(self):
-        valor = self.cleaned_data.get("embarazo_multiple")
-        if valor in ["True", True]:
-            return True
-        if valor in ["False", False]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida.")
 
 class RecienNacidoForm(BaseBootstrapForm):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    CAMPOS_SI_NO = (
+        "anomalias_congenitas", "profilaxis_hepatitisb", "profilaxis_ocular",
+        "asfixia_neonatal", "tamizaje_metabolico", "tamizaje_auditivo",
+        "tamizaje_cardiaco", "fallecido",
+    )
+
+    TOOLTIPS = {
+        "sexo": "Sexo biológico del recién nacido determinado mediante examen físico inmediatamente posterior al nacimiento.",
+        "peso": "Peso al nacer medido en balanza neonatal certificada, expresado en kilogramos con precisión de 1 a 3 decimales.",
+        "talla": "Longitud cráneo–talón del recién nacido, medida en centímetros mediante infantómetro.",
+        "apgar_1": "Puntaje Apgar asignado al primer minuto de vida para evaluar adaptación cardiorrespiratoria inicial.",
+        "apgar_5": "Puntaje Apgar asignado a los 5 minutos de vida para valoración de respuesta a intervención o evolución espontánea.",
+        "anomalias_congenitas": "Registro de malformaciones congénitas detectadas al examen físico inicial, sean mayores o menores.",
+        "profilaxis_hepatitisb": "Administración de vacuna Hepatitis B dentro de las primeras horas de vida según calendario vigente.",
+        "profilaxis_ocular": "Aplicación de profilaxis ocular neonatal para prevención de oftalmía gonocócica.",
+        "reanimacion": "Nivel de reanimación neonatal aplicada: ninguna, básica (ventilación con bolsa y máscara) o avanzada (intubación, fármacos).",
+        "asfixia_neonatal": "Indica si el recién nacido presentó criterios clínicos o laboratoriales de asfixia perinatal.",
+        "tamizaje_metabolico": "Registro de toma de muestra para tamizaje neonatal metabólico (prueba del talón).",
+        "tamizaje_auditivo": "Resultado del tamizaje auditivo neonatal mediante OEA/PEATC, según protocolo institucional.",
+        "tamizaje_cardiaco": "Tamizaje de cardiopatías congénitas críticas mediante oximetría pre y postductal.",
+        "fallecido": "Indica si el recién nacido falleció antes del alta hospitalaria.",
+        "tipo_fallecimiento": "Clasificación del fallecimiento perinatal: aborto, mortinato o mortineonato, según criterio jurídico-sanitario.",
+        "metodo_alimentacion": "Método de alimentación indicado al alta: lactancia materna exclusiva, mixta, fórmula o indicación específica (HTLV/VIH, Ley 21.155).",
+    }
 
-        
-        boolean_fields = [
-            "anomalias_congenitas", "profilaxis_hepatitisb", "profilaxis_ocular",
-            "asfixia_neonatal", "tamizaje_metabolico", "tamizaje_auditivo",
-            "tamizaje_cardiaco", "fallecido",
-        ]
-        for field_name in boolean_fields:
-            field = self.fields.get(field_name)
-            if field and isinstance(field.widget, forms.Select):
-                instance = getattr(self.instance, field_name, None)
-                if instance is True:
-                    field.initial = "True"
-                elif instance is False:
-                    field.initial = "False"
+    @classmethod
+    def configurar_campos(cls, fields):
+        super().configurar_campos(fields)
 
         # Aplica estilo Bootstrap a todos los selects
-        for field_name, field in self.fields.items():
+        for field in fields.values():
             if isinstance(field.widget, forms.Select):
                 field.widget.attrs["class"] = "form-select"
-                
-
-        tooltips = {
-            "sexo": "Sexo biológico del recién nacido determinado mediante examen físico inmediatamente posterior al nacimiento.",
-            "peso": "Peso al nacer medido en balanza neonatal certificada, expresado en kilogramos con precisión de 1 a 3 decimales.",
-            "talla": "Longitud cráneo–talón del recién nacido, medida en centímetros mediante infantómetro.",
-            "apgar_1": "Puntaje Apgar asignado al primer minuto de vida para evaluar adaptación cardiorrespiratoria inicial.",
-            "apgar_5": "Puntaje Apgar asignado a los 5 minutos de vida para valoración de respuesta a intervención o evolución espontánea.",
-            "anomalias_congenitas": "Registro de malformaciones congénitas detectadas al examen físico inicial, sean mayores o menores.",
-            "profilaxis_hepatitisb": "Administración de vacuna Hepatitis B dentro de las primeras horas de vida según calendario vigente.",
-            "profilaxis_ocular": "Aplicación de profilaxis ocular neonatal para prevención de oftalmía gonocócica.",
-            "reanimacion": "Nivel de reanimación neonatal aplicada: ninguna, básica (ventilación con bolsa y máscara) o avanzada (intubación, fármacos).",
-            "asfixia_neonatal": "Indica si el recién nacido presentó criterios clínicos o laboratoriales de asfixia perinatal.",
-            "tamizaje_metabolico": "Registro de toma de muestra para tamizaje neonatal metabólico (prueba del talón).",
-            "tamizaje_auditivo": "Resultado del tamizaje auditivo neonatal mediante OEA/PEATC, según protocolo institucional.",
-            "tamizaje_cardiaco": "Tamizaje de cardiopatías congénitas críticas mediante oximetría pre y postductal.",
-            "fallecido": "Indica si el recién nacido falleció antes del alta hospitalaria.",
-            "tipo_fallecimiento": "Clasificación del fallecimiento perinatal: aborto, mortinato o mortineonato, según criterio jurídico-sanitario.",
-            "metodo_alimentacion": "Método de alimentación indicado al alta: lactancia materna exclusiva, mixta, fórmula o indicación específica (HTLV/VIH, Ley 21.155).",
-        }
-
-        for campo, texto in tooltips.items():
-            if campo in self.fields:
-                self.fields[campo].help_text = texto
-                self.fields[campo].widget.attrs["title"] = texto
-                
-                
+
         #cambiado
         # Forzar clase apgar-select después del Bootstrap
-        if "apgar_1" in self.fields:
-            self.fields["apgar_1"].widget.attrs["class"] += " apgar-select"
-
-        if "apgar_5" in self.fields:
-            self.fields["apgar_5"].widget.attrs["class"] += " apgar-select"
-
+        if "apgar_1" in fields:
+            fields["apgar_1"].widget.attrs["class"] += " apgar-select"
 
-
-    
-    OPCIONES_SI_NO = [
-        ("", "Seleccione una opción..."),
-        (True, "Sí"),
-        (False, "No"),
-    ]
+        if "apgar_5" in fields:
+            fields["apgar_5"].widget.attrs["class"] += " apgar-select"
 
     REANIMACION_CHOICES = [
         ("", "Seleccione tipo de reanimación..."),
@@ -745,76 +575,18 @@ class RecienNacidoForm(BaseBootstrapForm):
     )
 
     
-    anomalias_congenitas = forms.TypedChoiceField(
-        label="Anomalías congénitas",
-        choices=OPCIONES_SI_NO,
-        coerce=lambda x: x == "True" or x is True,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
-    )
-
-    profilaxis_hepatitisb = forms.TypedChoiceField(
-        label="Profilaxis Hepatitis B",
-        choices=OPCIONES_SI_NO,
-        coerce=lambda x: x == "True" or x is True,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
-    )
-
-    profilaxis_ocular = forms.TypedChoiceField(
-        label="Profilaxis ocular",
-        choices=OPCIONES_SI_NO,
-        coerce=lambda x: x == "True" or x is True,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
-    )
-
-    asfixia_neonatal = forms.TypedChoiceField(
-        label="Asfixia neonatal",
-        choices=OPCIONES_SI_NO,
-        coerce=lambda x: x == "True" or x is True,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
-    )
-
-    tamizaje_metabolico = forms.TypedChoiceField(
-        label="Tamizaje metabólico",
-        choices=OPCIONES_SI_NO,
-        coerce=lambda x: x == "True" or x is True,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
-    )
-
-    tamizaje_auditivo = forms.TypedChoiceField(
-        label="Tamizaje auditivo",
-        choices=OPCIONES_SI_NO,
-        coerce=lambda x: x == "True" or x is True,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
-    )
-
-    tamizaje_cardiaco = forms.TypedChoiceField(
-        label="Tamizaje cardíaco",
-        choices=OPCIONES_SI_NO,
-        coerce=lambda x: x == "True" or x is True,
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
-    )
-
-    fallecido = forms.TypedChoiceField(
-        label="Fallecido",
-        choices=[
-            ("", "Seleccione una opción..."),
-            (True, "Sí"),
-            (False, "No"),
-        ],
-        coerce=lambda x: x in [True, "True", "true"],
-        required=True,
-        widget=forms.Select(attrs={"class": "form-select"}),
+    anomalias_congenitas = campo_si_no("Anomalías congénitas")
+    profilaxis_hepatitisb = campo_si_no("Profilaxis Hepatitis B")
+    profilaxis_ocular = campo_si_no("Profilaxis ocular")
+    asfixia_neonatal = campo_si_no("Asfixia neonatal")
+    tamizaje_metabolico = campo_si_no("Tamizaje metabólico")
+    tamizaje_auditivo = campo_si_no("Tamizaje auditivo")
+    tamizaje_cardiaco = campo_si_no("Tamizaje cardíaco")
+    fallecido = campo_si_no(
+        "Fallecido",
         error_messages={"required": "Debe indicar si el recién nacido falleció."},
     )
 
-
     reanimacion = forms.ChoiceField(
         label="Tipo de reanimación",
         choices=REANIMACION_CHOICES,
@@ -854,45 +626,6 @@ class RecienNacidoForm(BaseBootstrapForm):
                   "fallecido",
                   "tipo_fallecimiento",
                   "metodo_alimentacion",]
-        widgets = {
-        "animalias_congenitas": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "profilaxis_hepatitisb": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "profilaxis_ocular": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "reanimacion": forms.Select(
-            choices=[
-                ("", "Seleccione una opción..."),
-                ("ninguna", "Ninguna"),
-                ("basica", "Básica"),
-                ("avanzada", "Avanzada"),
-            ],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "asfixia_neonatal": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "tamizaje_metabolico": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "tamizaje_auditivo": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-        "tamizaje_cardiaco": forms.Select(
-            choices=[("", "Seleccione una opción..."), (True, "Sí"), (False, "No")],
-            attrs={"class": "form-select", "required": "required"},
-        ),
-    }
 
     def clean_fecha_parto(self):
         fecha_parto = self.cleaned_data.get("fecha_parto")
@@ -923,41 +656,6 @@ class RecienNacidoForm(BaseBootstrapForm):
 
         return round(peso, 3)
 
-    def _to_bool(self, valor):
-        if valor in [True, "True", "true"]:
-           return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe seleccionar una opción válida.")
-
-        return self._to_bool(self.cleaned_data.get("animalias_congenitas"))
-
-    def clean_profilaxis_hepatitisb(self):
-        return self._to_bool(self.cleaned_data.get("profilaxis_hepatitisb"))
-
-    def clean_profilaxis_ocular(self):
-        return self._to_bool(self.cleaned_data.get("profilaxis_ocular"))
-
-    def clean_asfixia_neonatal(self):
-        return self._to_bool(self.cleaned_data.get("asfixia_neonatal"))
-
-    def clean_tamizaje_metabolico(self):
-        return self._to_bool(self.cleaned_data.get("tamizaje_metabolico"))
-
-    def clean_tamizaje_auditivo(self):
-        return self._to_bool(self.cleaned_data.get("tamizaje_auditivo"))
-
-    def clean_tamizaje_cardiaco(self):
-        return self._to_bool(self.cleaned_data.get("tamizaje_cardiaco"))
-
-    def clean_fallecido(self):
-        valor = self.cleaned_data.get("fallecido", "")
-        if valor in [True, "True", "true"]:
-            return True
-        elif valor in [False, "False", "false"]:
-            return False
-        raise forms.ValidationError("Debe indicar si el recién nacido falleció.")
-    
     def clean_talla(self):
         talla = self.cleaned_data.get("talla", "")
 
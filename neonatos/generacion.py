@@ -0,0 +1,29 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+# ===========================
+# GENERACIÓN DE LOS DATOS CLÍNICOS
+# ===========================
+# Marca que cambia tras cada escritura confirmada de Madre, Parto o
+# RecienNacido: la avanza Cambio.registrar/registrar_lote, por donde pasan
+# también las cargas masivas y las bajas en cascada. Las cachés de resultados
+# derivados la incluyen en su clave, así una escritura las invalida sin que
+# cada lectura consulte la base. Con LocMemCache (desarrollo) la marca es por
+# proceso; en producción la caché es compartida (Redis o archivos).
+
+CLAVE = "neonatos:generacion"
+
+
+def generacion():
+    valor = cache.get(CLAVE)
+    if valor is None:
+        cache.add(CLAVE, time.time_ns(), None)
+        valor = cache.get(CLAVE)
+    return valor
+
+
+def avanzar_generacion(using=None):
+    """Cambia la marca al confirmarse la transacción en curso (de inmediato si no hay una)."""
+    transaction.on_commit(lambda: cache.set(CLAVE, time.time_ns(), None), using=using)
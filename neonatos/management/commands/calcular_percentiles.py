@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from neonatos.crecimiento import guardar_percentiles, ruta_tabla
+from neonatos.models import RecienNacido
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula y guarda el percentil de peso y talla al nacer (y la clasificación PEG/AEG/GEG) "
+        "de los RN pendientes: sin cálculo o modificados desde el último. Con --todos recalcula "
+        "toda la base, por ejemplo tras cambiar CRECIMIENTO_TABLA. Pensado para un cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--todos", action="store_true", help="Recalcular todos los RN.")
+        parser.add_argument("--lote", type=int, default=20000, help="RN leídos y guardados por tramo.")
+
+    def handle(self, *args, **options):
+        if ruta_tabla() is None:
+            raise CommandError("CRECIMIENTO_TABLA no está configurada: no hay tabla de referencia.")
+        inicio = time.perf_counter()
+        queryset = RecienNacido.objects.all() if options["todos"] else None
+        total = guardar_percentiles(queryset, lote=options["lote"])
+        self.stdout.write(
+            f"{total} RN calculados con {ruta_tabla().name} en {time.perf_counter() - inicio:.2f} s."
+        )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from neonatos.duplicados import detectar_duplicados
+
+
+class Command(BaseCommand):
+    help = (
+        "Busca madres probablemente duplicadas (RUT mal digitado, nombre con errores) comparando "
+        "solo las que comparten una clave de bloqueo, y deja los pares nuevos pendientes de "
+        "revisión en /neonatos/duplicados/. Pensado para un cron nocturno."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--umbral", type=float, default=None, help="Puntaje mínimo (0-1).")
+        parser.add_argument("--bloque-maximo", type=int, default=None, help="Tamaño máximo de bloque.")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        madres, comparados, nuevos = detectar_duplicados(options["umbral"], options["bloque_maximo"])
+        self.stdout.write(
+            f"{madres} madres, {comparados} pares comparados, {nuevos} posibles duplicados nuevos "
+            f"en {time.perf_counter() - inicio:.2f} s."
+        )
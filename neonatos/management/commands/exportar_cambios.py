@@ -0,0 +1,33 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from neonatos.cambios import cambios_desde
+
+
+class Command(BaseCommand):
+    help = (
+        "Escribe en la salida los cambios de Madre, Parto y RecienNacido posteriores a un cursor, "
+        "uno por línea (JSON), leyendo en lotes. El cursor final se informa por stderr para la "
+        "siguiente ejecución. Ej: manage.py exportar_cambios --desde 1200 --datos > cambios.jsonl"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", type=int, default=0, help="Último id de cambio ya procesado.")
+        parser.add_argument("--lote", type=int, default=1000, help="Cambios leídos por consulta.")
+        parser.add_argument("--max", type=int, default=None, help="Detenerse tras esta cantidad de cambios.")
+        parser.add_argument("--datos", action="store_true", help="Incluir el registro actual de cada cambio.")
+
+    def handle(self, *args, **options):
+        cursor, total = options["desde"], 0
+        while options["max"] is None or total < options["max"]:
+            limite = options["lote"] if options["max"] is None else min(options["lote"], options["max"] - total)
+            filas, cursor, hay_mas = cambios_desde(cursor, limite, incluir_datos=options["datos"])
+            for fila in filas:
+                self.stdout.write(json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False))
+            total += len(filas)
+            if not hay_mas:
+                break
+        sys.stderr.write(f"{total} cambios exportados; cursor: {cursor}\n")
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from neonatos.models import ElementoPapelera
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra de la papelera los elementos eliminados hace más de PAPELERA_RETENCION_DIAS días "
+        "(o --dias). Los ya restaurados también se purgan. Pensado para un cron diario."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=None, help="Antigüedad mínima en días.")
+
+    def handle(self, *args, **options):
+        dias = options["dias"] if options["dias"] is not None else getattr(settings, "PAPELERA_RETENCION_DIAS", 90)
+        limite = timezone.now() - timedelta(days=dias)
+        borrados, _ = ElementoPapelera.objects.filter(eliminado_en__lt=limite).delete()
+        self.stdout.write(f"{borrados} elementos purgados (eliminados antes del {limite:%d-%m-%Y}).")
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+# Paso 1 de 3: columnas booleanas nuevas junto a las CharField Sí/No existentes.
+# Se crean nulas para no reescribir la tabla antes del backfill (0005).
+
+CAMPOS = ["pueblo_originario", "discapacidad", "privada_libertad", "controles_prenatales"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0003_actualizado_en'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='madre',
+            name=f'{campo}_bool',
+            field=models.BooleanField(null=True),
+        )
+        for campo in CAMPOS
+    ]
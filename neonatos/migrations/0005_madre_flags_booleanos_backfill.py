@@ -0,0 +1,42 @@
+import unicodedata
+
+from django.db import migrations
+
+# Paso 2 de 3: copia los valores legados ("si", "Si", "SÍ", " no ", "", ...) a las
+# columnas booleanas. Hay pocos valores distintos, así que se hace un UPDATE por
+# valor en lugar de recorrer las filas.
+
+CAMPOS = ["pueblo_originario", "discapacidad", "privada_libertad", "controles_prenatales"]
+
+VALORES_SI = {"si", "s", "true", "1", "yes"}
+
+
+def _es_si(valor):
+    texto = unicodedata.normalize("NFKD", (valor or "").strip().lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return texto in VALORES_SI
+
+
+def a_booleanos(apps, schema_editor):
+    Madre = apps.get_model("neonatos", "Madre")
+    for campo in CAMPOS:
+        for valor in Madre.objects.values_list(campo, flat=True).distinct():
+            Madre.objects.filter(**{campo: valor}).update(**{f"{campo}_bool": _es_si(valor)})
+
+
+def a_texto(apps, schema_editor):
+    Madre = apps.get_model("neonatos", "Madre")
+    for campo in CAMPOS:
+        Madre.objects.filter(**{f"{campo}_bool": True}).update(**{campo: "Si"})
+        Madre.objects.exclude(**{f"{campo}_bool": True}).update(**{campo: "No"})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0004_madre_flags_booleanos'),
+    ]
+
+    operations = [
+        migrations.RunPython(a_booleanos, a_texto),
+    ]
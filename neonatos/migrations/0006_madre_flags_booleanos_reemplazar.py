@@ -0,0 +1,58 @@
+from django.db import migrations, models
+
+# Paso 3 de 3: elimina las CharField, deja las booleanas con el nombre original
+# y crea los índices parciales usados por los REM.
+
+CAMPOS = ["pueblo_originario", "discapacidad", "privada_libertad", "controles_prenatales"]
+
+ETIQUETAS = {
+    "pueblo_originario": "Pertenece a pueblo originario",
+    "discapacidad": "Discapacidad con credencial SENADIS",
+    "privada_libertad": "Privada de libertad",
+    "controles_prenatales": "Controles prenatales",
+}
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0005_madre_flags_booleanos_backfill'),
+    ]
+
+    operations = [
+        # Con default para que la migración inversa pueda volver a crear las columnas
+        *[
+            migrations.AlterField(
+                model_name='madre',
+                name=campo,
+                field=models.CharField(ETIQUETAS[campo], max_length=50, default="No"),
+            )
+            for campo in CAMPOS
+        ],
+        *[migrations.RemoveField(model_name='madre', name=campo) for campo in CAMPOS],
+        *[migrations.RenameField(model_name='madre', old_name=f'{campo}_bool', new_name=campo) for campo in CAMPOS],
+        *[
+            migrations.AlterField(
+                model_name='madre',
+                name=campo,
+                field=models.BooleanField(ETIQUETAS[campo], default=campo == "controles_prenatales"),
+            )
+            for campo in CAMPOS
+        ],
+        migrations.AddIndex(
+            model_name='madre',
+            index=models.Index(condition=models.Q(('pueblo_originario', True)), fields=['id'], name='madre_pueblo_originario_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='madre',
+            index=models.Index(condition=models.Q(('discapacidad', True)), fields=['id'], name='madre_discapacidad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='madre',
+            index=models.Index(condition=models.Q(('privada_libertad', True)), fields=['id'], name='madre_privada_libertad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='madre',
+            index=models.Index(condition=models.Q(('controles_prenatales', False)), fields=['id'], name='madre_sin_controles_idx'),
+        ),
+    ]
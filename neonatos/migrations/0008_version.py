@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0007_cambio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='madre',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='parto',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reciennacido',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:47
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0008_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ElementoPapelera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('madre', 'Madre'), ('parto', 'Parto')], max_length=10)),
+                ('objeto_id', models.IntegerField()),
+                ('descripcion', models.CharField(max_length=200)),
+                ('total_partos', models.PositiveIntegerField(default=0)),
+                ('total_recien_nacidos', models.PositiveIntegerField(default=0)),
+                ('datos', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('eliminado_en', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('restaurado_en', models.DateTimeField(blank=True, null=True)),
+                ('eliminado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('restaurado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Elemento de papelera',
+                'verbose_name_plural': 'Papelera',
+                'ordering': ['-eliminado_en'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0009_papelera'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PercentilRN',
+            fields=[
+                ('rn', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='percentil', serialize=False, to='neonatos.reciennacido')),
+                ('z_peso', models.FloatField(blank=True, null=True)),
+                ('percentil_peso', models.FloatField(blank=True, null=True)),
+                ('z_talla', models.FloatField(blank=True, null=True)),
+                ('percentil_talla', models.FloatField(blank=True, null=True)),
+                ('clasificacion', models.CharField(blank=True, choices=[('PEG', 'Pequeño para la edad gestacional'), ('AEG', 'Adecuado para la edad gestacional'), ('GEG', 'Grande para la edad gestacional')], db_index=True, max_length=3)),
+                ('tabla', models.CharField(max_length=100)),
+                ('calculado_en', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Percentil de RN',
+                'verbose_name_plural': 'Percentiles de RN',
+            },
+        ),
+    ]
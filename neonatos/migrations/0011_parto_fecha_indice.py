@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0010_percentil_rn'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='parto',
+            name='fecha_parto',
+            field=models.DateField(db_index=True, verbose_name='Fecha del parto'),
+        ),
+    ]
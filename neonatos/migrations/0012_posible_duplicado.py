@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('neonatos', '0011_parto_fecha_indice'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PosibleDuplicado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puntaje', models.FloatField()),
+                ('detalle', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('descartado', 'No es duplicado'), ('fusionado', 'Fusionado')], db_index=True, default='pendiente', max_length=10)),
+                ('detectado_en', models.DateTimeField(default=django.utils.timezone.now)),
+                ('resuelto_en', models.DateTimeField(blank=True, null=True)),
+                ('madre_a', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='neonatos.madre')),
+                ('madre_b', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='neonatos.madre')),
+                ('resuelto_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Posible duplicado',
+                'verbose_name_plural': 'Posibles duplicados',
+                'ordering': ['-puntaje'],
+                'constraints': [models.UniqueConstraint(fields=('madre_a', 'madre_b'), name='posible_duplicado_par_unico')],
+            },
+        ),
+    ]
@@ -1,12 +1,109 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from .generacion import avanzar_generacion
 from .validators import rut_chile_validator
 from decimal import Decimal
 
+# === FEED DE CAMBIOS ===
+
+class Cambio(models.Model):
+    """
+    Un alta, edición o baja de Madre, Parto o RecienNacido. El id es la
+    secuencia monótona que los sistemas externos usan como cursor (ver cambios.py).
+    """
+    CREADO = "creado"
+    ACTUALIZADO = "actualizado"
+    ELIMINADO = "eliminado"
+    OPERACIONES = [(CREADO, "Creado"), (ACTUALIZADO, "Actualizado"), (ELIMINADO, "Eliminado")]
+
+    id = models.BigAutoField(primary_key=True)
+    modelo = models.CharField(max_length=20)  # _meta.model_name: madre, parto, reciennacido
+    objeto_id = models.BigIntegerField()
+    operacion = models.CharField(max_length=11, choices=OPERACIONES)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Cambio"
+        verbose_name_plural = "Cambios"
+
+    def __str__(self):
+        return f"#{self.id} {self.modelo} {self.objeto_id} {self.operacion}"
+
+    @classmethod
+    def registrar(cls, instancia, operacion):
+        cls.objects.using(instancia._state.db).create(
+            modelo=instancia._meta.model_name, objeto_id=instancia.pk, operacion=operacion
+        )
+        avanzar_generacion(instancia._state.db)
+
+    @classmethod
+    def registrar_lote(cls, modelo, operaciones, using=None):
+        """operaciones: iterable de (objeto_id, operacion), para cargas con bulk_create/update."""
+        using = using or router.db_for_write(cls)
+        cls.objects.using(using).bulk_create(
+            [cls(modelo=modelo._meta.model_name, objeto_id=pk, operacion=op) for pk, op in operaciones],
+            batch_size=500,
+        )
+        avanzar_generacion(using)
+
+
+class ConflictoVersion(Exception):
+    """Otro usuario guardó el registro después de que se leyó: la versión ya no coincide."""
+
+
+class RegistraCambiosMixin:
+    """
+    save() escribe su Cambio en la misma transacción que el registro. Las bajas
+    se registran con post_delete (signals.py), que ya corre dentro de la
+    transacción del delete. bulk_create y update() no pasan por aquí: quien los
+    use debe llamar a Cambio.registrar_lote.
+
+    Cada edición es además un compare-and-swap sobre `version`: el UPDATE filtra
+    por la versión leída y la incrementa. Si otro guardado ganó la carrera, la
+    fila no coincide y se lanza ConflictoVersion (sin bloquear la fila mientras
+    se edita el formulario). Con update_fields solo se escriben esas columnas,
+    más version y actualizado_en.
+    """
+
+    def save(self, *args, **kwargs):
+        operacion = Cambio.CREADO if self._state.adding else Cambio.ACTUALIZADO
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        version_leida = None
+        if not self._state.adding:
+            version_leida = self.version
+            self.version = version_leida + 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version", "actualizado_en"}
+        self._version_leida = version_leida
+        try:
+            with transaction.atomic(using=using):
+                super().save(*args, **kwargs)
+                Cambio.registrar(self, operacion)
+        except BaseException:
+            if version_leida is not None:
+                self.version = version_leida
+            raise
+        finally:
+            self._version_leida = None
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version_leida = getattr(self, "_version_leida", None)
+        if version_leida is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        actualizado = super()._do_update(
+            base_qs.filter(version=version_leida), using, pk_val, values, update_fields, forced_update
+        )
+        if not actualizado and base_qs.filter(pk=pk_val).exists():
+            raise ConflictoVersion(f"{self._meta.verbose_name} {pk_val} fue modificado por otro usuario.")
+        return actualizado
+
+
 # === MODELOS ===
 
-class Madre(models.Model):
+class Madre(RegistraCambiosMixin, models.Model):
     
     id = models.AutoField(primary_key=True, db_column="id_madre")
     rut = models.CharField("RUT", max_length=12, unique=True, validators=[rut_chile_validator],
@@ -19,10 +116,10 @@ class Madre(models.Model):
     edad = models.PositiveIntegerField("Edad", validators=[MinValueValidator(10), MaxValueValidator(60)],
                                        help_text="Años cumplidos.")
     nacionalidad = models.CharField("Nacionalidad", max_length=50)
-    pueblo_originario = models.CharField("Pertenece a pueblo originario", max_length=50)
-    discapacidad = models.CharField("Discapacidad con credencial SENADIS", max_length=50)
-    privada_libertad = models.CharField("Privada de libertad", max_length=50)
-    controles_prenatales = models.CharField("Controles prenatales", max_length=50)
+    pueblo_originario = models.BooleanField("Pertenece a pueblo originario", default=False)
+    discapacidad = models.BooleanField("Discapacidad con credencial SENADIS", default=False)
+    privada_libertad = models.BooleanField("Privada de libertad", default=False)
+    controles_prenatales = models.BooleanField("Controles prenatales", default=True)
 
     paridad = models.CharField(
         max_length=20,
@@ -35,18 +132,34 @@ class Madre(models.Model):
 
     cesareas_previas = models.IntegerField(default=0)
 
+    # Última modificación de la ficha: incluye cambios en sus partos y RN (ver signals.py)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
     class Meta:
         verbose_name = "Madre"
         verbose_name_plural = "Madres"
         ordering = ["-id"]
+        # Índices parciales sobre el caso minoritario que cuentan los REM
+        # (en MySQL la condición no se soporta y Django omite estos índices)
+        indexes = [
+            models.Index(fields=["id"], condition=models.Q(pueblo_originario=True),
+                         name="madre_pueblo_originario_idx"),
+            models.Index(fields=["id"], condition=models.Q(discapacidad=True),
+                         name="madre_discapacidad_idx"),
+            models.Index(fields=["id"], condition=models.Q(privada_libertad=True),
+                         name="madre_privada_libertad_idx"),
+            models.Index(fields=["id"], condition=models.Q(controles_prenatales=False),
+                         name="madre_sin_controles_idx"),
+        ]
 
     def __str__(self):
         return f"{self.nombres} {self.apellidos} ({self.rut})"
 
 
-class Parto(models.Model):
+class Parto(RegistraCambiosMixin, models.Model):
     madre = models.ForeignKey(Madre, on_delete=models.CASCADE, related_name="partos")
-    fecha_parto = models.DateField("Fecha del parto")
+    fecha_parto = models.DateField("Fecha del parto", db_index=True)
     # ⬇️ NUEVO, requerido para APS
     hora_parto = models.TimeField("Hora del parto", null=True, blank=True)
 
@@ -122,6 +235,9 @@ class Parto(models.Model):
     registrado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
                                        null=True, blank=True, verbose_name="Matrona responsable")
 
+    actualizado_en = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
     class Meta:
         verbose_name = "Parto"
         verbose_name_plural = "Partos"
@@ -130,7 +246,7 @@ class Parto(models.Model):
         return f"Parto de {self.madre} {self.fecha_parto}"
 
 
-class RecienNacido(models.Model):
+class RecienNacido(RegistraCambiosMixin, models.Model):
     parto = models.ForeignKey("Parto", on_delete=models.CASCADE, related_name="recien_nacidos")
     sexo = models.CharField("Sexo", max_length=1, choices=[("F", "Femenino"), ("M", "Masculino")])
     peso = models.DecimalField(
@@ -197,11 +313,123 @@ class RecienNacido(models.Model):
         null=True,
         blank=True,
     )
-    
+
+    actualizado_en = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
 
     class Meta:
         verbose_name = "Recién nacido"
         verbose_name_plural = "Recién nacidos"
 
     def __str__(self):
-        return f"RN de {self.parto.madre}"
\ No newline at end of file
+        return f"RN de {self.parto.madre}"
+
+# === PAPELERA ===
+
+class ElementoPapelera(models.Model):
+    """
+    Registro de una eliminación de Madre o Parto (con todo lo que cayó en
+    cascada). `datos` guarda las filas tal como estaban (values()) para poder
+    restaurarlas con sus mismos ids; ver eliminacion.py.
+    """
+    MADRE = "madre"
+    PARTO = "parto"
+    MODELOS = [(MADRE, "Madre"), (PARTO, "Parto")]
+
+    modelo = models.CharField(max_length=10, choices=MODELOS)
+    objeto_id = models.IntegerField()
+    descripcion = models.CharField(max_length=200)
+    total_partos = models.PositiveIntegerField(default=0)
+    total_recien_nacidos = models.PositiveIntegerField(default=0)
+    datos = models.JSONField(encoder=DjangoJSONEncoder)
+    eliminado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+                                      null=True, blank=True, related_name="+")
+    eliminado_en = models.DateTimeField(default=timezone.now, db_index=True)
+    restaurado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+                                       null=True, blank=True, related_name="+")
+    restaurado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Elemento de papelera"
+        verbose_name_plural = "Papelera"
+        ordering = ["-eliminado_en"]
+
+    def __str__(self):
+        return f"{self.get_modelo_display()} {self.descripcion}"
+
+
+# === CRECIMIENTO AL NACER ===
+
+class PercentilRN(models.Model):
+    """
+    Z-score y percentil de peso y talla del RN para su sexo y edad gestacional,
+    según la tabla de referencia vigente (ver crecimiento.py). Es un dato
+    derivado: se recalcula cuando el RN o su parto cambian después de calculado_en.
+    """
+    PEG = "PEG"
+    AEG = "AEG"
+    GEG = "GEG"
+    CLASIFICACIONES = [
+        (PEG, "Pequeño para la edad gestacional"),
+        (AEG, "Adecuado para la edad gestacional"),
+        (GEG, "Grande para la edad gestacional"),
+    ]
+
+    rn = models.OneToOneField(RecienNacido, on_delete=models.CASCADE, primary_key=True, related_name="percentil")
+    z_peso = models.FloatField(null=True, blank=True)
+    percentil_peso = models.FloatField(null=True, blank=True)
+    z_talla = models.FloatField(null=True, blank=True)
+    percentil_talla = models.FloatField(null=True, blank=True)
+    # Vacío: sin peso, sin edad gestacional o fuera del rango de la tabla
+    clasificacion = models.CharField(max_length=3, choices=CLASIFICACIONES, blank=True, db_index=True)
+    tabla = models.CharField(max_length=100)
+    calculado_en = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Percentil de RN"
+        verbose_name_plural = "Percentiles de RN"
+
+    def __str__(self):
+        return f"{self.rn} - {self.clasificacion or 'sin clasificar'}"
+
+    @property
+    def vigente(self):
+        """False si el RN o su parto cambiaron después del cálculo (crecimiento.pendientes)."""
+        return self.calculado_en >= max(self.rn.actualizado_en, self.rn.parto.actualizado_en)
+
+
+# === POSIBLES DUPLICADOS ===
+
+class PosibleDuplicado(models.Model):
+    """
+    Par de madres que probablemente son la misma persona (p. ej. RUT mal
+    digitado), detectado por duplicados.py y pendiente de revisión. madre_a
+    siempre tiene el id menor. `detalle` guarda RUT y nombre de ambas al
+    detectarse: el par resuelto se conserva aunque una madre se elimine.
+    """
+    PENDIENTE = "pendiente"
+    DESCARTADO = "descartado"
+    FUSIONADO = "fusionado"
+    ESTADOS = [(PENDIENTE, "Pendiente"), (DESCARTADO, "No es duplicado"), (FUSIONADO, "Fusionado")]
+
+    madre_a = models.ForeignKey(Madre, on_delete=models.SET_NULL, null=True, related_name="+")
+    madre_b = models.ForeignKey(Madre, on_delete=models.SET_NULL, null=True, related_name="+")
+    puntaje = models.FloatField()
+    detalle = models.JSONField(default=dict)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default=PENDIENTE, db_index=True)
+    detectado_en = models.DateTimeField(default=timezone.now)
+    resuelto_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+                                     null=True, blank=True, related_name="+")
+    resuelto_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Posible duplicado"
+        verbose_name_plural = "Posibles duplicados"
+        ordering = ["-puntaje"]
+        constraints = [
+            models.UniqueConstraint(fields=["madre_a", "madre_b"], name="posible_duplicado_par_unico"),
+        ]
+
+    def __str__(self):
+        a, b = self.detalle.get("a", {}), self.detalle.get("b", {})
+        return f"{a.get('rut')} / {b.get('rut')} ({self.puntaje:.2f})"
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Cambio, Madre, Parto, RecienNacido
+
+# ===========================
+# PROPAGACIÓN DE actualizado_en
+# ===========================
+# La ficha de la madre cambia cuando cambia cualquiera de sus partos o RN:
+# así su actualizado_en basta para validar la caché HTTP de toda la ficha.
+
+
+def propagar_actualizacion(madre_ids=(), parto_ids=()):
+    """
+    Marca como modificados los partos indicados y sus madres, más las madres
+    indicadas. Las cargas masivas (bulk_create no emite señales) la llaman
+    directamente con todos los ids del lote.
+    """
+    ahora = timezone.now()
+    if parto_ids:
+        Parto.objects.filter(pk__in=parto_ids).update(actualizado_en=ahora)
+        Madre.objects.filter(partos__id__in=parto_ids).update(actualizado_en=ahora)
+    if madre_ids:
+        Madre.objects.filter(pk__in=madre_ids).update(actualizado_en=ahora)
+
+
+@receiver([post_save, post_delete], sender=Parto)
+def tocar_madre_por_parto(sender, instance, **kwargs):
+    propagar_actualizacion(madre_ids=[instance.madre_id])
+
+
+@receiver([post_save, post_delete], sender=RecienNacido)
+def tocar_parto_y_madre_por_rn(sender, instance, **kwargs):
+    propagar_actualizacion(parto_ids=[instance.parto_id])
+
+
+# ===========================
+# FEED DE CAMBIOS: BAJAS
+# ===========================
+# Las altas y ediciones las registra RegistraCambiosMixin.save(). post_delete
+# corre dentro de la transacción del delete, también para las bajas en cascada.
+
+@receiver(post_delete, sender=Madre)
+@receiver(post_delete, sender=Parto)
+@receiver(post_delete, sender=RecienNacido)
+def registrar_baja(sender, instance, **kwargs):
+    Cambio.registrar(instance, Cambio.ELIMINADO)
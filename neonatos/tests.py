@@ -1,3 +1,730 @@
-from django.test import TestCase
+import importlib
+import io
+import json
+import math
+import os
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from GeneradorReporte.models import Bitacora
+from gestion_roles.models import Usuario
+from gestion_roles.tokens import emitir_token
+from neonatos import crecimiento
+from neonatos.cambios import cambios_desde
+from neonatos.duplicados import ErrorFusion, descartar, detectar_duplicados, fusionar
+from neonatos.eliminacion import ErrorRestauracion, eliminar_madre, restaurar
+from neonatos.forms import MadreForm, PartoForm, RecienNacidoForm
+from neonatos.models import (
+    Cambio, ConflictoVersion, ElementoPapelera, Madre, Parto, PercentilRN, PosibleDuplicado, RecienNacido,
+)
+
+
+class DatosClinicosMixin:
+    """Matrona, una madre con un parto y un recién nacido."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.matrona = Usuario.objects.create_user("mat@x.cl", "Matrona", "clave", rol="Matrona")
+        cls.madre = Madre.objects.create(
+            rut="11111111-1", nombres="Ana María", apellidos="González Soto", edad=30,
+            nacionalidad="chilena", telefono="+56912345678", direccion="Calle 1", comuna="Temuco",
+        )
+        cls.parto = Parto.objects.create(
+            madre=cls.madre, fecha_parto="2026-10-01", tipo_parto="vaginal", tipo_atencion="programada",
+            registrado_por=cls.matrona,
+        )
+        cls.rn = RecienNacido.objects.create(parto=cls.parto, sexo="F", peso="3.2", talla=49)
+
+
+def datos_formulario(form, **cambios):
+    """POST equivalente a enviar `form` sin tocarlo, con `cambios` aplicados."""
+    datos = {}
+    for nombre in form.fields:
+        valor = form[nombre].value()
+        if valor is not None:
+            datos[nombre] = str(valor)
+    datos.update(cambios)
+    return datos
+
+
+# ===========================
+# LECTURAS ASYNC
+# ===========================
+
+class LecturaAsyncTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.async_client.force_login(self.matrona)
+
+    async def test_fragmento_paginado(self):
+        await Madre.objects.abulk_create([
+            Madre(rut=f"{20000000 + i}-{i % 10}", nombres="N", apellidos="A", edad=20, nacionalidad="chilena")
+            for i in range(24)
+        ])
+        primera = await self.async_client.get("/madres/fragmento/")
+        self.assertEqual(len(primera.context["madres"]), 20)
+        self.assertEqual(primera.context["siguiente"], 2)
+        segunda = await self.async_client.get("/madres/fragmento/", {"page": 2})
+        self.assertEqual(len(segunda.context["madres"]), 5)
+        self.assertIsNone(segunda.context["siguiente"])
+        # Página inválida: primera página
+        self.assertEqual((await self.async_client.get("/madres/fragmento/", {"page": "x"})).context["siguiente"], 2)
+
+    async def test_fragmento_filtra_por_rut(self):
+        response = await self.async_client.get("/madres/fragmento/", {"q": "11.111.111-1"})
+        self.assertEqual([m.pk for m in response.context["madres"]], [self.madre.pk])
+
+    async def test_buscar_rut_registra_en_bitacora(self):
+        response = await self.async_client.get("/buscar/rut.json", {"q": "11.111.111-1"})
+        self.assertEqual(response.json()["resultados"], [{"id": self.madre.pk, "rut": "11.111.111-1", "nombre": "Ana María González Soto"}])
+        response = await self.async_client.get("/buscar/rut.json", {"q": "22.222.222-2"})
+        self.assertEqual(response.json()["resultados"], [])
+        acciones = [b.accion async for b in Bitacora.objects.filter(accion__startswith="Búsqueda").order_by("id_evento")]
+        self.assertEqual(acciones, ["Búsqueda por RUT", "Búsqueda sin resultados"])
+
+    async def test_rol_distinto_responde_403_con_el_usuario_en_cache(self):
+        self.assertEqual((await self.async_client.get("/madres/fragmento/")).status_code, 200)
+        self.matrona.rol = "Supervisor"
+        await self.matrona.asave()
+        self.assertEqual((await self.async_client.get("/madres/fragmento/")).status_code, 403)
+
+
+# ===========================
+# GET CONDICIONAL
+# ===========================
+
+class GetCondicionalTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.matrona)
+        # Cookie CSRF ya emitida (la entrega la página de login), así no cambia el ETag entre visitas
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "a" * 32
+
+    def _revalidar(self, url, response, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_ficha_sin_cambios_responde_304(self):
+        url = f"/madre/{self.madre.pk}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertTrue(response.has_header("Last-Modified"))
+        self.assertEqual(self._revalidar(url, response).status_code, 304)
+        desde = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(desde.status_code, 304)
+
+    def test_cambio_en_un_rn_invalida_la_ficha_de_la_madre_y_del_parto(self):
+        urls = [f"/madre/{self.madre.pk}/", f"/parto/{self.parto.pk}/", f"/rn/{self.rn.pk}/"]
+        anteriores = {url: self.client.get(url) for url in urls}
+        self.rn.talla = 50
+        self.rn.save()
+        for url, anterior in anteriores.items():
+            with self.subTest(url=url):
+                response = self._revalidar(url, anterior)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], anterior["ETag"])
+
+    def test_etag_distinto_por_usuario(self):
+        url = f"/madre/{self.madre.pk}/"
+        anterior = self.client.get(url)
+        otra = Usuario.objects.create_user("otra@x.cl", "Otra", "clave", rol="Matrona")
+        self.client.force_login(otra)
+        self.assertEqual(self._revalidar(url, anterior).status_code, 200)
+
+    def test_registro_inexistente_responde_404(self):
+        self.assertEqual(self.client.get("/madre/999999/").status_code, 404)
+
+    def test_fragmento_cambia_con_altas_y_bajas(self):
+        anterior = self.client.get("/madres/fragmento/")
+        self.assertEqual(self._revalidar("/madres/fragmento/", anterior).status_code, 304)
+        # Otra consulta es otro recurso
+        self.assertEqual(self._revalidar("/madres/fragmento/", anterior, q="Ana").status_code, 200)
+
+        Madre.objects.create(rut="22222222-2", nombres="Eva", apellidos="Paz", edad=25, nacionalidad="chilena")
+        nueva = self._revalidar("/madres/fragmento/", anterior)
+        self.assertEqual(nueva.status_code, 200)
+        # Borrar una ficha más antigua no mueve el máximo, pero sí el total
+        Madre.objects.filter(pk=self.madre.pk).delete()
+        self.assertEqual(self._revalidar("/madres/fragmento/", nueva).status_code, 200)
+
+
+# ===========================
+# MIGRACIÓN Sí/No A BOOLEANOS
+# ===========================
+
+backfill = importlib.import_module("neonatos.migrations.0005_madre_flags_booleanos_backfill")
+
+
+class MigracionBooleanosTests(TransactionTestCase):
+    antes = [("neonatos", "0004_madre_flags_booleanos")]
+    despues = [("neonatos", "0006_madre_flags_booleanos_reemplazar")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_valores_legados(self):
+        casos = {
+            "si": True, "Si": True, "SÍ": True, " sí ": True, "S": True, "1": True, "true": True,
+            "no": False, "No": False, " NO ": False, "": False, None: False, "n/a": False, "sin dato": False,
+        }
+        for valor, esperado in casos.items():
+            with self.subTest(valor=valor):
+                self.assertIs(backfill._es_si(valor), esperado)
+
+    def test_migrar_y_revertir(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.antes)
+        Madre = executor.loader.project_state(self.antes).apps.get_model("neonatos", "Madre")
+        valores = ["Sí", "SI", " no ", "", "quizás"]
+        for i, valor in enumerate(valores):
+            Madre.objects.create(
+                rut=f"{10000000 + i}-{i}", nombres="N", apellidos="A", edad=20, nacionalidad="chilena",
+                pueblo_originario=valor, discapacidad="No", privada_libertad="No", controles_prenatales=valor,
+            )
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.despues)
+        Madre = executor.loader.project_state(self.despues).apps.get_model("neonatos", "Madre")
+        filas = Madre.objects.order_by("rut").values_list("pueblo_originario", "controles_prenatales", "discapacidad")
+        self.assertEqual(list(filas), [(v, v, False) for v in (True, True, False, False, False)])
+
+        # La reversa deja "Si"/"No" normalizados
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.antes)
+        Madre = executor.loader.project_state(self.antes).apps.get_model("neonatos", "Madre")
+        filas = Madre.objects.order_by("rut").values_list("pueblo_originario", flat=True)
+        self.assertEqual(list(filas), ["Si", "Si", "No", "No", "No"])
+
+
+# ===========================
+# FORMULARIOS Sí/No
+# ===========================
+
+class FormulariosSiNoTests(DatosClinicosMixin, TestCase):
+    def _parto(self, **cambios):
+        completos = {"inicio_parto": "espontaneo", "analgesia": "local", "acompanamiento": "ninguno", "edad_gestacional": "39"}
+        datos = datos_formulario(PartoForm(instance=self.parto), **completos, **cambios)
+        return PartoForm(datos, instance=self.parto)
+
+    def test_formulario_nuevo_preselecciona_el_default_del_modelo(self):
+        parto, rn = PartoForm(), RecienNacidoForm()
+        self.assertEqual(parto["episiotomia"].value(), "False")
+        self.assertIsNone(parto["embarazo_multiple"].value())
+        self.assertEqual(rn["profilaxis_hepatitisb"].value(), "False")
+        self.assertEqual(rn["fallecido"].value(), "False")
+        self.assertIn("required", str(parto["complicaciones"]))
+
+    def test_entrega_booleanos(self):
+        form = self._parto(episiotomia="True", embarazo_multiple="False", presentacion_fetal="cefalica")
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertIs(form.cleaned_data["episiotomia"], True)
+        self.assertIs(form.cleaned_data["embarazo_multiple"], False)
+        self.assertIs(form.cleaned_data["oxitocina"], False)
+
+    def test_si_no_vacio_es_obligatorio(self):
+        form = self._parto(episiotomia="", embarazo_multiple="", presentacion_fetal="")
+        self.assertEqual(form.errors["episiotomia"], ["Debe seleccionar una opción válida para Episiotomía."])
+        self.assertEqual(form.errors["embarazo_multiple"], ["Debe seleccionar una opción válida para Embarazo múltiple."])
+        self.assertEqual(form.errors["presentacion_fetal"], ["Debe seleccionar la presentación fetal."])
+
+        rn = RecienNacidoForm({"fallecido": "", "tamizaje_auditivo": "quizás"})
+        self.assertEqual(rn.errors["fallecido"], ["Debe indicar si el recién nacido falleció."])
+        self.assertIn("tamizaje_auditivo", rn.errors)
+
+
+# ===========================
+# API: CARGA MASIVA
+# ===========================
+
+class ApiLoteTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        _, clave = emitir_token(self.matrona, "HIS")
+        self.cabeceras = {"HTTP_AUTHORIZATION": f"Bearer {clave}"}
+
+    def _post(self, url, datos):
+        return self.client.post(url, json.dumps(datos), content_type="application/json", **self.cabeceras)
+
+    def test_partos_con_id_de_madre_no_entero(self):
+        for madre in ([self.madre.pk], {"a": 1}, str(self.madre.pk), True, None):
+            with self.subTest(madre=madre):
+                response = self._post("/api/v1/partos/lote/", [{"madre": madre, "fecha_parto": "2026-10-02"}])
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["errores"][0]["errores"], {"madre": ["Madre inexistente o no indicada."]})
+
+    def test_recien_nacidos_con_id_de_parto_no_entero(self):
+        for parto in ([self.parto.pk], {"a": 1}, True, 999999):
+            with self.subTest(parto=parto):
+                response = self._post("/api/v1/recien-nacidos/lote/", [{"parto": parto, "sexo": "F"}])
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["errores"][0]["errores"], {"parto": ["Parto inexistente o no indicado."]})
+
+    def test_lote_invalido_no_guarda_ninguno(self):
+        valido = {"madre": self.madre.pk, "fecha_parto": "2026-10-02", "tipo_parto": "vaginal", "tipo_atencion": "programada"}
+        response = self._post("/api/v1/partos/lote/", [valido, {**valido, "tipo_parto": "otro"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e["indice"] for e in response.json()["errores"]], [1])
+        self.assertEqual(Parto.objects.count(), 1)
+
+    def test_cuerpo_que_no_es_lista_de_objetos(self):
+        for cuerpo in ({"madre": 1}, [1, 2], []):
+            with self.subTest(cuerpo=cuerpo):
+                self.assertEqual(self._post("/api/v1/partos/lote/", cuerpo).status_code, 400)
+
+    def test_crea_partos_y_recien_nacidos(self):
+        response = self._post("/api/v1/partos/lote/", [{
+            "madre_rut": "11.111.111-1", "fecha_parto": "2026-10-02", "tipo_parto": "vaginal", "tipo_atencion": "programada",
+        }])
+        self.assertEqual(response.status_code, 201, response.content)
+        parto_id = response.json()["ids"][0]
+        response = self._post("/api/v1/recien-nacidos/lote/", [{"parto": parto_id, "sexo": "M", "peso": "3.1", "talla": 50}])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(RecienNacido.objects.filter(parto_id=parto_id).count(), 1)
+
+
+class ApiLecturaTests(DatosClinicosMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.otras = [
+            Madre.objects.create(rut=rut, nombres="Eva", apellidos="Paz", edad=25, nacionalidad="chilena")
+            for rut in ("22222222-2", "33333333-3")
+        ]
+
+    def setUp(self):
+        _, clave = emitir_token(self.matrona, "HIS")
+        self.cabeceras = {"HTTP_AUTHORIZATION": f"Bearer {clave}"}
+
+    def _get(self, url, params=None, **extra):
+        return self.client.get(url, params or {}, **self.cabeceras, **extra)
+
+    def test_fecha_inexistente_responde_400(self):
+        casos = [
+            ("/api/v1/madres/", {"actualizado_desde": "2024-02-30T10:00:00"}),
+            ("/api/v1/madres/", {"actualizado_desde": "2024-01-01T25:00:00"}),
+            ("/api/v1/partos/", {"fecha_desde": "2024-02-30"}),
+            ("/api/v1/partos/", {"fecha_hasta": "2024-13-01"}),
+            ("/api/v1/partos/", {"fecha_desde": "ayer"}),
+        ]
+        for url, params in casos:
+            with self.subTest(params=params):
+                response = self._get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("debe ser una fecha", response.json()["error"])
+
+    def test_etag_de_la_pagina_con_cursor(self):
+        primera = self._get("/api/v1/madres/", {"limit": 1})
+        segunda_url = primera.json()["siguiente"]
+        with CaptureQueriesContext(connection) as consultas:
+            segunda = self._get(segunda_url)
+        self.assertEqual([m["id"] for m in segunda.json()["resultados"]], [self.otras[0].pk])
+        # La marca lee solo la página, sin recorrer todo el conjunto
+        self.assertFalse(any("COUNT(" in q["sql"] or "MAX(" in q["sql"] for q in consultas.captured_queries))
+
+        revalidar = lambda: self._get(segunda_url, HTTP_IF_NONE_MATCH=segunda["ETag"]).status_code
+        self.assertEqual(revalidar(), 304)
+        # Editar una fila de otra página no invalida esta
+        self.madre.comuna = "Angol"
+        self.madre.save()
+        self.assertEqual(revalidar(), 304)
+        # Editar una fila de la página sí
+        self.otras[0].comuna = "Angol"
+        self.otras[0].save()
+        self.assertEqual(revalidar(), 200)
+        segunda = self._get(segunda_url)
+        self.assertEqual(revalidar(), 304)
+        # La fila extra decide si hay página siguiente: su baja sí la invalida
+        Madre.objects.filter(pk=self.otras[1].pk).delete()
+        self.assertEqual(revalidar(), 200)
+
+
+# ===========================
+# FEED DE CAMBIOS
+# ===========================
+
+@override_settings(CAMBIOS_RETRASO=0)
+class CambiosTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        _, clave = emitir_token(self.matrona, "HIS")
+        self.cabeceras = {"HTTP_AUTHORIZATION": f"Bearer {clave}"}
+
+    def _operaciones(self, desde=0):
+        return list(Cambio.objects.filter(id__gt=desde).order_by("id").values_list("modelo", "objeto_id", "operacion"))
+
+    def test_save_y_delete_registran_el_cambio(self):
+        self.assertEqual(self._operaciones(), [
+            ("madre", self.madre.pk, Cambio.CREADO),
+            ("parto", self.parto.pk, Cambio.CREADO),
+            ("reciennacido", self.rn.pk, Cambio.CREADO),
+        ])
+        ultimo = Cambio.objects.latest("id").pk
+        self.rn.talla = 50
+        self.rn.save()
+        rn_id, parto_id = self.rn.pk, self.parto.pk
+        self.parto.delete()
+        # La propagación de actualizado_en hacia la madre no genera entradas
+        self.assertEqual(self._operaciones(ultimo), [
+            ("reciennacido", rn_id, Cambio.ACTUALIZADO),
+            ("reciennacido", rn_id, Cambio.ELIMINADO),
+            ("parto", parto_id, Cambio.ELIMINADO),
+        ])
+
+    def test_paginas_por_cursor(self):
+        filas, cursor, hay_mas = cambios_desde(0, 2)
+        self.assertEqual([f["modelo"] for f in filas], ["madre", "parto"])
+        self.assertTrue(hay_mas)
+        filas, cursor, hay_mas = cambios_desde(cursor, 2)
+        self.assertEqual([f["modelo"] for f in filas], ["reciennacido"])
+        self.assertFalse(hay_mas)
+        # Sin cambios nuevos el cursor no se mueve
+        self.assertEqual(cambios_desde(cursor, 2), ([], cursor, False))
+
+    @override_settings(CAMBIOS_RETRASO=60)
+    def test_solo_entrega_cambios_mas_antiguos_que_el_retraso(self):
+        self.assertEqual(cambios_desde(0, 10)[0], [])
+        Cambio.objects.filter(modelo="madre").update(fecha=timezone.now() - timedelta(seconds=61))
+        filas, cursor, hay_mas = cambios_desde(0, 10)
+        self.assertEqual([f["modelo"] for f in filas], ["madre"])
+        self.assertFalse(hay_mas)
+
+    def test_datos_nulos_tras_la_baja(self):
+        self.rn.delete()
+        filas, _, _ = cambios_desde(0, 10, incluir_datos=True, campos={"madre": ["rut"]})
+        self.assertEqual(filas[0]["datos"], {"id": self.madre.pk, "rut": "11111111-1"})
+        self.assertEqual([f["datos"] for f in filas if f["modelo"] == "reciennacido"], [None, None])
+
+    def test_endpoint(self):
+        response = self.client.get("/api/v1/cambios/", {"desde": 0, "limit": 2, "datos": 1}, **self.cabeceras)
+        cuerpo = response.json()
+        self.assertEqual([c["operacion"] for c in cuerpo["cambios"]], [Cambio.CREADO, Cambio.CREADO])
+        self.assertEqual(cuerpo["cambios"][1]["datos"]["madre"], self.madre.pk)
+        self.assertTrue(cuerpo["hay_mas"])
+        response = self.client.get("/api/v1/cambios/", {"desde": cuerpo["cursor"]}, **self.cabeceras)
+        self.assertEqual((len(response.json()["cambios"]), response.json()["hay_mas"]), (1, False))
+        self.assertEqual(self.client.get("/api/v1/cambios/", {"desde": "-1"}, **self.cabeceras).status_code, 400)
+
+    def test_carga_masiva_de_madres(self):
+        ultimo = Cambio.objects.latest("id").pk
+        ficha = {"nombres": "Eva", "apellidos": "Paz", "edad": 25, "nacionalidad": "chilena"}
+        response = self.client.post("/api/v1/madres/lote/", json.dumps([
+            {**ficha, "rut": "11.111.111-1"}, {**ficha, "rut": "22.222.222-2"},
+        ]), content_type="application/json", **self.cabeceras)
+        self.assertEqual(response.status_code, 200, response.content)
+        nueva = Madre.objects.get(rut="22222222-2")
+        self.assertCountEqual(self._operaciones(ultimo), [
+            ("madre", self.madre.pk, Cambio.ACTUALIZADO), ("madre", nueva.pk, Cambio.CREADO),
+        ])
+
+
+# ===========================
+# CONCURRENCIA OPTIMISTA
+# ===========================
+
+class ConcurrenciaTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(self.matrona)
+
+    def test_guardado_con_version_vieja_lanza_conflicto(self):
+        primera = Madre.objects.get(pk=self.madre.pk)
+        segunda = Madre.objects.get(pk=self.madre.pk)
+        primera.comuna = "Angol"
+        primera.save()
+        segunda.comuna = "Lautaro"
+        with self.assertRaises(ConflictoVersion):
+            segunda.save()
+        # La versión del objeto vuelve a la leída y la fila conserva el primer guardado
+        self.assertEqual(segunda.version, 1)
+        guardada = Madre.objects.get(pk=self.madre.pk)
+        self.assertEqual((guardada.comuna, guardada.version), ("Angol", 2))
+
+    def test_update_fields_solo_escribe_las_columnas_cambiadas(self):
+        url = f"/madre/{self.madre.pk}/editar/"
+        datos = datos_formulario(MadreForm(instance=self.madre), comuna="Angol", version=1)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.post(url, datos)
+        self.assertEqual(response.status_code, 302)
+        update = next(q["sql"] for q in consultas.captured_queries if q["sql"].startswith("UPDATE") and "madre" in q["sql"])
+        self.assertIn('"comuna"', update)
+        self.assertIn('"version"', update)
+        for columna in ('"direccion"', '"nombres"', '"telefono"'):
+            self.assertNotIn(columna, update)
+
+    def test_formulario_viejo_muestra_el_conflicto_y_luego_sobrescribe(self):
+        url = f"/madre/{self.madre.pk}/editar/"
+        datos = datos_formulario(MadreForm(instance=self.madre), direccion="Calle 2", version=1)
+        # Otra matrona guarda mientras el formulario sigue abierto
+        otra = Madre.objects.get(pk=self.madre.pk)
+        otra.direccion = "Calle 3"
+        otra.save()
+
+        response = self.client.post(url, datos)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["conflicto"], [("Dirección", "Calle 3", "Calle 2")])
+        self.assertEqual(response.context["version_formulario"], 2)
+        self.assertEqual(Madre.objects.get(pk=self.madre.pk).direccion, "Calle 3")
+
+        response = self.client.post(url, {**datos, "version": 2})
+        self.assertEqual(response.status_code, 302)
+        guardada = Madre.objects.get(pk=self.madre.pk)
+        self.assertEqual((guardada.direccion, guardada.version), ("Calle 2", 3))
+
+    def test_formulario_sin_cambios_no_escribe(self):
+        url = f"/madre/{self.madre.pk}/editar/"
+        response = self.client.post(url, datos_formulario(MadreForm(instance=self.madre), version=1))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Madre.objects.get(pk=self.madre.pk).version, 1)
+
+
+# ===========================
+# ELIMINACIÓN Y PAPELERA
+# ===========================
+
+class PapeleraTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(self.matrona)
+        PercentilRN.objects.create(rn=self.rn, clasificacion=PercentilRN.AEG, tabla="t.csv", calculado_en=timezone.now())
+
+    def test_eliminar_y_restaurar_madre_conserva_los_ids(self):
+        response = self.client.post(f"/madre/{self.madre.pk}/eliminar/")
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Madre.objects.filter(pk=self.madre.pk).exists())
+        self.assertFalse(Parto.objects.filter(pk=self.parto.pk).exists())
+        self.assertFalse(RecienNacido.objects.filter(pk=self.rn.pk).exists())
+        self.assertFalse(PercentilRN.objects.exists())
+        elemento = ElementoPapelera.objects.get(modelo=ElementoPapelera.MADRE, objeto_id=self.madre.pk)
+        self.assertEqual((elemento.total_partos, elemento.total_recien_nacidos), (1, 1))
+        self.assertEqual(Cambio.objects.filter(operacion=Cambio.ELIMINADO).count(), 3)
+
+        ultimo = Cambio.objects.latest("id").pk
+        response = self.client.post("/papelera/", {"elemento": elemento.pk})
+        self.assertRedirects(response, f"/madre/{self.madre.pk}/", fetch_redirect_response=False)
+        self.assertEqual(
+            list(Cambio.objects.filter(id__gt=ultimo).values_list("modelo", "objeto_id", "operacion")),
+            [("madre", self.madre.pk, Cambio.CREADO), ("parto", self.parto.pk, Cambio.CREADO),
+             ("reciennacido", self.rn.pk, Cambio.CREADO)],
+        )
+        rn = RecienNacido.objects.select_related("parto__madre").get(pk=self.rn.pk)
+        self.assertEqual((rn.parto_id, rn.parto.madre_id), (self.parto.pk, self.madre.pk))
+        self.assertEqual(float(rn.peso), 3.2)
+        self.assertEqual(rn.parto.registrado_por, self.matrona)
+        # Los percentiles son derivados: quedan pendientes de recalcular
+        self.assertFalse(PercentilRN.objects.exists())
+
+        response = self.client.post("/papelera/", {"elemento": elemento.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["error"], "Este elemento ya fue restaurado.")
+
+    def test_restaurar_parto_exige_restaurar_antes_a_la_madre(self):
+        self.client.post(f"/parto/{self.parto.pk}/eliminar/")
+        self.client.post(f"/madre/{self.madre.pk}/eliminar/")
+        elemento_parto = ElementoPapelera.objects.get(modelo=ElementoPapelera.PARTO)
+        with self.assertRaisesMessage(ErrorRestauracion, "restaure primero a la madre"):
+            restaurar(elemento_parto)
+        restaurar(ElementoPapelera.objects.get(modelo=ElementoPapelera.MADRE))
+        restaurar(elemento_parto)
+        self.assertEqual(RecienNacido.objects.filter(parto__madre=self.madre).count(), 1)
+
+    def test_restaurar_con_rut_ocupado(self):
+        elemento = eliminar_madre(self.madre, self.matrona)
+        Madre.objects.create(rut="11111111-1", nombres="Otra", apellidos="Madre", edad=25, nacionalidad="chilena")
+        with self.assertRaisesMessage(ErrorRestauracion, "11111111-1"):
+            restaurar(elemento)
+        elemento.refresh_from_db()
+        self.assertIsNone(elemento.restaurado_en)
+
+    def test_id_no_numerico_responde_404(self):
+        for valor in ("abc", "", "1.5"):
+            with self.subTest(valor=valor):
+                self.assertEqual(self.client.post("/papelera/", {"elemento": valor}).status_code, 404)
+
+
+# ===========================
+# PERCENTILES DE CRECIMIENTO
+# ===========================
+
+# Tabla de prueba: peso con L = 1 y talla con L = 0 (rama logarítmica)
+TABLA_PRUEBA = """# sexo,semanas,medida,L,M,S
+sexo,semanas,medida,L,M,S
+F,38,peso,1,3.0,0.12
+F,40,peso,1,3.4,0.12
+F,38,talla,0,48,0.04
+F,40,talla,0,50,0.04
+M,38,peso,1,3.1,0.12
+M,40,peso,1,3.5,0.12
+"""
+
+
+class CrecimientoTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, "tabla.csv")
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(TABLA_PRUEBA)
+        ajustes = override_settings(CRECIMIENTO_TABLA=self.ruta)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        Parto.objects.filter(pk=self.parto.pk).update(edad_gestacional=40)
+        RecienNacido.objects.filter(pk=self.rn.pk).update(peso="3.4", talla=50)
+
+    def test_valor_igual_a_la_mediana_es_p50(self):
+        datos = crecimiento.calcular(RecienNacido.objects.all())
+        self.assertAlmostEqual(datos["z_peso"][0], 0.0)
+        self.assertAlmostEqual(datos["percentil_peso"][0], 50.0, places=5)
+        self.assertAlmostEqual(datos["percentil_talla"][0], 50.0, places=5)
+        self.assertEqual(datos["clasificacion"][0], PercentilRN.AEG)
+        # Entre semanas L, M y S se interpolan: 3.2 kg es la mediana de la semana 39
+        tabla = crecimiento.cargar_tabla()
+        z = crecimiento.puntajes_z(tabla, "peso", np.array(["F"]), np.array([39.0]), np.array([3.2]))
+        self.assertAlmostEqual(z[0], 0.0)
+
+    def test_sin_dato_o_fuera_de_tabla_es_nan(self):
+        tabla = crecimiento.cargar_tabla()
+        casos = {
+            "sin sexo": ("", 40.0, 3.4),
+            "sin peso": ("F", 40.0, math.nan),
+            "sin edad gestacional": ("F", math.nan, 3.4),
+            "semana fuera de tabla": ("F", 41.0, 3.4),
+            "medida sin tabla para el sexo": ("M", 40.0, 50.0),
+        }
+        for caso, (sexo, semanas, valor) in casos.items():
+            with self.subTest(caso=caso):
+                medida = "talla" if caso.startswith("medida") else "peso"
+                z = crecimiento.puntajes_z(tabla, medida, np.array([sexo]), np.array([semanas]), np.array([valor]))
+                self.assertTrue(math.isnan(z[0]))
+                self.assertEqual(crecimiento.clasificar(crecimiento._normal_acumulada(z) * 100)[0], "")
+
+    def test_limites_p10_y_p90(self):
+        percentiles = np.array([9.999, 10.0, 50.0, 90.0, 90.001])
+        self.assertEqual(
+            list(crecimiento.clasificar(percentiles)),
+            [PercentilRN.PEG, PercentilRN.AEG, PercentilRN.AEG, PercentilRN.AEG, PercentilRN.GEG],
+        )
+        # z = ±1.2816 corresponde a p10 y p90
+        self.assertAlmostEqual(crecimiento._normal_acumulada(np.array([-1.2815516]))[0], 0.10, places=6)
+        self.assertAlmostEqual(crecimiento._normal_acumulada(np.array([1.2815516]))[0], 0.90, places=6)
+
+    def test_pendientes_tras_editar_el_rn_o_el_parto(self):
+        self.assertEqual(crecimiento.guardar_percentiles(), 1)
+        self.assertFalse(crecimiento.pendientes().exists())
+        self.assertEqual(crecimiento.guardar_percentiles(), 0)
+
+        rn = RecienNacido.objects.get(pk=self.rn.pk)
+        rn.talla = 51
+        rn.save()
+        self.assertEqual(list(crecimiento.pendientes()), [rn])
+        self.assertFalse(PercentilRN.objects.get(pk=rn.pk).vigente)
+        crecimiento.guardar_percentiles()
+
+        parto = Parto.objects.get(pk=self.parto.pk)
+        parto.edad_gestacional = 38
+        parto.save()
+        self.assertEqual(list(crecimiento.pendientes()), [rn])
+        crecimiento.guardar_percentiles()
+        # 3.4 kg en la semana 38 (mediana 3.0): z = 1.11, p87
+        guardado = PercentilRN.objects.get(pk=rn.pk)
+        self.assertEqual((round(guardado.percentil_peso), guardado.clasificacion, guardado.tabla), (87, PercentilRN.AEG, "tabla.csv"))
+
+    def test_ficha_del_rn_muestra_el_resultado_guardado(self):
+        self.client.force_login(self.matrona)
+        url = f"/rn/{self.rn.pk}/"
+        self.assertNotContains(self.client.get(url), "Crecimiento:")
+        call_command("calcular_percentiles", stdout=io.StringIO())
+        response = self.client.get(url)
+        self.assertContains(response, "Adecuado para la edad gestacional — peso p50")
+
+    def test_sin_tabla_configurada(self):
+        with override_settings(CRECIMIENTO_TABLA=""):
+            with self.assertRaisesMessage(CommandError, "CRECIMIENTO_TABLA"):
+                call_command("calcular_percentiles", stdout=io.StringIO())
+            self.assertIsNone(crecimiento.ruta_tabla())
+
+
+# ===========================
+# MADRES DUPLICADAS
+# ===========================
+
+class DuplicadosTests(DatosClinicosMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(self.matrona)
+        # Misma madre registrada de nuevo con un dígito del RUT mal digitado
+        self.copia = Madre.objects.create(
+            rut="11111121-1", nombres="Ana Maria", apellidos="Gonzalez Soto", edad=30,
+            nacionalidad="chilena", telefono="+56912345678", comuna="Temuco",
+        )
+        self.parto_copia = Parto.objects.create(
+            madre=self.copia, fecha_parto="2026-09-01", tipo_parto="vaginal", tipo_atencion="programada",
+        )
+        detectar_duplicados()
+        self.par = PosibleDuplicado.objects.get()
+
+    def test_detecta_el_par_con_rut_mal_digitado(self):
+        self.assertEqual((self.par.madre_a_id, self.par.madre_b_id), (self.madre.pk, self.copia.pk))
+        self.assertIn("RUT a 1 dígito(s)", self.par.detalle["motivos"])
+        # Los pares ya propuestos no se vuelven a crear
+        self.assertEqual(detectar_duplicados()[2], 0)
+
+    def test_fusionar_traspasa_los_partos_y_envia_la_copia_a_la_papelera(self):
+        ultimo = Cambio.objects.latest("id").pk
+        response = self.client.post("/duplicados/", {"par": self.par.pk, "accion": "conservar_a"})
+        self.assertRedirects(response, f"/madre/{self.madre.pk}/", fetch_redirect_response=False)
+        parto = Parto.objects.get(pk=self.parto_copia.pk)
+        self.assertEqual((parto.madre_id, parto.version), (self.madre.pk, 2))
+        self.assertFalse(Madre.objects.filter(pk=self.copia.pk).exists())
+        self.assertTrue(ElementoPapelera.objects.filter(modelo=ElementoPapelera.MADRE, objeto_id=self.copia.pk).exists())
+        par = PosibleDuplicado.objects.get(pk=self.par.pk)
+        self.assertEqual((par.estado, par.resuelto_por, par.madre_b_id), (PosibleDuplicado.FUSIONADO, self.matrona, None))
+        self.assertEqual(par.detalle["partos_traspasados"], 1)
+        # El traspaso (update masivo) y la baja de la copia llegan al feed
+        self.assertEqual(
+            list(Cambio.objects.filter(id__gt=ultimo).values_list("modelo", "objeto_id", "operacion")),
+            [("parto", self.parto_copia.pk, Cambio.ACTUALIZADO), ("madre", self.copia.pk, Cambio.ELIMINADO)],
+        )
+
+    def test_descartar_un_par_ya_fusionado_no_lo_modifica(self):
+        vieja = PosibleDuplicado.objects.get(pk=self.par.pk)
+        fusionar(self.par, self.madre.pk, self.matrona)
+        with self.assertRaisesMessage(ErrorFusion, "ya fue revisado"):
+            descartar(vieja)
+        with self.assertRaisesMessage(ErrorFusion, "ya fue revisado"):
+            fusionar(vieja, self.copia.pk)
+        self.assertEqual(PosibleDuplicado.objects.get(pk=self.par.pk).estado, PosibleDuplicado.FUSIONADO)
+
+        response = self.client.post("/duplicados/", {"par": self.par.pk, "accion": "descartar"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["error"], "Este par ya fue revisado.")
+
+    def test_descartar(self):
+        response = self.client.post("/duplicados/", {"par": self.par.pk, "accion": "descartar"})
+        self.assertRedirects(response, "/duplicados/", fetch_redirect_response=False)
+        self.assertEqual(PosibleDuplicado.objects.get(pk=self.par.pk).estado, PosibleDuplicado.DESCARTADO)
+        self.assertEqual(Madre.objects.filter(pk__in=[self.madre.pk, self.copia.pk]).count(), 2)
+
+    def test_eliminar_madre_borra_los_pares_pendientes_y_conserva_los_resueltos(self):
+        otra = Madre.objects.create(rut="33333333-3", nombres="Rosa", apellidos="Paz", edad=40, nacionalidad="chilena")
+        resuelto = PosibleDuplicado.objects.create(
+            madre_a=self.copia, madre_b=otra, puntaje=0.81, estado=PosibleDuplicado.DESCARTADO,
+        )
+        eliminar_madre(self.copia, self.matrona)
+        self.assertFalse(PosibleDuplicado.objects.filter(pk=self.par.pk).exists())
+        resuelto.refresh_from_db()
+        self.assertEqual((resuelto.madre_a_id, resuelto.madre_b_id), (None, otra.pk))
+
+    def test_id_no_numerico_responde_404(self):
+        for valor in ("abc", "", "1.5"):
+            with self.subTest(valor=valor):
+                response = self.client.post("/duplicados/", {"par": valor, "accion": "descartar"})
+                self.assertEqual(response.status_code, 404)
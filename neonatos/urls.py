@@ -4,7 +4,9 @@ from .views import (
     MadreListView, MadreDetailView, MadreCreateView, MadreUpdateView, MadreDeleteView,
     PartoCreateView, PartoDetailView, PartoUpdateView, PartoDeleteView,
     RNCreateView, RecienNacidoDetailView, RNUpdateView, RNDeleteView,
-    BuscarPorRUTView, HomeView
+    PapeleraView, DuplicadosView,
+    BuscarPorRUTView, HomeView,
+    madre_list_fragmento, buscar_rut_json,
 )
 
 app_name = "neonatos"
@@ -23,6 +25,10 @@ urlpatterns = [
     path("parto/nuevo/", PartoCreateView.as_view(), name="parto_create"),
     path("rn/nuevo/", RNCreateView.as_view(), name="rn_create"),
     path("buscar/", BuscarPorRUTView.as_view(), name="buscar_rut"),
+
+    # Lecturas async (ASGI)
+    path("madres/fragmento/", madre_list_fragmento, name="madre_list_fragmento"),
+    path("buscar/rut.json", buscar_rut_json, name="buscar_rut_json"),
     
     # Partos
     path("parto/<int:pk>/editar/", PartoUpdateView.as_view(), name="parto_update"),
@@ -32,4 +38,10 @@ urlpatterns = [
     path("rn/<int:pk>/editar/", RNUpdateView.as_view(), name="rn_update"),
     path("rn/<int:pk>/eliminar/", RNDeleteView.as_view(), name="rn_delete"),
 
+    # Madres y partos eliminados
+    path("papelera/", PapeleraView.as_view(), name="papelera"),
+
+    # Posibles madres duplicadas
+    path("duplicados/", DuplicadosView.as_view(), name="duplicados"),
+
 ]
\ No newline at end of file
@@ -1,15 +1,20 @@
 from django.views.generic import (
     CreateView, DetailView, ListView, UpdateView, DeleteView, TemplateView
 )
-from django.shortcuts import redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404, render
+from django.http import Http404, JsonResponse
 from django.urls import reverse, reverse_lazy
-from django.db.models import Q
-from gestion_roles.utils import registrar_accion
+from django.db.models import Count, Max, Q
+from gestion_roles.utils import registrar_accion, aregistrar_accion
 from django.contrib.auth.decorators import login_required
 from gestion_roles.decorators import matrona_required
 from django.utils.decorators import method_decorator
 
-from .models import Madre, Parto, RecienNacido
+from .concurrencia import EdicionConcurrenteMixin
+from .eliminacion import ErrorRestauracion, eliminar_madre, eliminar_parto, restaurar
+from .condicional import get_condicional, marca_registro
+from .duplicados import ErrorFusion, descartar, fusionar, pares_pendientes, partos_por_madre
+from .models import ElementoPapelera, Madre, Parto, PosibleDuplicado, RecienNacido
 from .forms import MadreForm, PartoForm, RecienNacidoForm
 from .validators import _normalize_rut_basic
 from .utils import format_rut_with_dots
@@ -57,7 +62,9 @@ class MadreListView(ListView):
         ctx["query"] = self.request.GET.get("q", "")
         return ctx
     
-@method_decorator([login_required, matrona_required], name='dispatch')
+# La ficha completa (partos y RN) cambia con actualizado_en de la madre
+@method_decorator([login_required, matrona_required,
+                   get_condicional(marca_registro(Madre, "actualizado_en"))], name='dispatch')
 class MadreDetailView(DetailView):
     model = Madre
     template_name = "neonatos/madre_detail.html"
@@ -94,15 +101,13 @@ class MadreCreateView(CreateView):
         return reverse_lazy("neonatos:madre_detail", args=[self.object.pk])
     
 @method_decorator([login_required, matrona_required], name='dispatch')
-class MadreUpdateView(UpdateView):
+class MadreUpdateView(EdicionConcurrenteMixin, UpdateView):
     model = Madre
     form_class = MadreForm
     template_name = "neonatos/madre_form.html"
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
+    def registrar_edicion(self):
         registrar_accion(self.request, "Edición de madre", f"Madre {self.object.rut} actualizada")
-        return response
 
     def get_success_url(self):
         # Volver a la lista moderna en lugar del detalle antiguo
@@ -114,10 +119,14 @@ class MadreDeleteView(DeleteView):
     template_name = "neonatos/madre_confirm_delete.html"
     success_url = reverse_lazy("neonatos:madre_list")
 
-    def post(self, request, *args, **kwargs):
-        madre = self.get_object()
-        registrar_accion(request, "Eliminación de madre", f"Se eliminó madre {madre.rut}")
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        elemento = eliminar_madre(self.object, self.request.user)
+        registrar_accion(
+            self.request, "Eliminación de madre",
+            f"Se eliminó madre {self.object.rut} ({elemento.total_partos} partos, "
+            f"{elemento.total_recien_nacidos} RN) - papelera #{elemento.pk}",
+        )
+        return redirect(self.get_success_url())
     
 @method_decorator([login_required, matrona_required], name='dispatch')
 class PartoCreateView(CreateView):
@@ -160,41 +169,21 @@ class PartoCreateView(CreateView):
     
 @method_decorator([login_required, matrona_required], name='dispatch')   
 # === PARTO: editar y eliminar ===
-class PartoUpdateView(UpdateView):
+class PartoUpdateView(EdicionConcurrenteMixin, UpdateView):
     model = Parto
     form_class = PartoForm
     template_name = "neonatos/parto_form.html"
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
+    def registrar_edicion(self):
         registrar_accion(self.request, "Edición de parto", f"Parto ID {self.object.id} actualizado")
-        return response
 
     def get_success_url(self):
         # Volver a la lista moderna
         return reverse_lazy("neonatos:madre_list")
 
-@method_decorator([login_required, matrona_required], name='dispatch')
-class PartoDeleteView(DeleteView):
-    model = Parto
-    template_name = "neonatos/confirm_delete.html"
-
-    def delete(self, request, *args, **kwargs):
-        parto = self.get_object()
-        registrar_accion(request, "Eliminación de parto", f"Se eliminó parto ID {parto.id}")
-        return super().delete(request, *args, **kwargs)
-
-    def get(self, request, *args, **kwargs):
-        """
-        Evita que Django intente renderizar un template.
-        Si se accede por GET (como cuando confirmas en SweetAlert),
-        elimina directamente el objeto y redirige a la interfaz moderna.
-        """
-        self.object = self.get_object()
-        self.object.delete()
-        return redirect(reverse_lazy("neonatos:madre_list"))
-    
-@method_decorator([login_required, matrona_required], name='dispatch')   
+@method_decorator([login_required, matrona_required,
+                   get_condicional(marca_registro(Parto, "actualizado_en", "madre__actualizado_en"))],
+                  name='dispatch')
 class PartoDetailView(DetailView):
     model = Parto
     template_name = "neonatos/parto_detail.html"
@@ -238,19 +227,17 @@ class BuscarPorRUTView(TemplateView):
 
 @method_decorator([login_required, matrona_required], name='dispatch')
 # === RECIÉN NACIDO: editar y eliminar ===
-class RNUpdateView(UpdateView):
+class RNUpdateView(EdicionConcurrenteMixin, UpdateView):
     model = RecienNacido
     form_class = RecienNacidoForm
     template_name = "neonatos/rn_form.html"
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
+    def registrar_edicion(self):
         registrar_accion(
             self.request,
             "Edición de recién nacido",
             f"RN ID {self.object.id} del parto ID {self.object.parto.id} editado por {self.request.user}"
         )
-        return response
 
 
     def get_success_url(self):
@@ -275,11 +262,23 @@ class RNDeleteView(DeleteView):
         # Volver al detalle de la madre tras eliminar
         return reverse_lazy("neonatos:madre_detail", args=[self.object.parto.madre.pk])
 
-@method_decorator([login_required, matrona_required], name='dispatch')
+@method_decorator([login_required, matrona_required,
+                   get_condicional(marca_registro(RecienNacido, "actualizado_en", "parto__madre__actualizado_en",
+                                                  "percentil__calculado_en"))],
+                  name='dispatch')
 class RecienNacidoDetailView(DetailView):
     model = RecienNacido
     template_name = "neonatos/rn_detail.html"
 
+    def get_queryset(self):
+        return super().get_queryset().select_related("parto__madre", "percentil")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        # Resultado guardado por calcular_percentiles (ver neonatos/crecimiento.py)
+        ctx["percentil"] = getattr(self.object, "percentil", None)
+        return ctx
+
 @method_decorator([login_required, matrona_required], name='dispatch') 
 class RNCreateView(CreateView):
     model = RecienNacido
@@ -317,3 +316,165 @@ class PartoDeleteView(DeleteView):
     model = Parto
     template_name = "neonatos/parto_confirm_delete.html"
     success_url = reverse_lazy("neonatos:madre_list")
+
+    def form_valid(self, form):
+        elemento = eliminar_parto(self.object, self.request.user)
+        registrar_accion(
+            self.request, "Eliminación de parto",
+            f"Se eliminó parto ID {self.object.id} ({elemento.total_recien_nacidos} RN) - papelera #{elemento.pk}",
+        )
+        return redirect(self.get_success_url())
+
+
+def _id_post(request, nombre):
+    """Id entero enviado en el POST; 404 si falta o no es un número."""
+    valor = request.POST.get(nombre, "")
+    if not valor.isdigit():
+        raise Http404(f"'{nombre}' inválido.")
+    return int(valor)
+
+
+@method_decorator([login_required, matrona_required], name='dispatch')
+class PapeleraView(ListView):
+    """Madres y partos eliminados; un POST con `elemento` los restaura."""
+    model = ElementoPapelera
+    template_name = "neonatos/papelera.html"
+    context_object_name = "elementos"
+    paginate_by = 20
+
+    def get_queryset(self):
+        return ElementoPapelera.objects.filter(restaurado_en__isnull=True).select_related("eliminado_por").defer("datos")
+
+    def post(self, request, *args, **kwargs):
+        elemento = get_object_or_404(ElementoPapelera, pk=_id_post(request, "elemento"))
+        try:
+            madre_id = restaurar(elemento, request.user)
+        except ErrorRestauracion as exc:
+            self.object_list = self.get_queryset()
+            return self.render_to_response(self.get_context_data(error=str(exc)))
+        registrar_accion(request, "Restauración desde papelera", f"Se restauró {elemento} (papelera #{elemento.pk})")
+        return redirect("neonatos:madre_detail", pk=madre_id)
+
+
+@method_decorator([login_required, matrona_required], name='dispatch')
+class DuplicadosView(ListView):
+    """
+    Pares de madres probablemente duplicadas (ver duplicados.py). Un POST con
+    `par` y `accion` (conservar_a, conservar_b o descartar) los resuelve.
+    """
+    template_name = "neonatos/duplicados.html"
+    context_object_name = "pares"
+    paginate_by = 20
+
+    def get_queryset(self):
+        return pares_pendientes()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        conteo = partos_por_madre(context["pares"])
+        for par in context["pares"]:
+            par.madre_a.total_partos = conteo.get(par.madre_a_id, 0)
+            par.madre_b.total_partos = conteo.get(par.madre_b_id, 0)
+        return context
+
+    def post(self, request, *args, **kwargs):
+        par = get_object_or_404(PosibleDuplicado, pk=_id_post(request, "par"))
+        accion = request.POST.get("accion")
+        if accion not in ("conservar_a", "conservar_b", "descartar"):
+            return redirect("neonatos:duplicados")
+
+        try:
+            if accion == "descartar":
+                descartar(par, request.user)
+                registrar_accion(request, "Duplicado descartado", f"Par #{par.pk}: {par}")
+                return redirect("neonatos:duplicados")
+            conservar_id = par.madre_a_id if accion == "conservar_a" else par.madre_b_id
+            traspasados = fusionar(par, conservar_id, request.user)
+        except ErrorFusion as exc:
+            # Otro usuario resolvió el par (o borró una madre) desde que se cargó la página
+            self.object_list = self.get_queryset()
+            return self.render_to_response(self.get_context_data(error=str(exc)))
+        registrar_accion(
+            request, "Fusión de madres duplicadas",
+            f"Par #{par.pk}: {par} - se conservó la madre ID {conservar_id}, {traspasados} partos traspasados",
+        )
+        return redirect("neonatos:madre_detail", pk=conservar_id)
+
+
+# ===========================
+# VISTAS ASYNC (solo lectura, para despliegue ASGI)
+# ===========================
+
+MADRES_POR_FRAGMENTO = 20
+
+
+async def _marca_listado(request):
+    # Cualquier alta, edición o cambio en partos/RN mueve el máximo; las bajas cambian el total
+    datos = await Madre.objects.aaggregate(ultima=Max("actualizado_en"), total=Count("id"))
+    if datos["ultima"] is None:
+        return None
+    return f"{datos['ultima'].isoformat()}:{datos['total']}:{request.GET.urlencode()}", datos["ultima"]
+
+
+@login_required
+@matrona_required
+@get_condicional(_marca_listado)
+async def madre_list_fragmento(request):
+    """Tarjetas de madres por páginas, para cargar el listado por partes sin ocupar un hilo."""
+    q = request.GET.get("q", "").strip()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    madres = Madre.objects.prefetch_related(
+        "partos__recien_nacidos", "partos__registrado_por"
+    ).order_by("-id")
+    if q:
+        try:
+            madres = madres.filter(rut__iexact=_normalize_rut_basic(q))
+        except IndexError:
+            madres = madres.none()
+
+    inicio = (page - 1) * MADRES_POR_FRAGMENTO
+    # Se pide un registro extra para saber si hay página siguiente sin hacer COUNT
+    lote = [m async for m in madres[inicio:inicio + MADRES_POR_FRAGMENTO + 1]]
+
+    return render(request, "neonatos/madre_list_fragmento.html", {
+        "madres": lote[:MADRES_POR_FRAGMENTO],
+        "siguiente": page + 1 if len(lote) > MADRES_POR_FRAGMENTO else None,
+        "query": q,
+    })
+
+
+@login_required
+@matrona_required
+async def buscar_rut_json(request):
+    """Búsqueda exacta por RUT en JSON (mismo registro en bitácora que BuscarPorRUTView)."""
+    q = request.GET.get("q", "").strip()
+    resultados = []
+    if q:
+        user = await request.auser()
+        try:
+            norm = _normalize_rut_basic(q)
+        except IndexError:
+            norm = None
+        madre = None
+        if norm:
+            madre = await (
+                Madre.objects.filter(rut__iexact=norm)
+                .only("id", "rut", "nombres", "apellidos")
+                .afirst()
+            )
+        if madre:
+            resultados = [{
+                "id": madre.pk,
+                "rut": format_rut_with_dots(madre.rut),
+                "nombre": f"{madre.nombres} {madre.apellidos}",
+            }]
+            await aregistrar_accion(request, "Búsqueda por RUT", f"Usuario {user.nombre} buscó el RUT '{q}'")
+        else:
+            await aregistrar_accion(
+                request, "Búsqueda sin resultados", f"Usuario {user.nombre} buscó el RUT '{q}' sin coincidencias"
+            )
+    return JsonResponse({"query": q, "resultados": resultados})
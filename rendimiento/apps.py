@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class RendimientoConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'rendimiento'
+
+    def ready(self):
+        import rendimiento.checks
+        import rendimiento.pool
+        import rendimiento.signals
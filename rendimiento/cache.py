@@ -0,0 +1,41 @@
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from rendimiento.metricas import registro
+
+# ===========================
+# BACKENDS DE CACHÉ CON MÉTRICAS
+# ===========================
+# Mismos backends de Django, contando aciertos y fallos para /metrics.
+# En LocMem y FileBased get_many y las versiones async (aget, aget_many)
+# terminan llamando a get; Redis implementa get_many por separado.
+
+_AUSENTE = object()
+
+
+class MedirAciertosMixin:
+    def get(self, key, default=None, version=None):
+        valor = super().get(key, _AUSENTE, version)
+        if valor is _AUSENTE:
+            registro.incrementar("huellas_cache_misses_total")
+            return default
+        registro.incrementar("huellas_cache_hits_total")
+        return valor
+
+
+class LocMemCacheMedida(MedirAciertosMixin, LocMemCache):
+    pass
+
+
+class FileBasedCacheMedida(MedirAciertosMixin, FileBasedCache):
+    pass
+
+
+class RedisCacheMedida(MedirAciertosMixin, RedisCache):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        encontrados = super().get_many(keys, version)
+        registro.incrementar("huellas_cache_hits_total", len(encontrados))
+        registro.incrementar("huellas_cache_misses_total", len(keys) - len(encontrados))
+        return encontrados
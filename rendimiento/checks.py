@@ -0,0 +1,90 @@
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+# ===========================
+# CHEQUEOS DE RENDIMIENTO (manage.py check --deploy / verificar_rendimiento)
+# ===========================
+
+@register("rendimiento", deploy=True)
+def revisar_configuracion(app_configs, **kwargs):
+    errores = []
+
+    if settings.DEBUG:
+        errores.append(Warning(
+            "DEBUG está activo: Django guarda en memoria cada consulta SQL.",
+            hint="Definir ENV=production o DEBUG=False.",
+            id="rendimiento.W001",
+        ))
+
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates) and not any(
+            isinstance(loader, CachedLoader) for loader in engine.engine.template_loaders
+        ):
+            errores.append(Warning(
+                f"El motor de plantillas '{engine.name}' no usa el loader cacheado.",
+                id="rendimiento.W002",
+            ))
+
+    cache = caches["default"]
+    if isinstance(cache, (LocMemCache, DummyCache)) and settings.WEB_CONCURRENCY > 1:
+        errores.append(Warning(
+            "La caché por defecto no se comparte entre procesos: usuario en caché, "
+            "límites de intentos y sesiones quedan duplicados en cada worker.",
+            hint="Definir REDIS_URL o usar la caché de archivos de producción.",
+            id="rendimiento.W003",
+        ))
+
+    if not isinstance(staticfiles_storage, ManifestFilesMixin):
+        errores.append(Warning(
+            "Los estáticos no llevan hash en el nombre y no se pueden cachear a largo plazo.",
+            hint="Usar whitenoise.storage.CompressedManifestStaticFilesStorage.",
+            id="rendimiento.W004",
+        ))
+
+    base = settings.DATABASES["default"]
+    if not base.get("CONN_MAX_AGE") and not base.get("OPTIONS", {}).get("pool"):
+        errores.append(Warning(
+            "La base 'default' abre una conexión nueva en cada request.",
+            hint="Usar el pool de PostgreSQL (DB_POOL) o CONN_MAX_AGE > 0.",
+            id="rendimiento.W005",
+        ))
+
+    if settings.SESSION_ENGINE == "django.contrib.sessions.backends.db":
+        errores.append(Warning(
+            "Las sesiones se leen desde la base de datos en cada request.",
+            hint="Usar cached_db o signed_cookies.",
+            id="rendimiento.W006",
+        ))
+
+    if settings.PRODUCCION and not settings.METRICAS_TOKEN:
+        errores.append(Warning(
+            "METRICAS_TOKEN está vacío: /metrics queda deshabilitado en producción.",
+            hint="Definir METRICAS_TOKEN y configurarlo como bearer token en Prometheus.",
+            id="rendimiento.W007",
+        ))
+
+    tabla = getattr(settings, "CRECIMIENTO_TABLA", "")
+    if settings.PRODUCCION and not tabla:
+        errores.append(Warning(
+            "CRECIMIENTO_TABLA está vacío: no se calculan percentiles de crecimiento ni se "
+            "genera la hoja CRECIMIENTO del REM Bs22.",
+            hint="Apuntar CRECIMIENTO_TABLA al CSV LMS oficial (Fenton 2013 o INTERGROWTH-21st).",
+            id="rendimiento.W008",
+        ))
+    elif tabla and not os.path.isfile(tabla):
+        errores.append(Warning(
+            f"CRECIMIENTO_TABLA apunta a un archivo inexistente: {tabla}.",
+            hint="El REM Bs22 y calcular_percentiles fallarán hasta corregir la ruta.",
+            id="rendimiento.W009",
+        ))
+
+    return errores
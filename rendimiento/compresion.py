@@ -0,0 +1,209 @@
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin él se usa solo gzip
+    brotli = None
+
+# ===========================
+# COMPRESIÓN DE RESPUESTAS
+# ===========================
+
+_ACEPTA_GZIP = _lazy_re_compile(r"\bgzip\b")
+_ACEPTA_BR = _lazy_re_compile(r"\bbr\b")
+
+TIPOS_COMPRIMIBLES = (
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+# Bytes aleatorios en el encabezado gzip ("Heal The Breach"): el largo de la
+# respuesta deja de revelar coincidencias con secretos de la página
+BYTES_ALEATORIOS_BREACH = 100
+
+
+# Cada cuántos bytes de entrada se fuerza un flush al comprimir streaming con
+# brotli: hacerlo en cada chunk pequeño agranda la salida
+FLUSH_BROTLI_BYTES = 64 * 1024
+
+
+class _CompresorBrotli:
+    def __init__(self):
+        self.compresor = brotli.Compressor(quality=settings.COMPRESION_BROTLI_CALIDAD)
+        self.pendiente = 0
+
+    def procesar(self, chunk):
+        salida = self.compresor.process(chunk)
+        self.pendiente += len(chunk)
+        if self.pendiente >= FLUSH_BROTLI_BYTES:
+            # El cliente recibe lo acumulado sin esperar al final
+            self.pendiente = 0
+            salida += self.compresor.flush()
+        return salida
+
+    def terminar(self):
+        return self.compresor.finish()
+
+
+def _brotli_sequence(sequence):
+    compresor = _CompresorBrotli()
+    for chunk in sequence:
+        salida = compresor.procesar(chunk)
+        if salida:
+            yield salida
+    yield compresor.terminar()
+
+
+async def _abrotli_sequence(sequence):
+    compresor = _CompresorBrotli()
+    async for chunk in sequence:
+        salida = compresor.procesar(chunk)
+        if salida:
+            yield salida
+    yield compresor.terminar()
+
+
+async def _agzip_sequence(sequence, max_random_bytes):
+    async for chunk in sequence:
+        yield compress_string(chunk, max_random_bytes=max_random_bytes)
+
+
+class CompresionMiddleware(MiddlewareMixin):
+    """
+    Comprime con brotli o gzip según Accept-Encoding, solo tipos de texto y
+    respuestas de al menos COMPRESION_MIN_BYTES (las streaming siempre).
+
+    Política BREACH: si la página lleva un token CSRF se usa gzip con bytes
+    aleatorios en vez de brotli. Con COMPRESION_CSRF = "ninguna" esas páginas
+    no se comprimen.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        tipo = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if tipo not in TIPOS_COMPRIMIBLES:
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESION_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        aceptadas = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        # CsrfViewMiddleware renueva la cookie cada vez que la página usó el token
+        con_csrf = settings.CSRF_COOKIE_NAME in response.cookies
+
+        if con_csrf:
+            if settings.COMPRESION_CSRF == "ninguna" or not _ACEPTA_GZIP.search(aceptadas):
+                return response
+            codificacion, aleatorios = "gzip", BYTES_ALEATORIOS_BREACH
+        elif brotli is not None and _ACEPTA_BR.search(aceptadas):
+            codificacion, aleatorios = "br", None
+        elif _ACEPTA_GZIP.search(aceptadas):
+            codificacion, aleatorios = "gzip", None
+        else:
+            return response
+
+        if response.streaming:
+            if codificacion == "br":
+                response.streaming_content = (
+                    _abrotli_sequence(response.streaming_content)
+                    if response.is_async
+                    else _brotli_sequence(response.streaming_content)
+                )
+            elif response.is_async:
+                response.streaming_content = _agzip_sequence(response.streaming_content, aleatorios)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, max_random_bytes=aleatorios
+                )
+            del response.headers["Content-Length"]
+        else:
+            if codificacion == "br":
+                comprimido = brotli.compress(response.content, quality=settings.COMPRESION_BROTLI_CALIDAD)
+            else:
+                comprimido = compress_string(response.content, max_random_bytes=aleatorios)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response.headers["Content-Length"] = str(len(comprimido))
+
+        # ETag fuerte -> débil: el cuerpo ya no es idéntico byte a byte
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = codificacion
+        return response
+
+
+# ===========================
+# MINIFICACIÓN DE HTML
+# ===========================
+
+# Bloques donde los espacios importan: se dejan intactos
+_BLOQUES_LITERALES = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL
+)
+_ESPACIOS = re.compile(r"\s{2,}")
+# Etiqueta completa, aunque un valor entre comillas contenga ">"
+_ETIQUETA = re.compile(r"""(<(?:[^<>"']|"[^"]*"|'[^']*')*>)""")
+# Valores de atributo: son datos del formulario (value="a  b"), no sangría
+_VALOR_ATRIBUTO = re.compile(r"""("[^"]*"|'[^']*')""")
+
+
+def _colapsar(texto):
+    return _ESPACIOS.sub(lambda m: "\n" if "\n" in m.group() else " ", texto)
+
+
+def _colapsar_fuera_de_comillas(etiqueta):
+    partes = _VALOR_ATRIBUTO.split(etiqueta)
+    # split con un grupo alterna: fuera de comillas, valor, fuera de comillas, ...
+    return "".join(parte if i % 2 else _colapsar(parte) for i, parte in enumerate(partes))
+
+
+def minificar_html(html):
+    """
+    Colapsa los espacios repetidos (sangría de las plantillas) a uno solo,
+    conservando un salto de línea si lo había. No elimina espacios entre
+    etiquetas, así que el resultado se ve igual que el original. No toca
+    los bloques literales ni los valores de atributo entre comillas.
+    """
+    partes = _BLOQUES_LITERALES.split(html)
+    resultado = []
+    # split con dos grupos devuelve: texto, bloque, nombre de etiqueta, texto, ...
+    for i in range(0, len(partes), 3):
+        resultado.extend(
+            _colapsar_fuera_de_comillas(trozo) if j % 2 else _colapsar(trozo)
+            for j, trozo in enumerate(_ETIQUETA.split(partes[i]))
+        )
+        if i + 1 < len(partes):
+            resultado.append(partes[i + 1])
+    return "".join(resultado)
+
+
+class MinificarHTMLMiddleware(MiddlewareMixin):
+    """Quita la sangría del HTML renderizado si MINIFICAR_HTML está activo."""
+
+    def process_response(self, request, response):
+        if (
+            not settings.MINIFICAR_HTML
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("text/html")
+        ):
+            return response
+        charset = response.charset
+        response.content = minificar_html(response.content.decode(charset)).encode(charset)
+        if response.has_header("Content-Length"):
+            response.headers["Content-Length"] = str(len(response.content))
+        return response
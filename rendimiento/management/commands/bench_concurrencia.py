@@ -0,0 +1,86 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class _SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    # Un 302 al login significa sesión inválida: se cuenta como error y no se sigue
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga concurrente contra uno o más servidores ya levantados, para comparar "
+        "el despliegue WSGI (gunicorn) con el ASGI (uvicorn/daphne) en las mismas rutas. Ej:\n"
+        "  manage.py bench_concurrencia --servidor wsgi=http://127.0.0.1:8000 "
+        "--servidor asgi=http://127.0.0.1:8001 --ruta /madres/fragmento/ --sesion <cookie>"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servidor", action="append", required=True,
+                            help="nombre=url_base. Se puede repetir.")
+        parser.add_argument("--ruta", action="append", required=True,
+                            help="Ruta a medir (ej: /buscar/rut.json?q=12345678-5). Se puede repetir.")
+        parser.add_argument("--sesion", default="",
+                            help="Valor de la cookie de sesión de un usuario con el rol adecuado.")
+        parser.add_argument("--concurrencia", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        servidores = []
+        for valor in options["servidor"]:
+            if "=" not in valor:
+                raise CommandError(f"--servidor debe ser nombre=url, se recibió '{valor}'")
+            nombre, url = valor.split("=", 1)
+            servidores.append((nombre, url.rstrip("/")))
+
+        cabeceras = {}
+        if options["sesion"]:
+            cabeceras["Cookie"] = f"{settings.SESSION_COOKIE_NAME}={options['sesion']}"
+
+        self.stdout.write(
+            f"{'Servidor':<10}{'Ruta':<36}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errores':>9}"
+        )
+        for ruta in options["ruta"]:
+            for nombre, base in servidores:
+                resultado = self._medir(base + ruta, cabeceras, options["concurrencia"], options["requests"])
+                self.stdout.write(
+                    f"{nombre:<10}{ruta[:35]:<36}{resultado['rps']:>10.1f}"
+                    f"{resultado['p50']:>10.1f}{resultado['p95']:>10.1f}{resultado['errores']:>9}"
+                )
+
+    def _medir(self, url, cabeceras, concurrencia, total):
+        opener = urllib.request.build_opener(_SinRedirecciones)
+
+        def una_request(_):
+            inicio = time.perf_counter()
+            try:
+                request = urllib.request.Request(url, headers=cabeceras)
+                with opener.open(request, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return time.perf_counter() - inicio, ok
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            resultados = list(pool.map(una_request, range(total)))
+        duracion = time.perf_counter() - inicio
+
+        tiempos = sorted(t * 1000 for t, ok in resultados if ok)
+        errores = sum(1 for _, ok in resultados if not ok)
+        if not tiempos:
+            return {"rps": 0.0, "p50": 0.0, "p95": 0.0, "errores": errores}
+        return {
+            "rps": len(tiempos) / duracion,
+            "p50": statistics.median(tiempos),
+            "p95": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+            "errores": errores,
+        }
@@ -0,0 +1,58 @@
+import copy
+import time
+
+from django.core.management.base import BaseCommand
+
+from neonatos.forms import MadreForm, PartoForm, RecienNacidoForm
+
+FORMULARIOS = {
+    "madre": MadreForm,
+    "parto": PartoForm,
+    "rn": RecienNacidoForm,
+}
+
+
+def _medir_us(funcion, iteraciones):
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion()
+    return (time.perf_counter() - inicio) * 1_000_000 / iteraciones
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo por request de construir y renderizar los formularios de ingreso "
+        "(Madre, Parto, RN). La columna 'config' es el trabajo de widgets que antes se repetía "
+        "en cada __init__ y ahora se hace una vez por clase (configurar_campos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iteraciones", type=int, default=500)
+        parser.add_argument("--formulario", action="append", choices=sorted(FORMULARIOS),
+                            help="Formulario a medir. Se puede repetir (por defecto: todos).")
+
+    def handle(self, *args, **options):
+        iteraciones = options["iteraciones"]
+        nombres = options["formulario"] or list(FORMULARIOS)
+
+        self.stdout.write(
+            f"{'Formulario':<12}{'init us':>10}{'render us':>12}{'config us':>12}{'ahorro':>9}"
+        )
+        for nombre in nombres:
+            form_class = FORMULARIOS[nombre]
+            # Calentamiento: compila las plantillas de los widgets
+            str(form_class())
+
+            init_us = _medir_us(form_class, iteraciones)
+            render_us = _medir_us(lambda: str(form_class()), iteraciones) - init_us
+
+            # Costo de la configuración si se hiciera por instancia, medido sobre copias
+            # preparadas fuera del cronómetro (la copia la hace Django igual en cada instancia)
+            copias = iter([copy.deepcopy(form_class.base_fields) for _ in range(iteraciones)])
+            config_us = _medir_us(lambda: form_class.configurar_campos(next(copias)), iteraciones)
+
+            antes_us = init_us + render_us + config_us
+            ahorro = config_us / antes_us * 100 if antes_us else 0.0
+            self.stdout.write(
+                f"{nombre:<12}{init_us:>10.0f}{render_us:>12.0f}{config_us:>12.0f}{ahorro:>8.1f}%"
+            )
@@ -0,0 +1,71 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Lo que hace un worker al arrancar: configurar Django y cargar todas las URLs (y sus vistas)
+SCRIPT_ARRANQUE = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+# "import time:       self [us] |  cumulative | imported package"
+_LINEA = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo de importación del arranque de un worker con python -X importtime "
+        "y falla si supera el presupuesto o si se cargan módulos que deben ser perezosos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--presupuesto-ms", type=float, default=1500,
+                            help="Tiempo máximo de importación acumulado (ms).")
+        parser.add_argument("--prohibido", action="append", default=None,
+                            help="Módulo que no debe importarse al arrancar. Se puede repetir "
+                                 "(por defecto: openpyxl y numpy).")
+        parser.add_argument("--top", type=int, default=15,
+                            help="Cantidad de módulos más costosos a mostrar.")
+
+    def handle(self, *args, **options):
+        prohibidos = options["prohibido"] or ["openpyxl", "numpy"]
+
+        inicio = time.perf_counter()
+        proceso = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", SCRIPT_ARRANQUE],
+            capture_output=True,
+            text=True,
+            env=os.environ.copy(),
+        )
+        pared_ms = (time.perf_counter() - inicio) * 1000
+        if proceso.returncode != 0:
+            raise CommandError(f"El arranque falló:\n{proceso.stderr[-2000:]}")
+
+        modulos = []
+        for linea in proceso.stderr.splitlines():
+            match = _LINEA.match(linea)
+            if match:
+                propio, acumulado, sangria, nombre = match.groups()
+                modulos.append((nombre, int(propio), int(acumulado), len(sangria) // 2))
+
+        # Los módulos de primer nivel ya incluyen a los que importan
+        total_ms = sum(acumulado for _, _, acumulado, nivel in modulos if nivel == 0) / 1000
+        self.stdout.write(f"Importación: {total_ms:.0f} ms ({len(modulos)} módulos), proceso completo: {pared_ms:.0f} ms")
+        self.stdout.write(f"{'Módulo':<50}{'propio ms':>12}{'acumulado ms':>14}")
+        for nombre, propio, acumulado, _ in sorted(modulos, key=lambda m: m[2], reverse=True)[:options["top"]]:
+            self.stdout.write(f"{nombre[:49]:<50}{propio / 1000:>12.1f}{acumulado / 1000:>14.1f}")
+
+        errores = []
+        if total_ms > options["presupuesto_ms"]:
+            errores.append(f"importación de {total_ms:.0f} ms supera el presupuesto de {options['presupuesto_ms']:.0f} ms")
+        for prohibido in prohibidos:
+            # El paquete o cualquiera de sus submódulos
+            if any(nombre == prohibido or nombre.startswith(prohibido + ".") for nombre, *_ in modulos):
+                errores.append(f"'{prohibido}' se importa al arrancar y debe cargarse al primer uso")
+        if errores:
+            raise CommandError("; ".join(errores))
+        self.stdout.write(self.style.SUCCESS("Dentro del presupuesto."))
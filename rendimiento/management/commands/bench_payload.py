@@ -0,0 +1,72 @@
+import gzip
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from rendimiento.compresion import brotli, minificar_html
+
+# Páginas principales por rol (la sesión se abre con el usuario indicado)
+RUTAS_POR_DEFECTO = [
+    "neonatos:madre_list",
+    "GeneradorReporte:ver_bitacora",
+    "gestion_roles:gestion_usuarios",
+    "rendimiento:solicitudes_lentas",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tamaño de las páginas principales antes y después de minificar y "
+        "comprimir (gzip y brotli). Las rutas que el usuario no puede ver se omiten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", action="append", required=True,
+                            help="Usuario con el que se abren las páginas. Se puede repetir (uno por rol).")
+        parser.add_argument("--ruta", action="append",
+                            help="Nombre de URL o ruta a medir. Se puede repetir.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        rutas = options["ruta"] or RUTAS_POR_DEFECTO
+
+        self.stdout.write(
+            f"{'Página':<34}{'original':>10}{'minif.':>10}{'gzip':>10}{'br':>10}{'minif. ms':>11}{'br ms':>8}"
+        )
+        for email in options["email"]:
+            try:
+                usuario = User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f"No existe el usuario {email}")
+            client = Client(HTTP_HOST="localhost")
+            client.force_login(usuario)
+
+            for ruta in rutas:
+                url = ruta if ruta.startswith("/") else reverse(ruta)
+                # Cuerpo sin minificar ni comprimir, tal como lo entrega la plantilla
+                with override_settings(MINIFICAR_HTML=False):
+                    response = client.get(url)
+                if response.status_code != 200:
+                    continue
+                original = response.content
+
+                inicio = time.perf_counter()
+                minificado = minificar_html(original.decode(response.charset)).encode(response.charset)
+                minificar_ms = (time.perf_counter() - inicio) * 1000
+
+                con_gzip = len(gzip.compress(minificado))
+                if brotli is not None:
+                    inicio = time.perf_counter()
+                    con_br = len(brotli.compress(minificado, quality=settings.COMPRESION_BROTLI_CALIDAD))
+                    br_ms = (time.perf_counter() - inicio) * 1000
+                else:
+                    con_br, br_ms = 0, 0.0
+
+                self.stdout.write(
+                    f"{url[:33]:<34}{len(original) // 1024:>8}KB{len(minificado) // 1024:>8}KB"
+                    f"{con_gzip // 1024:>8}KB{con_br // 1024:>8}KB{minificar_ms:>11.1f}{br_ms:>8.1f}"
+                )
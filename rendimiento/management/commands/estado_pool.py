@@ -0,0 +1,60 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from rendimiento.pool import estadisticas_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra la configuración de conexiones y mide la latencia de checkout abriendo "
+        "consultas desde varios hilos, como lo haría un worker de gunicorn con --threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hilos", type=int, default=settings.GUNICORN_THREADS)
+        parser.add_argument("--consultas", type=int, default=50,
+                            help="Consultas por hilo.")
+
+    def handle(self, *args, **options):
+        opciones_pool = connection.settings_dict.get("OPTIONS", {}).get("pool")
+        self.stdout.write(f"Motor: {connection.vendor}")
+        if opciones_pool:
+            maximo = opciones_pool.get("max_size") if isinstance(opciones_pool, dict) else None
+            self.stdout.write(f"Pool por proceso: {opciones_pool}")
+            if maximo:
+                self.stdout.write(
+                    f"Conexiones máximas: {settings.WEB_CONCURRENCY} procesos x {maximo} = "
+                    f"{settings.WEB_CONCURRENCY * maximo}"
+                )
+        else:
+            self.stdout.write(f"Sin pool, CONN_MAX_AGE={connection.settings_dict.get('CONN_MAX_AGE')}")
+
+        def trabajo(_):
+            tiempos = []
+            for _ in range(options["consultas"]):
+                inicio = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+                # Devuelve la conexión al pool entre consultas, como al terminar una request
+                if opciones_pool:
+                    connection.close()
+            connections.close_all()
+            return tiempos
+
+        with ThreadPoolExecutor(max_workers=options["hilos"]) as pool:
+            tiempos = sorted(t for lista in pool.map(trabajo, range(options["hilos"])) for t in lista)
+
+        self.stdout.write(
+            f"{len(tiempos)} consultas en {options['hilos']} hilos: "
+            f"p50 {statistics.median(tiempos):.2f} ms, "
+            f"p95 {tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]:.2f} ms"
+        )
+        for clave, valor in estadisticas_pool().items():
+            self.stdout.write(f"  {clave}: {valor}")
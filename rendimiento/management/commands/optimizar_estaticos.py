@@ -0,0 +1,101 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+EXTENSIONES = (".jpg", ".jpeg", ".png")
+TAMANOS_FAVICON = [(16, 16), (32, 32), (48, 48)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera versiones optimizadas de static/images en static/images/optimizadas: "
+        "redimensionadas, en WebP y AVIF, más un favicon.ico pequeño. Requiere Pillow "
+        "(pip install Pillow); los archivos generados se versionan junto al resto de estáticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--origen", default=os.path.join(settings.BASE_DIR, "static", "images"))
+        parser.add_argument("--ancho-max", type=int, default=1920,
+                            help="Ancho máximo de los fondos en píxeles.")
+        parser.add_argument("--calidad", type=int, default=78)
+        parser.add_argument("--icono", default="icono_huella.png",
+                            help="Imagen de origen del favicon.")
+        parser.add_argument("--forzar", action="store_true",
+                            help="Regenerar aunque el resultado sea más nuevo que el original.")
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image, features
+        except ImportError:
+            raise CommandError("Pillow no está instalado: pip install Pillow")
+
+        origen = options["origen"]
+        destino = os.path.join(origen, "optimizadas")
+        os.makedirs(destino, exist_ok=True)
+        formatos = ["webp"]
+        if features.check("avif"):
+            formatos.append("avif")
+        else:
+            self.stderr.write("Pillow sin soporte AVIF: solo se generará WebP.")
+
+        antes = despues = 0
+        for nombre in sorted(os.listdir(origen)):
+            base, extension = os.path.splitext(nombre)
+            if extension.lower() not in EXTENSIONES or nombre == options["icono"]:
+                continue
+            ruta = os.path.join(origen, nombre)
+            # Respaldo en el formato original para navegadores sin image-set()
+            salidas = {fmt: os.path.join(destino, f"{base}.{fmt}") for fmt in formatos}
+            salidas[extension.lower().lstrip(".")] = os.path.join(destino, nombre)
+            if not options["forzar"] and all(
+                os.path.exists(s) and os.path.getmtime(s) >= os.path.getmtime(ruta) for s in salidas.values()
+            ):
+                continue
+
+            with Image.open(ruta) as imagen:
+                imagen.load()
+            if imagen.width > options["ancho_max"]:
+                alto = round(imagen.height * options["ancho_max"] / imagen.width)
+                imagen = imagen.resize((options["ancho_max"], alto), Image.LANCZOS)
+
+            for fmt, salida in salidas.items():
+                self._guardar(imagen, fmt, salida, options["calidad"])
+                if os.path.getsize(salida) > os.path.getsize(ruta) and salida.endswith(extension):
+                    # El respaldo nunca debe pesar más que el original
+                    shutil.copyfile(ruta, salida)
+            antes += os.path.getsize(ruta)
+            despues += min(os.path.getsize(s) for s in salidas.values())
+            self.stdout.write(
+                f"{nombre}: {os.path.getsize(ruta) // 1024} KB -> "
+                + ", ".join(f"{fmt} {os.path.getsize(s) // 1024} KB" for fmt, s in salidas.items())
+            )
+
+        icono = os.path.join(origen, options["icono"])
+        if os.path.exists(icono):
+            with Image.open(icono) as imagen:
+                imagen = imagen.convert("RGBA")
+                imagen.save(os.path.join(destino, "favicon.ico"), sizes=TAMANOS_FAVICON)
+                imagen.resize((32, 32), Image.LANCZOS).save(
+                    os.path.join(destino, "favicon-32.png"), optimize=True
+                )
+            self.stdout.write(f"favicon.ico: {os.path.getsize(os.path.join(destino, 'favicon.ico'))} bytes")
+
+        if antes:
+            self.stdout.write(self.style.SUCCESS(
+                f"Imágenes: {antes // 1024} KB -> {despues // 1024} KB (variante más liviana)"
+            ))
+
+    def _guardar(self, imagen, fmt, salida, calidad):
+        from PIL import Image
+
+        if fmt in ("jpg", "jpeg"):
+            imagen.convert("RGB").save(salida, "JPEG", quality=calidad + 4, optimize=True, progressive=True)
+        elif fmt == "png":
+            # Paleta de 256 colores: suficiente para fondos y mantiene la transparencia
+            imagen.quantize(256, method=Image.Quantize.FASTOCTREE).save(salida, "PNG", optimize=True)
+        elif fmt == "webp":
+            imagen.save(salida, "WEBP", quality=calidad, method=6)
+        elif fmt == "avif":
+            imagen.save(salida, "AVIF", quality=calidad - 18)
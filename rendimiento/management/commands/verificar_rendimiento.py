@@ -0,0 +1,20 @@
+from django.core import checks
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Revisa la configuración de rendimiento de producción y termina con error si algo "
+        "está mal. Pensado para correr antes de gunicorn: "
+        "python manage.py verificar_rendimiento && gunicorn huellas.wsgi"
+    )
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        # Lanza SystemCheckError (código de salida 1) ante cualquier advertencia
+        self.check(
+            tags=["rendimiento"],
+            include_deployment_checks=True,
+            fail_level=checks.WARNING,
+        )
+        self.stdout.write(self.style.SUCCESS("Configuración de rendimiento correcta."))
@@ -0,0 +1,71 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+# ===========================
+# MEDICIÓN DE LA REQUEST ACTUAL
+# ===========================
+
+_medicion_actual = ContextVar("medicion_actual", default=None)
+
+
+class Medicion:
+    """Acumula tiempos de SQL y plantillas de una request."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.sql_segundos = 0.0
+        self.plantilla_segundos = 0.0
+        self.consultas = Counter()
+        # Los completa InstrumentacionMiddleware al terminar la request
+        self.duracion_ms = 0.0
+        self.vista = ""
+
+    def __call__(self, execute, sql, params, many, context):
+        # Se usa como connection.execute_wrapper: cuenta la sentencia sin sus parámetros
+        # para que la misma consulta con distinto id cuente como repetida
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_segundos += time.perf_counter() - inicio
+            self.consultas[sql] += 1
+
+    @property
+    def total_consultas(self):
+        return sum(self.consultas.values())
+
+    def mas_repetida(self):
+        """(sql, veces) de la consulta más repetida, o ('', 0) si ninguna se repite."""
+        if self.consultas:
+            sql, veces = self.consultas.most_common(1)[0]
+            if veces > 1:
+                return sql, veces
+        return "", 0
+
+
+def iniciar_medicion():
+    medicion = Medicion()
+    return medicion, _medicion_actual.set(medicion)
+
+
+def terminar_medicion(token):
+    _medicion_actual.reset(token)
+
+
+def medir_sql(execute, sql, params, many, context):
+    """
+    execute_wrapper permanente de cada conexión (ver signals.py). Mide solo si
+    hay una request en curso; la ContextVar también llega a los hilos de
+    sync_to_async, donde corren las consultas de las vistas async.
+    """
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    return medicion(execute, sql, params, many, context)
+
+
+def sumar_plantilla(segundos):
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.plantilla_segundos += segundos
@@ -0,0 +1,256 @@
+import glob
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows (solo desarrollo): sin flock no se compacta, ver compactar()
+    fcntl = None
+
+# ===========================
+# MÉTRICAS (formato de texto Prometheus)
+# ===========================
+# Cada proceso de gunicorn acumula sus métricas en memoria y cada
+# METRICAS_INTERVALO segundos las vuelca a un archivo JSON propio en
+# METRICAS_DIR. /metrics suma los archivos de todos los procesos. Los de
+# procesos terminados se suman a AGREGADO y se borran (como el modo
+# multiproceso de prometheus_client): los contadores no retroceden y el
+# directorio no crece con cada reciclaje de workers o despliegue.
+
+BUCKETS_SEGUNDOS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+BUCKETS_FILAS = (10, 100, 1000, 10000, 100000)
+
+AGREGADO = "agregado.json"
+_ARCHIVO_PROCESO = re.compile(r"^(\d+)-(\d+)\.json$")
+
+
+def _leer(ruta):
+    try:
+        with open(ruta) as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir(ruta, datos):
+    # Escritura atómica: quien lee nunca ve un archivo a medio escribir
+    fd, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+    with os.fdopen(fd, "w") as archivo:
+        json.dump(datos, archivo)
+    os.replace(temporal, ruta)
+
+
+def _sumar(totales, datos):
+    """Suma a `totales` ({nombre: {clave: valor}}) las filas de un archivo."""
+    for nombre, filas in datos.items():
+        destino = totales.setdefault(nombre, {})
+        for clave, valor in filas:
+            clave = tuple(tuple(par) for par in clave)
+            actual = destino.get(clave)
+            if actual is None:
+                destino[clave] = valor
+            elif isinstance(valor, list):
+                destino[clave] = [a + b for a, b in zip(actual, valor)]
+            else:
+                destino[clave] = actual + valor
+
+
+def _proceso_vivo(pid):
+    # Señal 0: solo comprueba que el pid exista (PermissionError = existe, de otro usuario)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _archivos_muertos(directorio):
+    """Archivos de procesos terminados; de un pid reutilizado solo el más nuevo puede estar vivo."""
+    por_pid = {}
+    for nombre in os.listdir(directorio):
+        coincidencia = _ARCHIVO_PROCESO.match(nombre)
+        if coincidencia:
+            pid, inicio = int(coincidencia.group(1)), int(coincidencia.group(2))
+            por_pid.setdefault(pid, []).append((inicio, nombre))
+    muertos = []
+    for pid, archivos in por_pid.items():
+        archivos.sort()
+        if pid == os.getpid() or _proceso_vivo(pid):
+            archivos.pop()
+        muertos.extend(nombre for _, nombre in archivos)
+    return muertos
+
+
+def compactar(directorio=None):
+    """Suma los archivos de procesos terminados a AGREGADO y los borra. Devuelve cuántos."""
+    if fcntl is None:
+        # Sin candado dos workers podrían sumar el mismo archivo dos veces (y en Windows
+        # os.kill(pid, 0) no es una consulta): los archivos se dejan y /metrics los suma igual
+        return 0
+    directorio = directorio or _directorio()
+    os.makedirs(directorio, exist_ok=True)
+    # El candado evita que dos workers sumen el mismo archivo a la vez
+    with open(os.path.join(directorio, ".candado"), "w") as candado:
+        fcntl.flock(candado, fcntl.LOCK_EX)
+        muertos = _archivos_muertos(directorio)
+        if not muertos:
+            return 0
+        ruta_agregado = os.path.join(directorio, AGREGADO)
+        totales = {}
+        _sumar(totales, _leer(ruta_agregado) or {})
+        for nombre in muertos:
+            _sumar(totales, _leer(os.path.join(directorio, nombre)) or {})
+        _escribir(ruta_agregado, {
+            nombre: [[list(clave), valor] for clave, valor in valores.items()]
+            for nombre, valores in totales.items()
+        })
+        # Un corte entre la escritura y el borrado contaría esos archivos dos veces: es raro
+        # y solo adelanta contadores, nunca los hace retroceder
+        for nombre in muertos:
+            try:
+                os.remove(os.path.join(directorio, nombre))
+            except FileNotFoundError:
+                pass
+        return len(muertos)
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._definiciones = {}
+        # {nombre: {etiquetas (tupla ordenada): valor o [buckets..., suma, cantidad]}}
+        self._valores = {}
+        self._ultimo_guardado = 0.0
+        self._archivo = None
+
+    def contador(self, nombre, ayuda):
+        self._definiciones[nombre] = {"tipo": "counter", "ayuda": ayuda}
+        self._valores[nombre] = {}
+
+    def histograma(self, nombre, ayuda, buckets):
+        self._definiciones[nombre] = {"tipo": "histogram", "ayuda": ayuda, "buckets": list(buckets)}
+        self._valores[nombre] = {}
+
+    def incrementar(self, nombre, cantidad=1, **etiquetas):
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            valores = self._valores[nombre]
+            valores[clave] = valores.get(clave, 0) + cantidad
+
+    def observar(self, nombre, valor, **etiquetas):
+        buckets = self._definiciones[nombre]["buckets"]
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            datos = self._valores[nombre].setdefault(clave, [0] * len(buckets) + [0.0, 0])
+            for i, limite in enumerate(buckets):
+                if valor <= limite:
+                    datos[i] += 1
+            datos[-2] += valor
+            datos[-1] += 1
+
+    # --- Archivos compartidos entre procesos ---
+
+    def _ruta_archivo(self):
+        if self._archivo is None:
+            # pid + inicio: un pid reutilizado tras un reinicio no pisa el archivo anterior
+            self._archivo = os.path.join(
+                _directorio(), f"{os.getpid()}-{int(time.time() * 1000)}.json"
+            )
+        return self._archivo
+
+    def guardar(self):
+        with self._lock:
+            datos = {
+                nombre: [[list(clave), valor] for clave, valor in valores.items()]
+                for nombre, valores in self._valores.items()
+            }
+            self._ultimo_guardado = time.monotonic()
+        ruta = self._ruta_archivo()
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        _escribir(ruta, datos)
+
+    def guardar_si_corresponde(self):
+        if time.monotonic() - self._ultimo_guardado >= settings.METRICAS_INTERVALO:
+            self.guardar()
+
+    def exposicion(self):
+        """Suma los archivos de todos los procesos y devuelve el texto de /metrics."""
+        self.guardar()
+        compactar()
+        totales = {nombre: {} for nombre in self._definiciones}
+        for ruta in glob.glob(os.path.join(_directorio(), "*.json")):
+            datos = _leer(ruta)
+            if datos:
+                _sumar(totales, {nombre: filas for nombre, filas in datos.items() if nombre in totales})
+
+        lineas = []
+        for nombre, definicion in self._definiciones.items():
+            lineas.append(f"# HELP {nombre} {definicion['ayuda']}")
+            lineas.append(f"# TYPE {nombre} {definicion['tipo']}")
+            for clave, valor in sorted(totales[nombre].items()):
+                if definicion["tipo"] == "counter":
+                    lineas.append(f"{nombre}{_etiquetas(clave)} {valor}")
+                    continue
+                for limite, cantidad in zip(definicion["buckets"], valor):
+                    lineas.append(f"{nombre}_bucket{_etiquetas(clave, le=limite)} {cantidad}")
+                lineas.append(f"{nombre}_bucket{_etiquetas(clave, le='+Inf')} {valor[-1]}")
+                lineas.append(f"{nombre}_sum{_etiquetas(clave)} {valor[-2]}")
+                lineas.append(f"{nombre}_count{_etiquetas(clave)} {valor[-1]}")
+
+        # Proporción de aciertos de caché derivada de los contadores ya sumados
+        aciertos = sum(totales.get("huellas_cache_hits_total", {}).values())
+        fallos = sum(totales.get("huellas_cache_misses_total", {}).values())
+        lineas.append("# HELP huellas_cache_hit_ratio Proporción de lecturas de caché con acierto")
+        lineas.append("# TYPE huellas_cache_hit_ratio gauge")
+        lineas.append(f"huellas_cache_hit_ratio {aciertos / (aciertos + fallos) if aciertos + fallos else 0}")
+        return "\n".join(lineas) + "\n"
+
+
+def _directorio():
+    return settings.METRICAS_DIR
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(clave, **extra):
+    pares = list(clave) + list(extra.items())
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+registro = RegistroMetricas()
+registro.histograma("huellas_request_duration_seconds", "Duración de las requests por vista", BUCKETS_SEGUNDOS)
+registro.histograma("huellas_request_queries", "Consultas SQL por request", BUCKETS_CONSULTAS)
+registro.histograma("huellas_export_duration_seconds", "Duración de la generación de reportes Excel", BUCKETS_SEGUNDOS)
+registro.histograma("huellas_export_rows", "Filas escritas por reporte Excel", BUCKETS_FILAS)
+registro.contador("huellas_bitacora_writes_total", "Registros creados en la Bitácora")
+registro.contador("huellas_login_total", "Intentos de inicio de sesión por resultado")
+registro.contador("huellas_cache_hits_total", "Lecturas de caché con acierto")
+registro.contador("huellas_cache_misses_total", "Lecturas de caché sin acierto")
+
+
+# ===========================
+# ATAJOS PARA EL RESTO DEL PROYECTO
+# ===========================
+
+def observar_request(vista, metodo, segundos, consultas):
+    registro.observar("huellas_request_duration_seconds", segundos, vista=vista, metodo=metodo)
+    registro.observar("huellas_request_queries", consultas, vista=vista)
+    registro.guardar_si_corresponde()
+
+
+def observar_exportacion(reporte, segundos, filas):
+    registro.observar("huellas_export_duration_seconds", segundos, reporte=reporte)
+    registro.observar("huellas_export_rows", filas, reporte=reporte)
@@ -0,0 +1,122 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from rendimiento.medicion import iniciar_medicion, terminar_medicion
+from rendimiento.metricas import observar_request
+from rendimiento.models import SolicitudLenta
+
+logger = logging.getLogger(__name__)
+
+# ===========================
+# INSTRUMENTACIÓN POR REQUEST
+# ===========================
+
+class InstrumentacionMiddleware:
+    """
+    Mide cada request: tiempo total, cantidad y tiempo de consultas SQL,
+    consultas repetidas (N+1) y tiempo de render de plantillas. Lo informa en
+    la cabecera Server-Timing y guarda en SolicitudLenta las requests que
+    superan RENDIMIENTO_UMBRAL_MS.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Bajo ASGI no fuerza a la cadena a pasar a sync: las vistas async no ocupan un hilo
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Las consultas se miden con rendimiento.medicion.medir_sql, instalado en cada conexión
+        medicion, token = iniciar_medicion()
+        try:
+            response = self.get_response(request)
+        finally:
+            terminar_medicion(token)
+        if self._informar(request, response, medicion):
+            self._registrar_lenta(request, response, medicion)
+        return response
+
+    async def __acall__(self, request):
+        medicion, token = iniciar_medicion()
+        try:
+            response = await self.get_response(request)
+        finally:
+            terminar_medicion(token)
+        if self._informar(request, response, medicion):
+            await sync_to_async(self._registrar_lenta)(request, response, medicion)
+        return response
+
+    def _informar(self, request, response, medicion):
+        """Cabecera Server-Timing y métricas. Devuelve True si la request fue lenta."""
+        medicion.duracion_ms = (time.perf_counter() - medicion.inicio) * 1000
+        response["Server-Timing"] = (
+            f'total;dur={medicion.duracion_ms:.1f}, '
+            f'db;dur={medicion.sql_segundos * 1000:.1f};desc="{medicion.total_consultas} consultas", '
+            f'tpl;dur={medicion.plantilla_segundos * 1000:.1f}'
+        )
+
+        match = getattr(request, "resolver_match", None)
+        medicion.vista = (match.view_name if match else "") or "(sin ruta)"
+        observar_request(medicion.vista, request.method, medicion.duracion_ms / 1000, medicion.total_consultas)
+        return medicion.duracion_ms >= settings.RENDIMIENTO_UMBRAL_MS
+
+    def _registrar_lenta(self, request, response, medicion):
+        sql, veces = medicion.mas_repetida()
+        try:
+            nueva = SolicitudLenta.objects.create(
+                vista=medicion.vista[:150],
+                ruta=request.path[:255],
+                metodo=request.method,
+                estado=response.status_code,
+                duracion_ms=medicion.duracion_ms,
+                consultas=medicion.total_consultas,
+                sql_ms=medicion.sql_segundos * 1000,
+                plantilla_ms=medicion.plantilla_segundos * 1000,
+                sql_repetido=sql,
+                repeticiones=veces,
+            )
+            # Buffer circular: se conserva solo la ventana más reciente
+            SolicitudLenta.objects.filter(pk__lte=nueva.pk - settings.RENDIMIENTO_MAX_LENTAS).delete()
+        except DatabaseError:
+            # La medición nunca debe romper la respuesta
+            logger.exception("No se pudo registrar la solicitud lenta %s", request.path)
+
+
+class EstaticosMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware con camino async: el original es solo sync y, bajo
+    ASGI, obliga a adaptar a sync todo lo que queda debajo de él en la cadena.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # La búsqueda es en memoria (sin autorefresh) o un stat del archivo
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolicitudLenta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vista', models.CharField(db_index=True, max_length=150)),
+                ('ruta', models.CharField(max_length=255)),
+                ('metodo', models.CharField(max_length=10)),
+                ('estado', models.PositiveSmallIntegerField()),
+                ('duracion_ms', models.FloatField()),
+                ('consultas', models.PositiveIntegerField()),
+                ('sql_ms', models.FloatField()),
+                ('plantilla_ms', models.FloatField()),
+                ('sql_repetido', models.TextField(blank=True)),
+                ('repeticiones', models.PositiveIntegerField(default=0)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import models
+
+# ===========================
+# TABLA: SOLICITUD LENTA
+# ===========================
+class SolicitudLenta(models.Model):
+    """
+    Requests que superaron RENDIMIENTO_UMBRAL_MS. La tabla funciona como buffer
+    circular: al insertar se borran las filas más antiguas que
+    RENDIMIENTO_MAX_LENTAS (ver rendimiento.middleware).
+    """
+    vista = models.CharField(max_length=150, db_index=True)
+    ruta = models.CharField(max_length=255)
+    metodo = models.CharField(max_length=10)
+    estado = models.PositiveSmallIntegerField()
+    duracion_ms = models.FloatField()
+    consultas = models.PositiveIntegerField()
+    sql_ms = models.FloatField()
+    plantilla_ms = models.FloatField()
+    # Consulta más repetida de la request (posible N+1) y cuántas veces se ejecutó
+    sql_repetido = models.TextField(blank=True)
+    repeticiones = models.PositiveIntegerField(default=0)
+    fecha = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.metodo} {self.ruta} ({self.duracion_ms:.0f} ms)"
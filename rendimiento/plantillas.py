@@ -0,0 +1,30 @@
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from rendimiento.medicion import sumar_plantilla
+
+
+class PlantillaMedida(Template):
+    # Solo se mide la plantilla de nivel superior: los include y extends
+    # se resuelven dentro de su render y no se cuentan dos veces
+    def render(self, context=None, request=None):
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            sumar_plantilla(time.perf_counter() - inicio)
+
+
+class DjangoTemplatesMedidas(DjangoTemplates):
+    """Backend DjangoTemplates que informa el tiempo de render a InstrumentacionMiddleware."""
+
+    def from_string(self, template_code):
+        return PlantillaMedida(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return PlantillaMedida(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
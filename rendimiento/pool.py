@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# ===========================
+# TELEMETRÍA DE CONEXIONES
+# ===========================
+
+# Contadores por proceso: cada worker de gunicorn tiene su propio pool
+_inicio = time.monotonic()
+_aperturas = defaultdict(int)
+_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def contar_apertura(sender, connection, **kwargs):
+    # Se dispara en cada connect() de Django. Sin pool es una conexión nueva al
+    # servidor; con el pool de psycopg es un checkout (la conexión puede ser reutilizada)
+    with _lock:
+        _aperturas[connection.alias] += 1
+
+
+def estadisticas_pool(alias="default"):
+    """
+    Estado de las conexiones del alias en este proceso. Con el pool de psycopg
+    las conexiones creadas y la latencia de checkout salen de pool.get_stats();
+    con MySQL/SQLite (conexión persistente por hilo) se cuentan las aperturas.
+    """
+    conexion = connections[alias]
+    minutos = max((time.monotonic() - _inicio) / 60, 1 / 60)
+    pool = getattr(conexion, "pool", None)
+    stats = pool.get_stats() if pool is not None else {}
+    creadas = stats.get("connections_num", 0) if pool is not None else _aperturas[alias]
+    datos = {
+        "alias": alias,
+        "motor": conexion.vendor,
+        "pid": os.getpid(),
+        "conexiones_creadas": creadas,
+        "conexiones_por_minuto": round(creadas / minutos, 2),
+    }
+
+    if pool is None:
+        conn_max_age = conexion.settings_dict.get("CONN_MAX_AGE", 0)
+        datos.update({
+            "tipo": "persistente" if conn_max_age else "por_request",
+            "conn_max_age": conn_max_age,
+        })
+        return datos
+
+    checkouts = stats.get("requests_num", 0)
+    en_uso = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    datos.update({
+        "tipo": "pool",
+        "tamano_min": stats.get("pool_min", 0),
+        "tamano_max": stats.get("pool_max", 0),
+        "tamano_actual": stats.get("pool_size", 0),
+        "disponibles": stats.get("pool_available", 0),
+        "en_uso": en_uso,
+        "saturacion": round(en_uso / stats["pool_max"], 3) if stats.get("pool_max") else 0,
+        "esperando": stats.get("requests_waiting", 0),
+        "checkouts": checkouts,
+        "checkouts_en_cola": stats.get("requests_queued", 0),
+        "checkout_ms_promedio": round(stats.get("requests_wait_ms", 0) / checkouts, 2) if checkouts else 0,
+        "errores_checkout": stats.get("requests_errors", 0),
+        "conexiones_perdidas": stats.get("connections_lost", 0),
+    })
+    return datos
+
+
+def estadisticas_todas():
+    return [estadisticas_pool(alias) for alias in connections]
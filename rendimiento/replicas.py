@@ -0,0 +1,161 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+
+# ===========================
+# RÉPLICA DE LECTURA PARA REPORTES
+# ===========================
+# Las vistas de reportes y bitácora marcadas con @lectura_reportes leen desde
+# el alias "reportes" (REPORTES_DATABASE_URL). Las escrituras siempre van a
+# "default". Si la sesión escribió hace menos de REPORTES_VENTANA_ESCRITURA
+# segundos se sigue leyendo de "default", para no mostrar datos atrasados por
+# el retraso de replicación. Sin réplica configurada todo va a "default".
+
+ALIAS_REPORTES = "reportes"
+CLAVE_SESION = "_escritura_hasta"
+
+# Modelos cuya escritura no activa la ventana: registros internos que el
+# usuario no vuelve a leer en un reporte
+_SIN_VENTANA = {"sessions", "rendimiento"}
+_MODELOS_SIN_VENTANA = {("GeneradorReporte", "bitacora"), ("gestion_roles", "codigootp")}
+
+_leer_reportes = ContextVar("leer_reportes", default=False)
+# Objeto mutable por request: se modifica también desde los hilos de sync_to_async
+_escrituras = ContextVar("escrituras", default=None)
+
+
+def replica_configurada():
+    return ALIAS_REPORTES in settings.DATABASES
+
+
+def _ventana_activa(valor):
+    return bool(valor) and valor > time.time()
+
+
+class ReportesRouter:
+    def db_for_read(self, model, **hints):
+        if _leer_reportes.get() and replica_configurada():
+            return ALIAS_REPORTES
+        return None
+
+    def db_for_write(self, model, **hints):
+        estado = _escrituras.get()
+        if estado is not None and not (
+            model._meta.app_label in _SIN_VENTANA
+            or (model._meta.app_label, model._meta.model_name) in _MODELOS_SIN_VENTANA
+        ):
+            estado["escribio"] = True
+        # Un objeto leído desde la réplica se guarda igual en el primario
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica y primario tienen los mismos datos
+        bases = {"default", ALIAS_REPORTES}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación
+        if db == ALIAS_REPORTES:
+            return False
+        return None
+
+
+def lectura_reportes(view_func):
+    """
+    Envía las lecturas de la vista a la réplica de reportes, salvo dentro de la
+    ventana posterior a una escritura de la misma sesión. Funciona con vistas
+    sync y async.
+    """
+    if iscoroutinefunction(view_func):
+        async def wrapper(request, *args, **kwargs):
+            session = getattr(request, "session", None)
+            hasta = await session.aget(CLAVE_SESION) if session is not None else None
+            token = _leer_reportes.set(not _ventana_activa(hasta))
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _leer_reportes.reset(token)
+    else:
+        def wrapper(request, *args, **kwargs):
+            session = getattr(request, "session", None)
+            hasta = session.get(CLAVE_SESION) if session is not None else None
+            token = _leer_reportes.set(not _ventana_activa(hasta))
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                _leer_reportes.reset(token)
+    return wraps(view_func)(wrapper)
+
+
+@contextmanager
+def lectura_primario():
+    """
+    Lee desde "default" aunque la vista use @lectura_reportes. Para resultados
+    que se guardan en caché bajo la generación de los datos (neonatos/generacion.py):
+    la generación avanza al confirmarse la escritura en el primario, y un
+    cálculo hecho en la réplica atrasada quedaría guardado como vigente todo el TTL.
+    """
+    token = _leer_reportes.set(False)
+    try:
+        yield
+    finally:
+        _leer_reportes.reset(token)
+
+
+class VentanaEscrituraMiddleware:
+    """
+    Si la request escribió en la base de datos, guarda en la sesión hasta cuándo
+    sus lecturas de reportes deben seguir en "default". Va después del
+    middleware de sesiones.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_configurada():
+            return self.get_response(request)
+
+        estado = {"escribio": False}
+        token = _escrituras.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _escrituras.reset(token)
+
+        # Solo sesiones con login: la API por token no debe crear sesiones anónimas
+        session = getattr(request, "session", None)
+        if estado["escribio"] and session is not None and session.get(SESSION_KEY):
+            session[CLAVE_SESION] = time.time() + settings.REPORTES_VENTANA_ESCRITURA
+        return response
+
+    async def __acall__(self, request):
+        if not replica_configurada():
+            return await self.get_response(request)
+
+        # `estado` es mutable: lo marcan también los hilos de sync_to_async de la vista
+        estado = {"escribio": False}
+        token = _escrituras.set(estado)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _escrituras.reset(token)
+
+        session = getattr(request, "session", None)
+        if estado["escribio"] and session is not None and await session.aget(SESSION_KEY):
+            await session.aset(CLAVE_SESION, time.time() + settings.REPORTES_VENTANA_ESCRITURA)
+        return response
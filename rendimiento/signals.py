@@ -0,0 +1,31 @@
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from GeneradorReporte.models import Bitacora
+from rendimiento.medicion import medir_sql
+from rendimiento.metricas import registro
+
+
+@receiver(connection_created)
+def instalar_medicion_sql(sender, connection, **kwargs):
+    # Una vez por conexión (se reenvía al reconectar): mide sus consultas en cualquier hilo
+    if medir_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(medir_sql)
+
+
+@receiver(post_save, sender=Bitacora)
+def contar_bitacora(sender, instance, created, **kwargs):
+    if created:
+        registro.incrementar("huellas_bitacora_writes_total", accion=instance.accion)
+
+
+@receiver(user_logged_in)
+def contar_login_exitoso(sender, request, user, **kwargs):
+    registro.incrementar("huellas_login_total", resultado="exito")
+
+
+@receiver(user_login_failed)
+def contar_login_fallido(sender, credentials, request=None, **kwargs):
+    registro.incrementar("huellas_login_total", resultado="fallo")
@@ -0,0 +1,292 @@
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.cache import SessionStore
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+
+from gestion_roles.models import Usuario
+from neonatos.models import Madre
+from rendimiento.checks import revisar_configuracion
+from rendimiento.compresion import minificar_html
+from rendimiento.metricas import AGREGADO, compactar, registro
+from rendimiento.pool import estadisticas_pool
+from rendimiento.replicas import CLAVE_SESION, VentanaEscrituraMiddleware, _escrituras
+
+
+class _PoolFalso:
+    def get_stats(self):
+        return {
+            "pool_min": 2, "pool_max": 4, "pool_size": 3, "pool_available": 1,
+            "requests_num": 500, "requests_wait_ms": 250, "connections_num": 3,
+        }
+
+
+class EstadisticasPoolTests(TestCase):
+    def test_sin_pool_cuenta_las_aperturas(self):
+        antes = estadisticas_pool()["conexiones_creadas"]
+        connection_created.send(sender=type(connection), connection=connection)
+        datos = estadisticas_pool()
+        self.assertEqual(datos["conexiones_creadas"], antes + 1)
+        self.assertEqual(datos["tipo"], "por_request")
+
+    def test_con_pool_las_conexiones_salen_del_pool(self):
+        # Con el pool cada checkout dispara connection_created: no cuenta como conexión creada
+        with mock.patch.object(connection, "pool", _PoolFalso(), create=True):
+            connection_created.send(sender=type(connection), connection=connection)
+            datos = estadisticas_pool()
+        self.assertEqual((datos["tipo"], datos["conexiones_creadas"], datos["checkouts"]), ("pool", 3, 500))
+        self.assertEqual((datos["en_uso"], datos["saturacion"], datos["checkout_ms_promedio"]), (2, 0.5, 0.5))
+
+    def test_vista_solo_para_supervisor(self):
+        supervisor = Usuario.objects.create_user("sup@x.cl", "Supervisor", "clave", rol="Supervisor")
+        self.client.force_login(supervisor)
+        self.assertEqual(self.client.get("/rendimiento/pool/").json()["conexiones"][0]["alias"], "default")
+
+
+class _Registros(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.mensajes = []
+
+    def emit(self, record):
+        self.mensajes.append(record.getMessage())
+
+
+class CadenaAsyncTests(TestCase):
+    # Django solo registra las adaptaciones con DEBUG activo
+    @override_settings(DEBUG=True)
+    def test_ningun_middleware_adapta_la_cadena_a_sync(self):
+        registros = _Registros()
+        logger = logging.getLogger("django.request")
+        nivel = logger.level
+        logger.addHandler(registros)
+        logger.setLevel(logging.DEBUG)
+        try:
+            handler = ASGIHandler()
+        finally:
+            logger.removeHandler(registros)
+            logger.setLevel(nivel)
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+        # Django solo registra el middleware sync más interno: ninguno debe aparecer
+        self.assertFalse([m for m in registros.mensajes if "adapted for middleware" in m])
+
+    async def test_vista_async_informa_sus_consultas(self):
+        usuario = await Usuario.objects.acreate(email="mat@x.cl", nombre="Matrona", rol="Matrona")
+        await Madre.objects.acreate(
+            rut="11111111-1", nombres="Ana", apellidos="Soto", edad=30, nacionalidad="chilena",
+        )
+        await self.async_client.aforce_login(usuario)
+        response = await self.async_client.get("/madres/fragmento/")
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'db;dur=[\d.]+;desc="[1-9]\d* consultas"')
+
+
+class MetricasTests(TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+        ajustes = override_settings(METRICAS_DIR=self.directorio, METRICAS_TOKEN="", PRODUCCION=False)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def _archivo(self, nombre, valor):
+        with open(os.path.join(self.directorio, nombre), "w") as archivo:
+            json.dump({"huellas_login_total": [[[["resultado", "fallo"]], valor]]}, archivo)
+
+    def test_compactar_suma_y_borra_los_archivos_de_procesos_terminados(self):
+        # pid 999999999 no existe; de un pid vivo (el propio) solo sobrevive el archivo más nuevo
+        self._archivo("999999999-1.json", 2)
+        self._archivo(f"{os.getpid()}-1.json", 3)
+        self._archivo(f"{os.getpid()}-2.json", 5)
+        self.assertEqual(compactar(self.directorio), 2)
+        self.assertEqual(sorted(os.listdir(self.directorio)), sorted([".candado", AGREGADO, f"{os.getpid()}-2.json"]))
+
+        self._archivo("999999998-1.json", 1)
+        compactar(self.directorio)
+        with open(os.path.join(self.directorio, AGREGADO)) as archivo:
+            self.assertEqual(json.load(archivo)["huellas_login_total"], [[[["resultado", "fallo"]], 6]])
+
+    def test_sin_fcntl_no_compacta_pero_expone_todo(self):
+        self._archivo("999999999-1.json", 2)
+        with mock.patch("rendimiento.metricas.fcntl", None):
+            self.assertEqual(compactar(self.directorio), 0)
+            self.assertIn('huellas_login_total{resultado="fallo"} 2', registro.exposicion())
+        self.assertEqual(os.listdir(self.directorio), ["999999999-1.json"])
+
+    def test_exposicion_incluye_el_agregado(self):
+        self._archivo("999999999-1.json", 7)
+        texto = registro.exposicion()
+        self.assertIn('huellas_login_total{resultado="fallo"} 7', texto)
+        self.assertNotIn("999999999-1.json", os.listdir(self.directorio))
+
+    def test_metrics_sin_token_en_produccion_no_se_expone(self):
+        with override_settings(PRODUCCION=True):
+            self.assertEqual(self.client.get("/metrics").status_code, 404)
+        with override_settings(PRODUCCION=True, METRICAS_TOKEN="secreto"):
+            self.assertEqual(self.client.get("/metrics").status_code, 401)
+            respuesta = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto")
+            self.assertEqual(respuesta.status_code, 200)
+
+
+class VentanaEscrituraAsyncTests(TestCase):
+    async def _request(self, escribe):
+        async def vista(request):
+            if escribe:
+                _escrituras.get()["escribio"] = True
+            return HttpResponse()
+
+        middleware = VentanaEscrituraMiddleware(vista)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().get("/")
+        request.session = SessionStore()
+        await request.session.aset(SESSION_KEY, "1")
+        with mock.patch("rendimiento.replicas.replica_configurada", return_value=True):
+            await middleware(request)
+        return request.session
+
+    async def test_escritura_abre_la_ventana(self):
+        session = await self._request(escribe=True)
+        self.assertIsNotNone(await session.aget(CLAVE_SESION))
+
+    async def test_sin_escritura_no_toca_la_sesion(self):
+        session = await self._request(escribe=False)
+        self.assertIsNone(await session.aget(CLAVE_SESION))
+
+
+PRODUCCION_CORRECTA = {
+    "DEBUG": False,
+    "PRODUCCION": True,
+    "METRICAS_TOKEN": "secreto",
+    "WEB_CONCURRENCY": 4,
+    "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp/huellas_test_cache"}},
+    "STORAGES": {
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+    },
+    "TEMPLATES": [{
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {"loaders": [("django.template.loaders.cached.Loader", ["django.template.loaders.app_directories.Loader"])]},
+    }],
+}
+
+
+@override_settings(**PRODUCCION_CORRECTA)
+class ChequeosRendimientoTests(SimpleTestCase):
+    def setUp(self):
+        conexion = mock.patch.dict(connection.settings_dict, {"CONN_MAX_AGE": 60})
+        conexion.start()
+        self.addCleanup(conexion.stop)
+        tabla = tempfile.NamedTemporaryFile(suffix=".csv")
+        self.addCleanup(tabla.close)
+        ajustes = override_settings(CRECIMIENTO_TABLA=tabla.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def _avisos(self):
+        return [aviso.id for aviso in revisar_configuracion(None)]
+
+    def test_perfil_de_produccion_sin_avisos(self):
+        self.assertEqual(self._avisos(), [])
+        call_command("verificar_rendimiento", stdout=io.StringIO())
+
+    def test_cada_problema_tiene_su_aviso(self):
+        casos = {
+            "rendimiento.W001": {"DEBUG": True},
+            "rendimiento.W002": {"TEMPLATES": [{"BACKEND": "django.template.backends.django.DjangoTemplates", "OPTIONS": {
+                "loaders": ["django.template.loaders.app_directories.Loader"]}}]},
+            "rendimiento.W003": {"CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}},
+            "rendimiento.W004": {"STORAGES": {**PRODUCCION_CORRECTA["STORAGES"], "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}}},
+            "rendimiento.W006": {"SESSION_ENGINE": "django.contrib.sessions.backends.db"},
+            "rendimiento.W008": {"CRECIMIENTO_TABLA": ""},
+            "rendimiento.W009": {"CRECIMIENTO_TABLA": "/no/existe.csv"},
+        }
+        for aviso, ajustes in casos.items():
+            with self.subTest(aviso=aviso), override_settings(**ajustes):
+                self.assertEqual(self._avisos(), [aviso])
+
+    def test_base_sin_pool_ni_conexiones_persistentes(self):
+        with mock.patch.dict(connection.settings_dict, {"CONN_MAX_AGE": 0}):
+            self.assertEqual(self._avisos(), ["rendimiento.W005"])
+
+    def test_cache_local_con_un_solo_worker_no_avisa(self):
+        with override_settings(WEB_CONCURRENCY=1, CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            self.assertEqual(self._avisos(), [])
+
+    @override_settings(DEBUG=True)
+    def test_verificar_rendimiento_termina_con_error(self):
+        with self.assertRaises(SystemCheckError):
+            call_command("verificar_rendimiento", stdout=io.StringIO())
+
+
+class EstaticosTests(SimpleTestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+
+    def test_optimizar_estaticos(self):
+        from PIL import Image
+
+        Image.new("RGB", (3000, 300), "teal").save(os.path.join(self.directorio, "fondo.png"))
+        Image.new("RGBA", (256, 256), "red").save(os.path.join(self.directorio, "icono_huella.png"))
+        salida = io.StringIO()
+        call_command("optimizar_estaticos", origen=self.directorio, stdout=salida, stderr=io.StringIO())
+        self.assertIn("fondo.png:", salida.getvalue())
+        destino = os.path.join(self.directorio, "optimizadas")
+        self.assertTrue({"fondo.webp", "fondo.png", "favicon.ico", "favicon-32.png"} <= set(os.listdir(destino)))
+        with Image.open(os.path.join(destino, "fondo.webp")) as imagen:
+            self.assertEqual(imagen.size, (1920, 192))
+        self.assertLessEqual(os.path.getsize(os.path.join(destino, "fondo.png")), os.path.getsize(os.path.join(self.directorio, "fondo.png")))
+
+        # Sin cambios en el original no se regenera
+        salida = io.StringIO()
+        call_command("optimizar_estaticos", origen=self.directorio, stdout=salida, stderr=io.StringIO())
+        self.assertNotIn("fondo.png:", salida.getvalue())
+
+    def test_css_con_nombres_con_hash(self):
+        ajustes = override_settings(STATIC_ROOT=self.directorio, STORAGES={
+            **settings.STORAGES, "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+        })
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+        with open(os.path.join(self.directorio, staticfiles_storage.stored_name("css/style.css"))) as css:
+            urls = re.findall(r'url\("([^"]+)"\)', css.read())
+        self.assertTrue(urls)
+        for url in urls:
+            # Cada imagen referenciada existe y quedó con el hash del contenido en el nombre
+            self.assertRegex(url, r"\.[0-9a-f]{12}\.(avif|webp|png|jpg)$")
+            self.assertTrue(os.path.exists(os.path.join(self.directorio, "css", url)))
+        self.assertTrue(os.path.exists(os.path.join(self.directorio, staticfiles_storage.stored_name("css/style.css")) + ".br"))
+
+
+class MinificarHTMLTests(SimpleTestCase):
+    def test_colapsa_la_sangria(self):
+        self.assertEqual(minificar_html("<ul>\n    <li>a   b</li>\n</ul>"), "<ul>\n<li>a b</li>\n</ul>")
+
+    def test_conserva_valores_de_atributo(self):
+        html = """<input  type="text"   value="a  b" title='c >  d'>"""
+        self.assertEqual(minificar_html(html), """<input type="text" value="a  b" title='c >  d'>""")
+
+    def test_conserva_bloques_literales(self):
+        html = "<textarea>  a\n\n  b</textarea>   <pre> x   y </pre>"
+        self.assertEqual(minificar_html(html), "<textarea>  a\n\n  b</textarea> <pre> x   y </pre>")
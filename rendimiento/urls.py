@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'rendimiento'
+
+urlpatterns = [
+    path('pool/', views.estado_pool, name='estado_pool'),
+    path('lentas/', views.solicitudes_lentas, name='solicitudes_lentas'),
+]
@@ -0,0 +1,74 @@
+import secrets
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db.models import Avg, Count, Max
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render
+
+from gestion_roles.decorators import supervisor_required
+from rendimiento.metricas import registro
+from rendimiento.models import SolicitudLenta
+from rendimiento.pool import estadisticas_todas
+
+
+# ==========================
+# ESTADO DEL POOL (uso interno)
+# ==========================
+@login_required
+@supervisor_required
+def estado_pool(request):
+    # Solo refleja el proceso que atendió la request
+    return JsonResponse({"conexiones": estadisticas_todas()})
+
+
+# ==========================
+# SOLICITUDES LENTAS
+# ==========================
+@login_required
+@supervisor_required
+def solicitudes_lentas(request):
+    # Peores vistas por duración promedio dentro del buffer de solicitudes lentas
+    vistas = (
+        SolicitudLenta.objects.values('vista')
+        .annotate(
+            total=Count('id'),
+            duracion_prom=Avg('duracion_ms'),
+            duracion_max=Max('duracion_ms'),
+            consultas_prom=Avg('consultas'),
+            sql_prom=Avg('sql_ms'),
+            plantilla_prom=Avg('plantilla_ms'),
+        )
+        .order_by('-duracion_prom')[:20]
+    )
+    # Consultas repetidas dentro de una misma request (candidatas a N+1)
+    repetidas = (
+        SolicitudLenta.objects.exclude(sql_repetido='')
+        .values('vista', 'sql_repetido')
+        .annotate(requests=Count('id'), repeticiones_max=Max('repeticiones'))
+        .order_by('-repeticiones_max')[:20]
+    )
+    recientes = SolicitudLenta.objects.all()[:30]
+    return render(request, 'rendimiento/solicitudes_lentas.html', {
+        'vistas': vistas,
+        'repetidas': repetidas,
+        'recientes': recientes,
+    })
+
+
+# ==========================
+# MÉTRICAS PROMETHEUS
+# ==========================
+def metricas(request):
+    # Sin sesión: lo consulta el recolector. Si METRICAS_TOKEN está definido
+    # se exige "Authorization: Bearer <token>"; en producción sin token no se expone
+    if settings.PRODUCCION and not settings.METRICAS_TOKEN:
+        return HttpResponse(status=404)
+    if settings.METRICAS_TOKEN:
+        esperado = f"Bearer {settings.METRICAS_TOKEN}"
+        if not secrets.compare_digest(request.headers.get("Authorization", ""), esperado):
+            return HttpResponse(status=401)
+    return HttpResponse(
+        registro.exposicion(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )